@@ -0,0 +1,13 @@
+-- sql_benchmarks/tpch/physical/covering.sql
+-- Covering indexes for the date-range scans of Q1/Q6 and the customer/orders join of Q13:
+-- each holds every column the query reads, so SQLite never visits the table rows
+
+-- Q1: l_shipdate <= ..., grouped by returnflag/linestatus
+CREATE INDEX IF NOT EXISTS cov_lineitem_q1 ON lineitem (
+    l_shipdate, l_returnflag, l_linestatus, l_quantity, l_extendedprice, l_discount, l_tax);
+-- Q6: l_shipdate range, discount and quantity filters
+CREATE INDEX IF NOT EXISTS cov_lineitem_q6 ON lineitem (l_shipdate, l_discount, l_quantity, l_extendedprice);
+-- Q13: orders per customer, excluding comments matching '%special%requests%'
+CREATE INDEX IF NOT EXISTS cov_orders_q13 ON orders (o_custkey, o_orderkey, o_comment);
+-- Date ranges on orders (Q3, Q4, Q5, Q10)
+CREATE INDEX IF NOT EXISTS idx_orders_orderdate ON orders (o_orderdate);
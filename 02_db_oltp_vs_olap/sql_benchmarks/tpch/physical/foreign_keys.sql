@@ -0,0 +1,10 @@
+-- sql_benchmarks/tpch/physical/foreign_keys.sql
+-- Indexes on the TPC-H foreign key columns used by the joins
+
+CREATE INDEX IF NOT EXISTS fk_nation_region ON nation (n_regionkey);
+CREATE INDEX IF NOT EXISTS fk_supplier_nation ON supplier (s_nationkey);
+CREATE INDEX IF NOT EXISTS fk_customer_nation ON customer (c_nationkey);
+CREATE INDEX IF NOT EXISTS fk_partsupp_supplier ON partsupp (ps_suppkey);
+CREATE INDEX IF NOT EXISTS fk_orders_customer ON orders (o_custkey);
+CREATE INDEX IF NOT EXISTS fk_lineitem_part_supplier ON lineitem (l_partkey, l_suppkey);
+CREATE INDEX IF NOT EXISTS fk_lineitem_supplier ON lineitem (l_suppkey);
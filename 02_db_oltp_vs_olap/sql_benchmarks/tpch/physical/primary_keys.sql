@@ -0,0 +1,11 @@
+-- sql_benchmarks/tpch/physical/primary_keys.sql
+-- Unique indexes on the TPC-H primary keys (the tables are loaded without constraints)
+
+CREATE UNIQUE INDEX IF NOT EXISTS pk_region ON region (r_regionkey);
+CREATE UNIQUE INDEX IF NOT EXISTS pk_nation ON nation (n_nationkey);
+CREATE UNIQUE INDEX IF NOT EXISTS pk_supplier ON supplier (s_suppkey);
+CREATE UNIQUE INDEX IF NOT EXISTS pk_customer ON customer (c_custkey);
+CREATE UNIQUE INDEX IF NOT EXISTS pk_part ON part (p_partkey);
+CREATE UNIQUE INDEX IF NOT EXISTS pk_partsupp ON partsupp (ps_partkey, ps_suppkey);
+CREATE UNIQUE INDEX IF NOT EXISTS pk_orders ON orders (o_orderkey);
+CREATE UNIQUE INDEX IF NOT EXISTS pk_lineitem ON lineitem (l_orderkey, l_linenumber);
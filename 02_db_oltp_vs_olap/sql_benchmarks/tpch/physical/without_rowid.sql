@@ -0,0 +1,120 @@
+-- sql_benchmarks/tpch/physical/without_rowid.sql
+-- Rebuilds every TPC-H table as a WITHOUT ROWID table clustered on its primary key, so key
+-- lookups and joins on the key read the rows straight from the primary key B-tree
+
+CREATE TABLE region_clustered (
+    r_regionkey    INTEGER,
+    r_name         VARCHAR(25),
+    r_comment      VARCHAR(152),
+    PRIMARY KEY (r_regionkey)
+) WITHOUT ROWID;
+INSERT INTO region_clustered SELECT * FROM region ORDER BY r_regionkey;
+DROP TABLE region;
+ALTER TABLE region_clustered RENAME TO region;
+
+CREATE TABLE nation_clustered (
+    n_nationkey    INTEGER,
+    n_name         VARCHAR(25),
+    n_regionkey    INTEGER,
+    n_comment      VARCHAR(152),
+    PRIMARY KEY (n_nationkey)
+) WITHOUT ROWID;
+INSERT INTO nation_clustered SELECT * FROM nation ORDER BY n_nationkey;
+DROP TABLE nation;
+ALTER TABLE nation_clustered RENAME TO nation;
+
+CREATE TABLE supplier_clustered (
+    s_suppkey      INTEGER,
+    s_name         VARCHAR(25),
+    s_address      VARCHAR(40),
+    s_nationkey    INTEGER,
+    s_phone        CHAR(15),
+    s_acctbal      NUMERIC(15,2),
+    s_comment      VARCHAR(101),
+    PRIMARY KEY (s_suppkey)
+) WITHOUT ROWID;
+INSERT INTO supplier_clustered SELECT * FROM supplier ORDER BY s_suppkey;
+DROP TABLE supplier;
+ALTER TABLE supplier_clustered RENAME TO supplier;
+
+CREATE TABLE customer_clustered (
+    c_custkey      INTEGER,
+    c_name         VARCHAR(25),
+    c_address      VARCHAR(40),
+    c_nationkey    INTEGER,
+    c_phone        CHAR(15),
+    c_acctbal      NUMERIC(15,2),
+    c_mktsegment   CHAR(10),
+    c_comment      VARCHAR(117),
+    PRIMARY KEY (c_custkey)
+) WITHOUT ROWID;
+INSERT INTO customer_clustered SELECT * FROM customer ORDER BY c_custkey;
+DROP TABLE customer;
+ALTER TABLE customer_clustered RENAME TO customer;
+
+CREATE TABLE part_clustered (
+    p_partkey      INTEGER,
+    p_name         VARCHAR(55),
+    p_mfgr         CHAR(25),
+    p_brand        CHAR(10),
+    p_type         VARCHAR(25),
+    p_size         INTEGER,
+    p_container    CHAR(10),
+    p_retailprice  NUMERIC(15,2),
+    p_comment      VARCHAR(23),
+    PRIMARY KEY (p_partkey)
+) WITHOUT ROWID;
+INSERT INTO part_clustered SELECT * FROM part ORDER BY p_partkey;
+DROP TABLE part;
+ALTER TABLE part_clustered RENAME TO part;
+
+CREATE TABLE partsupp_clustered (
+    ps_partkey     INTEGER,
+    ps_suppkey     INTEGER,
+    ps_availqty    INTEGER,
+    ps_supplycost  NUMERIC(15,2),
+    ps_comment     VARCHAR(199),
+    PRIMARY KEY (ps_partkey, ps_suppkey)
+) WITHOUT ROWID;
+INSERT INTO partsupp_clustered SELECT * FROM partsupp ORDER BY ps_partkey, ps_suppkey;
+DROP TABLE partsupp;
+ALTER TABLE partsupp_clustered RENAME TO partsupp;
+
+CREATE TABLE orders_clustered (
+    o_orderkey     INTEGER,
+    o_custkey      INTEGER,
+    o_orderstatus  CHAR(1),
+    o_totalprice   NUMERIC(15,2),
+    o_orderdate    DATE,
+    o_orderpriority CHAR(15),
+    o_clerk        CHAR(15),
+    o_shippriority INTEGER,
+    o_comment      VARCHAR(79),
+    PRIMARY KEY (o_orderkey)
+) WITHOUT ROWID;
+INSERT INTO orders_clustered SELECT * FROM orders ORDER BY o_orderkey;
+DROP TABLE orders;
+ALTER TABLE orders_clustered RENAME TO orders;
+
+CREATE TABLE lineitem_clustered (
+    l_orderkey     INTEGER,
+    l_partkey      INTEGER,
+    l_suppkey      INTEGER,
+    l_linenumber   INTEGER,
+    l_quantity     NUMERIC(15,2),
+    l_extendedprice NUMERIC(15,2),
+    l_discount     NUMERIC(15,2),
+    l_tax          NUMERIC(15,2),
+    l_returnflag   CHAR(1),
+    l_linestatus   CHAR(1),
+    l_shipdate     DATE,
+    l_commitdate   DATE,
+    l_receiptdate  DATE,
+    l_shipinstruct CHAR(25),
+    l_shipmode     CHAR(10),
+    l_comment      VARCHAR(44),
+    PRIMARY KEY (l_orderkey, l_linenumber)
+) WITHOUT ROWID;
+INSERT INTO lineitem_clustered SELECT * FROM lineitem ORDER BY l_orderkey, l_linenumber;
+DROP TABLE lineitem;
+ALTER TABLE lineitem_clustered RENAME TO lineitem;
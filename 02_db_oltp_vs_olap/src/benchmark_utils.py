@@ -1,55 +1,227 @@
 from colors import Colors
+import math
+import os
+import statistics
 import time
 from tabulate import tabulate
-from typing import List, Tuple, Any
+from typing import List, Tuple, Any, Callable, Dict, Optional
 
-def benchmark_query(db: Any, query: str, print_results: bool = True) -> Tuple[List[Tuple[Any, ...]], List[str], List[str], float]:
-    """Benchmark the execution time of a query."""
-    start_time = time.time()
-    results, column_names, column_types = db.execute_query(
-        query, fetch_metadata=print_results)
-    end_time = time.time()
+from result_cache import Result
 
-    execution_time = end_time - start_time
+# Result rows printed per query; the comparison of full results is done by result_verification
+DISPLAY_ROWS = 20
 
-    return results, column_names, column_types, execution_time
+def drop_page_cache(db_path: str) -> bool:
+    """
+    Ask the OS to evict a database file (and its WAL/journal) from the page cache.
 
-def benchmark_sqlite(sqlite_db: Any, query: str, print_results: bool = True) -> float:
-    """Benchmark and optionally print results for SQLite."""
+    Uses posix_fadvise(POSIX_FADV_DONTNEED), which only drops clean pages, so
+    the file is fsync'ed first. Returns False where posix_fadvise is unavailable.
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return False
+    for path in (db_path, db_path + ".wal", db_path + "-wal", db_path + "-journal"):
+        if not os.path.exists(path):
+            continue
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+    return True
+
+def make_cold(db: Any, drop_cache: bool = False) -> None:
+    """Close and reopen a database handler, optionally dropping its file from the OS page cache."""
+    db.close()
+    if drop_cache:
+        drop_page_cache(db.db_path)
+    db.reopen()
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Percentile (0-100) of already sorted values, linearly interpolated between ranks."""
+    if not sorted_values:
+        return math.nan
+    rank = (len(sorted_values) - 1) * q / 100
+    lower = math.floor(rank)
+    upper = math.ceil(rank)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (rank - lower)
+
+def summarize(wall_ns: List[int], cpu_ns: List[int]) -> Dict[str, Any]:
+    """
+    Summarize measured repetitions into distribution statistics (in seconds).
+
+    Wall time is measured with perf_counter_ns and CPU time with process_time_ns;
+    CPU time can exceed wall time when the engine runs multi-threaded.
+    """
+    wall = [ns / 1e9 for ns in wall_ns]
+    cpu = [ns / 1e9 for ns in cpu_ns]
+    ordered = sorted(wall)
+    return {
+        "n": len(wall),
+        "samples": wall,
+        "cpu_samples": cpu,
+        "min": ordered[0],
+        "median": statistics.median(ordered),
+        "mean": statistics.fmean(ordered),
+        "p95": percentile(ordered, 95),
+        "p99": percentile(ordered, 99),
+        "max": ordered[-1],
+        "stddev": statistics.stdev(ordered) if len(ordered) > 1 else 0.0,
+        "cpu_median": statistics.median(cpu),
+    }
+
+def measure(fn: Callable[[], Any], warmup: int = 0, repetitions: int = 1,
+            setup: Optional[Callable[[], None]] = None) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Run `fn` for `warmup` untimed iterations, then time `repetitions` iterations.
+    `setup`, if given, runs untimed before every iteration (e.g. to reopen connections).
+
+    Returns:
+        Tuple[Any, Dict[str, Any]]: the return value of the last run and its statistics (see summarize).
+    """
+    if repetitions < 1:
+        raise ValueError("repetitions must be at least 1")
+
+    for _ in range(warmup):
+        if setup is not None:
+            setup()
+        fn()
+
+    wall_ns: List[int] = []
+    cpu_ns: List[int] = []
+    result = None
+    for _ in range(repetitions):
+        if setup is not None:
+            setup()
+        cpu_start = time.process_time_ns()
+        start = time.perf_counter_ns()
+        result = fn()
+        wall_ns.append(time.perf_counter_ns() - start)
+        cpu_ns.append(time.process_time_ns() - cpu_start)
+
+    stats = summarize(wall_ns, cpu_ns)
+    stats["warmup"] = warmup
+    return result, stats
+
+def add_fetch_stats(stats: Dict[str, Any], fetch_ns: List[int], fetch_mode: str) -> Dict[str, Any]:
+    """
+    Split the measured wall times (see summarize) into engine execution and
+    client-side fetch time, given the fetch time of each measured repetition.
+    """
+    fetch = [ns / 1e9 for ns in fetch_ns]
+    stats["fetch_mode"] = fetch_mode
+    stats["fetch_samples"] = fetch
+    stats["fetch_median"] = statistics.median(fetch)
+    stats["execute_median"] = statistics.median(wall - f for wall, f in zip(stats["samples"], fetch))
+    return stats
+
+def benchmark_query(db: Any, query: str, print_results: bool = True, warmup: int = 0, repetitions: int = 1,
+                    setup: Optional[Callable[[], None]] = None, fetch_mode: str = "all"
+                    ) -> Tuple[List[Tuple[Any, ...]], List[str], List[str], Dict[str, Any]]:
+    """
+    Benchmark the execution time of a query over warmup and measured repetitions,
+    fetching the result as `fetch_mode` says (see the handlers' FETCH_MODES).
+    Only the "all" mode returns the result rows; the others return none.
+    """
+    fetch_ns: List[int] = []
+
+    def run() -> Tuple[Any, List[str], List[str]]:
+        result, names, types, ns = db.execute_fetch(query, fetch_mode, fetch_metadata=print_results)
+        fetch_ns.append(ns)
+        return result, names, types
+
+    (results, column_names, column_types), stats = measure(run, warmup=warmup, repetitions=repetitions, setup=setup)
+    add_fetch_stats(stats, fetch_ns[warmup:], fetch_mode)
+
+    if fetch_mode != "all":
+        results = []
+    return results, column_names, column_types, stats
+
+def benchmark_sqlite(sqlite_db: Any, query: str, print_results: bool = True, warmup: int = 0,
+                     repetitions: int = 1, setup: Optional[Callable[[], None]] = None,
+                     cached_results: Optional[Callable[[Optional[Result]], Result]] = None,
+                     fetch_mode: str = "all") -> Dict[str, Any]:
+    """
+    Benchmark and optionally print results for SQLite. With `cached_results`, the
+    printed results come from it (see ResultCache.fetch), which is handed the
+    rows of the last timed run to cache on a miss; the timed runs skip fetching
+    column metadata. Fetch modes other than "all" do not keep the rows, so the
+    printed results then come from one more, untimed execution.
+    """
+    display_in_run = print_results and cached_results is None and fetch_mode == "all"
     sqlite_results, \
     sqlite_columns, \
     sqlite_types, \
-    sqlite_time = benchmark_query(sqlite_db, query, print_results)
+    sqlite_stats = benchmark_query(sqlite_db, query, display_in_run, warmup, repetitions, setup, fetch_mode)
 
     if print_results:
+        if cached_results is not None:
+            timed = (sqlite_results, *sqlite_db.result_metadata(query)) if fetch_mode == "all" else None
+            sqlite_results, sqlite_columns, sqlite_types = cached_results(timed)
+        elif not display_in_run:
+            sqlite_results, sqlite_columns, sqlite_types = sqlite_db.execute_query(query)
         __print_table(sqlite_results, sqlite_columns, sqlite_types, "SQLite")
 
-    return sqlite_time
+    return sqlite_stats
 
-def benchmark_duckdb(duckdb_db: Any, query: str, print_results: bool = True) -> float:
-    """Benchmark and optionally print results for DuckDB."""
+def benchmark_duckdb(duckdb_db: Any, query: str, print_results: bool = True, warmup: int = 0,
+                     repetitions: int = 1, setup: Optional[Callable[[], None]] = None,
+                     cached_results: Optional[Callable[[Optional[Result]], Result]] = None,
+                     fetch_mode: str = "all") -> Dict[str, Any]:
+    """
+    Benchmark and optionally print results for DuckDB. With `cached_results`, the
+    printed results come from it (see ResultCache.fetch), which is handed the
+    rows of the last timed run to cache on a miss; the timed runs skip fetching
+    column metadata. Fetch modes other than "all" do not keep the rows, so the
+    printed results then come from one more, untimed execution.
+    """
+    display_in_run = print_results and cached_results is None and fetch_mode == "all"
     duckdb_results, \
     duckdb_columns, \
     duckdb_types, \
-    duckdb_time = benchmark_query(duckdb_db, query, print_results)
+    duckdb_stats = benchmark_query(duckdb_db, query, display_in_run, warmup, repetitions, setup, fetch_mode)
 
     if print_results:
+        if cached_results is not None:
+            timed = (duckdb_results, *duckdb_db.result_metadata(query)) if fetch_mode == "all" else None
+            duckdb_results, duckdb_columns, duckdb_types = cached_results(timed)
+        elif not display_in_run:
+            duckdb_results, duckdb_columns, duckdb_types = duckdb_db.execute_query(query)
         __print_table(duckdb_results, duckdb_columns, duckdb_types, "DuckDB")
 
-    return duckdb_time
+    return duckdb_stats
+
+def print_stats(stats_per_engine: Dict[str, Dict[str, Any]]) -> None:
+    """Print the distribution statistics of each engine as a table."""
+    headers = ["Engine", "n", "min", "median", "p95", "p99", "stddev", "cpu median"]
+    rows = [[engine, s["n"], s["min"], s["median"], s["p95"], s["p99"], s["stddev"], s["cpu_median"]]
+            for engine, s in stats_per_engine.items()]
+    if all("fetch_mode" in s for s in stats_per_engine.values()):
+        headers += ["fetch", "execute median", "fetch median"]
+        for row, s in zip(rows, stats_per_engine.values()):
+            row += [s["fetch_mode"], s["execute_median"], s["fetch_median"]]
+    print(tabulate(rows, headers=headers, floatfmt=".6f"))
 
-def __print_table(results: List[Tuple[Any, ...]], columns: List[str], types: List[str], db_name: str) -> None:
-    """Print the results in a tabular format."""
+def format_stats(label: str, engine: str, stats: Dict[str, Any]) -> str:
+    """One line of distribution statistics for the stats output files."""
+    return (f"{label} {engine}: n={stats['n']}, min={stats['min']:.6f}s, median={stats['median']:.6f}s, "
+            f"p95={stats['p95']:.6f}s, p99={stats['p99']:.6f}s, stddev={stats['stddev']:.6f}s, "
+            f"cpu_median={stats['cpu_median']:.6f}s"
+            + (f", fetch={stats['fetch_mode']}, execute_median={stats['execute_median']:.6f}s, "
+               f"fetch_median={stats['fetch_median']:.6f}s" if "fetch_mode" in stats else "")
+            + "\n")
+
+def __print_table(results: List[Tuple[Any, ...]], columns: List[str], types: List[str], db_name: str,
+                  max_rows: int = DISPLAY_ROWS) -> None:
+    """Print the first `max_rows` results in a tabular format."""
 
     if results:
         Colors.print_colored(f" {db_name.upper()} RESULTS ".center(60), Colors.HEADER)
 
-        Colors.print_colored(f"Debug: {db_name} - Results: {results}", Colors.WARNING)
-        Colors.print_colored(f"Debug: {db_name} - Columns: {columns}", Colors.WARNING)
-        Colors.print_colored(f"Debug: {db_name} - Types: {types}", Colors.WARNING)
-
-        # Pretty format, uncomment to see
-        # headers = [f"{col}\n{typ}" for col, typ in zip(columns, types)]
-        # print(tabulate(results, headers=headers, tablefmt="fancy_grid"))
+        headers = [f"{col}\n{typ}" for col, typ in zip(columns, types)]
+        print(tabulate(results[:max_rows], headers=headers, tablefmt="fancy_grid"))
+        if len(results) > max_rows:
+            Colors.print_colored(f"... {len(results) - max_rows} more rows ({len(results)} in total)", Colors.WARNING)
     else:
         Colors.print_colored(f"No results for query executed on {db_name}.", Colors.FAIL)
@@ -0,0 +1,75 @@
+from typing import Dict, Any, List, Optional, Callable, Tuple
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, Future
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+
+from duckdb_handler import DuckDB
+
+# Chunks each worker may generate ahead of the one being appended; bounds the scratch disk space in use
+CHUNKS_AHEAD_PER_WORKER = 1
+
+
+def append_chunks(duckdb_db: DuckDB, generate: Callable[..., Dict[str, Any]], chunk_args: List[Tuple[Any, ...]],
+                  workers: int = 1, progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Generates a dataset in chunks in worker processes and appends them to the
+    tables of `duckdb_db` in the order of `chunk_args`, so the result does not
+    depend on which worker finishes first.
+
+    `generate(*args, out_path)` runs in a worker for every `args` of
+    `chunk_args`: it writes its chunk as tables of a new DuckDB file at
+    `out_path` and returns a dict with at least "rows" (rows per table, in
+    the order the tables are appended) and "peak_rss_mb". Each worker holds
+    a single chunk in memory, and at most (1 + CHUNKS_AHEAD_PER_WORKER)
+    chunks per worker wait on disk to be appended.
+
+    Args:
+        duckdb_db (DuckDB): Handler of the database the chunks are appended to; its tables must exist.
+        generate (Callable[..., Dict[str, Any]]): Module-level chunk generator (it is pickled for the workers).
+        chunk_args (List[Tuple[Any, ...]]): Arguments of each chunk, in append order.
+        workers (int): Worker processes generating chunks at the same time.
+        progress (Optional[Callable[[Dict[str, Any]], None]]): Called after every appended chunk with the dict
+            `generate` returned, plus the append time, the number of chunks done and the time elapsed.
+
+    Returns:
+        Dict[str, Any]: Rows per table, chunks, workers, seconds and the largest worker peak RSS.
+    """
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+    workers = max(1, min(workers, len(chunk_args)))
+
+    totals: Dict[str, int] = {}
+    worker_peak_rss = 0.0
+    start = time.perf_counter()
+    scratch_dir = tempfile.mkdtemp(prefix="chunks-", dir=os.path.dirname(os.path.abspath(duckdb_db.db_path)))
+    try:
+        # Spawned workers do not inherit the parent's open DuckDB connection
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            pending: deque[Future] = deque()
+            submitted = done = 0
+            while submitted < len(chunk_args) or pending:
+                while submitted < len(chunk_args) and len(pending) < workers * (1 + CHUNKS_AHEAD_PER_WORKER):
+                    path = os.path.join(scratch_dir, f"chunk-{submitted}.duckdb")
+                    pending.append(executor.submit(generate, *chunk_args[submitted], path))
+                    submitted += 1
+
+                chunk = pending.popleft().result()
+                append_start = time.perf_counter()
+                duckdb_db.append_tables(chunk["path"], list(chunk["rows"]))
+                os.remove(chunk["path"])
+                done += 1
+                for t, rows in chunk["rows"].items():
+                    totals[t] = totals.get(t, 0) + rows
+                worker_peak_rss = max(worker_peak_rss, chunk["peak_rss_mb"])
+                if progress is not None:
+                    progress(dict(chunk, append_seconds=time.perf_counter() - append_start, done=done,
+                                  chunks=len(chunk_args), elapsed=time.perf_counter() - start))
+    finally:
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+    return {"rows": totals, "chunks": len(chunk_args), "workers": workers, "seconds": time.perf_counter() - start,
+            "worker_peak_rss_mb": worker_peak_rss}
@@ -0,0 +1,156 @@
+from typing import Dict, List, Any
+import argparse
+import sys
+
+import numpy as np
+from tabulate import tabulate
+
+from results_store import load_results, group_indices, log_ratio_ci, NUMERIC_FIELDS
+
+# A measurement is compared per benchmark, scale factor, query/transaction, engine and run configuration
+COMPARE_KEYS = ["benchmark", "scale_factor", "query", "engine", "cache_mode", "variant"]
+DEFAULT_ALPHA = 0.05
+DEFAULT_MIN_CHANGE = 0.05
+# Fewer samples per side than this leave the t interval too wide to tell anything apart, so such
+# measurements are not tested
+MIN_SAMPLES = 3
+INSUFFICIENT = "insufficient samples"
+
+# Exit codes of the command: usable as a CI gate
+EXIT_OK = 0
+EXIT_REGRESSION = 1
+EXIT_NO_DATA = 2
+EXIT_INSUFFICIENT = 3
+
+
+def compare(baseline: Dict[str, np.ndarray], candidate: Dict[str, np.ndarray], alpha: float = DEFAULT_ALPHA,
+            min_change: float = DEFAULT_MIN_CHANGE) -> List[Dict[str, Any]]:
+    """
+    Compares every measurement present in both result sets.
+
+    A change is significant when the confidence interval of the
+    candidate/baseline ratio of geometric means lies entirely beyond
+    1 ± `min_change`. The intervals are Welch t intervals on the log
+    latencies (see results_store.log_ratio_ci), Bonferroni-adjusted to
+    confidence 1 - alpha / comparisons, so that, for roughly log-normal
+    timings, the chance of any false alarm over all comparisons stays below
+    alpha. A percentile bootstrap cannot do this at the few repetitions the
+    benchmarks are usually run with: at such confidence levels its interval
+    shrinks to the range of the resampled medians and flags unchanged code.
+    Measurements with fewer than MIN_SAMPLES samples on either side are not
+    tested.
+
+    Returns:
+        List[Dict[str, Any]]: one row per measurement with the medians, the candidate/baseline ratio of
+        geometric means and its adjusted CI (None when not tested), the confidence used and a verdict
+        ("regression", "speedup", "unchanged" or "insufficient samples").
+    """
+    baseline_groups = group_indices(baseline, COMPARE_KEYS)
+    candidate_groups = group_indices(candidate, COMPARE_KEYS)
+
+    rows = []
+    for key in sorted(baseline_groups.keys() & candidate_groups.keys(), key=repr):
+        old = baseline["wall_s"][baseline_groups[key]]
+        new = candidate["wall_s"][candidate_groups[key]]
+        old, new = old[~np.isnan(old)], new[~np.isnan(new)]
+        if len(old) == 0 or len(new) == 0:
+            continue
+        rows.append(dict(zip(COMPARE_KEYS, key), baseline_n=len(old), candidate_n=len(new),
+                         baseline_median=float(np.median(old)), candidate_median=float(np.median(new)),
+                         ratio=log_ratio_ci(new, old)[0], ci_low=None, ci_high=None,
+                         old=old, new=new))
+
+    tested = [row for row in rows if min(row["baseline_n"], row["candidate_n"]) >= MIN_SAMPLES]
+    confidence = 1 - alpha / max(1, len(tested))
+    for row in rows:
+        old, new = row.pop("old"), row.pop("new")
+        row["confidence"] = confidence
+        if min(len(old), len(new)) < MIN_SAMPLES:
+            row["verdict"] = INSUFFICIENT
+            continue
+        _, row["ci_low"], row["ci_high"] = log_ratio_ci(new, old, confidence=confidence)
+        if row["ci_low"] > 1 + min_change:
+            row["verdict"] = "regression"
+        elif row["ci_high"] < 1 - min_change:
+            row["verdict"] = "speedup"
+        else:
+            row["verdict"] = "unchanged"
+    return rows
+
+
+def format_comparison(rows: List[Dict[str, Any]], show_all: bool = False) -> str:
+    confidence = rows[0]["confidence"] if rows else 1 - DEFAULT_ALPHA
+    headers = ["Benchmark", "SF", "Query", "Engine", "Config", "Baseline (s)", "Candidate (s)", "Change",
+               f"{confidence:.2%} CI", "n", "Verdict"]
+    table = []
+    for row in rows:
+        if not show_all and row["verdict"] == "unchanged":
+            continue
+        config = "-".join(tag for tag in (row["cache_mode"] if row["cache_mode"] != "none" else "",
+                                          row["variant"] or "") if tag)
+        table.append([row["benchmark"], row["scale_factor"], row["query"], row["engine"], config or "default",
+                      row["baseline_median"], row["candidate_median"], f"{(row['ratio'] - 1) * 100:+.1f}%",
+                      f"[{(row['ci_low'] - 1) * 100:+.1f}%, {(row['ci_high'] - 1) * 100:+.1f}%]"
+                      if row["ci_low"] is not None else "-",
+                      f"{row['baseline_n']}/{row['candidate_n']}", row["verdict"]])
+    return tabulate(table, headers=headers, floatfmt=".6f")
+
+
+def parse_filters(filters: List[str]) -> Dict[str, Any]:
+    """key=value pairs selecting records, e.g. duckdb_version=1.2.2 or run_id=..."""
+    parsed: Dict[str, Any] = {}
+    for item in filters:
+        key, sep, value = item.partition("=")
+        if not sep:
+            raise ValueError(f"Filter must be key=value: {item}")
+        parsed[key] = float(value) if key in NUMERIC_FIELDS else value
+    return parsed
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Compare two benchmark result sets and report significant speedups and regressions. "
+                    "Exits with 1 if there is a regression, 2 if nothing could be compared, 3 if some measurements "
+                    f"have fewer than {MIN_SAMPLES} samples and could not be tested.")
+    parser.add_argument("baseline", help="results.jsonl, or an out directory (text results are read if it has none)")
+    parser.add_argument("candidate", help="results.jsonl, or an out directory; may be the same as the baseline "
+                                          "when the two are told apart by filters")
+    parser.add_argument("--baseline-filter", action="append", default=[], metavar="KEY=VALUE",
+                        help="Only use baseline records with this field value (repeatable), e.g. duckdb_version=1.2.2")
+    parser.add_argument("--candidate-filter", action="append", default=[], metavar="KEY=VALUE",
+                        help="Only use candidate records with this field value (repeatable)")
+    parser.add_argument("--alpha", type=float, default=DEFAULT_ALPHA,
+                        help=f"Family-wise significance level over all comparisons (default: {DEFAULT_ALPHA})")
+    parser.add_argument("--min-change", type=float, default=DEFAULT_MIN_CHANGE,
+                        help=f"Smallest relative change of the median reported (default: {DEFAULT_MIN_CHANGE})")
+    parser.add_argument("--all", action="store_true", help="Also list the unchanged measurements")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    try:
+        baseline = load_results(args.baseline, **parse_filters(args.baseline_filter))
+        candidate = load_results(args.candidate, **parse_filters(args.candidate_filter))
+    except (OSError, ValueError) as e:
+        print(f"Cannot load results: {e}")
+        return EXIT_NO_DATA
+    rows = compare(baseline, candidate, alpha=args.alpha, min_change=args.min_change)
+    if not rows:
+        print("No measurements in common between the baseline and the candidate.")
+        return EXIT_NO_DATA
+
+    regressions = sum(row["verdict"] == "regression" for row in rows)
+    speedups = sum(row["verdict"] == "speedup" for row in rows)
+    insufficient = sum(row["verdict"] == INSUFFICIENT for row in rows)
+    if args.all or regressions or speedups or insufficient:
+        print(format_comparison(rows, show_all=args.all))
+    print(f"\n{len(rows)} measurements compared: {regressions} regressions, {speedups} speedups, "
+          f"{insufficient} with insufficient samples (alpha={args.alpha}, min change={args.min_change:.0%})")
+    if regressions:
+        return EXIT_REGRESSION
+    return EXIT_INSUFFICIENT if insufficient else EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+from typing import Dict, List, Optional, Any
+import errno
+import fcntl
+import hashlib
+import json
+import os
+import shutil
+import time
+
+DEFAULT_CACHE_BUDGET_GB = 50.0
+MANIFEST = "manifest.json"
+FICLONE = 0x40049409  # Linux ioctl for reflinks (btrfs, xfs, ...)
+
+
+def dataset_info(benchmark: str, scale_factor: float, schema_path: str,
+                 physical_design: Optional[Dict[str, Any]] = None,
+                 storage: Optional[Dict[str, Any]] = None,
+                 generator: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Describes a dataset by benchmark, scale factor and a hash of its setup.sql.
+
+    Args:
+        benchmark (str): Benchmark name (e.g., "TPC_H").
+        scale_factor (float): The scale factor used.
+        schema_path (str): Path to the setup.sql file that created the schema.
+        physical_design (Optional[Dict[str, Any]]): Physical design applied after the load
+            (see physical_design.design_info); None for the plain schema.
+        storage (Optional[Dict[str, Any]]): Format and settings of external files DuckDB reads the tables
+            from (e.g. Parquet); None for DuckDB's native storage.
+        generator (Optional[Dict[str, Any]]): Generator of the data and its settings (e.g. the seed) where
+            they change the rows; None otherwise.
+    """
+    with open(schema_path, "rb") as f:
+        schema_hash = hashlib.sha256(f.read()).hexdigest()[:16]
+    info = {"benchmark": benchmark, "scale_factor": float(scale_factor), "schema_hash": schema_hash}
+    if physical_design is not None:
+        info["physical_design"] = physical_design
+    if storage is not None:
+        info["storage"] = storage
+    if generator is not None:
+        info["generator"] = generator
+    return info
+
+
+def dataset_key(info: Dict[str, Any]) -> str:
+    """Directory name of a dataset in the cache."""
+    key = f"{info['benchmark']}_SF_{info['scale_factor']}_{info['schema_hash']}"
+    if "physical_design" in info:
+        key += f"_{info['physical_design']['name']}_{info['physical_design']['hash']}"
+    if "storage" in info:
+        key += "_" + "-".join(str(value) for value in info["storage"].values())
+    if "generator" in info:
+        key += "_" + "-".join(str(value) for value in info["generator"].values())
+    return key
+
+
+def write_stamp(stamp_path: str, info: Dict[str, Any]) -> None:
+    """Records which dataset the working database files hold."""
+    with open(stamp_path, "w") as f:
+        json.dump(info, f)
+
+
+def read_stamp(stamp_path: str) -> Optional[Dict[str, Any]]:
+    """Returns the dataset recorded next to the working database files, if any."""
+    try:
+        with open(stamp_path, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def copy_file(src: str, dst: str, allow_hardlink: bool = False) -> str:
+    """
+    Copies src to dst as cheaply as the filesystem allows.
+
+    Tries a reflink first, then a hardlink (only when the caller promises not
+    to write to dst, since a hardlink shares the cached file) and finally a
+    full copy.
+
+    Returns:
+        str: The method used ("reflink", "hardlink" or "copy").
+    """
+    if os.path.exists(dst):
+        os.remove(dst)
+
+    try:
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        return "reflink"
+    except OSError:
+        os.remove(dst)
+
+    if allow_hardlink:
+        try:
+            os.link(src, dst)
+            return "hardlink"
+        except OSError as e:
+            if e.errno not in (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP):
+                raise
+
+    shutil.copyfile(src, dst)
+    return "copy"
+
+
+class DatasetCache:
+    """Directory of pre-built database files keyed by benchmark, scale factor and schema hash."""
+    def __init__(self, cache_dir: str, budget_gb: float = DEFAULT_CACHE_BUDGET_GB) -> None:
+        self.cache_dir: str = cache_dir
+        self.budget_bytes: int = int(budget_gb * 1024 ** 3)
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def __entry_dir(self, info: Dict[str, Any]) -> str:
+        return os.path.join(self.cache_dir, dataset_key(info))
+
+    def __read_manifest(self, entry_dir: str) -> Optional[Dict[str, Any]]:
+        return read_stamp(os.path.join(entry_dir, MANIFEST))
+
+    def __write_manifest(self, entry_dir: str, manifest: Dict[str, Any]) -> None:
+        tmp_path = os.path.join(entry_dir, MANIFEST + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, os.path.join(entry_dir, MANIFEST))
+
+    def lookup(self, info: Dict[str, Any]) -> Optional[str]:
+        """
+        Returns the entry directory for a dataset if it is present and intact.
+
+        An entry is valid when its manifest matches the requested dataset and
+        every file listed in it exists with the recorded size.
+        """
+        entry_dir = self.__entry_dir(info)
+        manifest = self.__read_manifest(entry_dir)
+        if manifest is None or manifest.get("dataset") != info:
+            return None
+        for name, size in manifest["files"].items():
+            path = os.path.join(entry_dir, name)
+            if not os.path.isfile(path) or os.path.getsize(path) != size:
+                return None
+        return entry_dir
+
+    def restore(self, info: Dict[str, Any], dst_paths: Dict[str, str], read_only: bool = False) -> Optional[Dict[str, str]]:
+        """
+        Copies a cached dataset's files to the working paths.
+
+        Args:
+            info (Dict[str, Any]): Dataset description from dataset_info.
+            dst_paths (Dict[str, str]): Working path per cached file name.
+            read_only (bool): Whether the benchmark never writes to the files, allowing hardlinks.
+
+        Returns:
+            Optional[Dict[str, str]]: Copy method per file, or None on a cache miss.
+        """
+        entry_dir = self.lookup(info)
+        if entry_dir is None:
+            return None
+
+        methods = {}
+        for name, dst in dst_paths.items():
+            os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+            methods[name] = copy_file(os.path.join(entry_dir, name), dst, allow_hardlink=read_only)
+
+        manifest = self.__read_manifest(entry_dir)
+        manifest["last_used"] = time.time()
+        self.__write_manifest(entry_dir, manifest)
+        return methods
+
+    def store(self, info: Dict[str, Any], src_paths: Dict[str, str]) -> None:
+        """
+        Copies freshly built database files into the cache and evicts old entries.
+
+        Args:
+            info (Dict[str, Any]): Dataset description from dataset_info.
+            src_paths (Dict[str, str]): Working path per cached file name.
+        """
+        entry_dir = self.__entry_dir(info)
+        if os.path.isdir(entry_dir):
+            shutil.rmtree(entry_dir)
+        os.makedirs(entry_dir)
+
+        files = {}
+        for name, src in src_paths.items():
+            dst = os.path.join(entry_dir, name)
+            copy_file(src, dst)
+            files[name] = os.path.getsize(dst)
+
+        # The manifest is written last, so a partially copied entry never validates
+        self.__write_manifest(entry_dir, {"dataset": info, "files": files, "last_used": time.time()})
+        self.evict(keep=dataset_key(info))
+
+    def evict(self, keep: Optional[str] = None) -> List[str]:
+        """
+        Removes least recently used entries until the cache fits its disk budget.
+
+        Args:
+            keep (Optional[str]): Entry that must survive, e.g. the one just stored.
+
+        Returns:
+            List[str]: Names of the evicted entries.
+        """
+        entries = []
+        total = 0
+        for name in os.listdir(self.cache_dir):
+            entry_dir = os.path.join(self.cache_dir, name)
+            if not os.path.isdir(entry_dir):
+                continue
+            manifest = self.__read_manifest(entry_dir)
+            size = sum(os.path.getsize(os.path.join(entry_dir, f)) for f in os.listdir(entry_dir))
+            last_used = manifest.get("last_used", 0.0) if manifest else 0.0
+            entries.append((last_used, name, size))
+            total += size
+
+        evicted = []
+        for _, name, size in sorted(entries):
+            if total <= self.budget_bytes:
+                break
+            if name == keep:
+                continue
+            shutil.rmtree(os.path.join(self.cache_dir, name))
+            total -= size
+            evicted.append(name)
+        return evicted
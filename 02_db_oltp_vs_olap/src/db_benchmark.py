@@ -2,13 +2,29 @@ import os
 import argparse
 
 from typing import List, Dict
-from sqlite_handler import SQLite
-from duckdb_handler import DuckDB
-from benchmark_utils import benchmark_sqlite, benchmark_duckdb
+from sqlite_handler import SQLite, DEFAULT_BATCH_SIZE, FETCH_MODES as SQLITE_FETCH_MODES, peak_rss_mb
+from duckdb_handler import (DuckDB, FETCH_MODES, PARQUET_DIR, TPCH_TABLES, PARQUET_COMPRESSIONS,
+                            DEFAULT_ROW_GROUP_SIZE)
+from result_cache import ResultCache, DEFAULT_RESULT_CACHE_MB, database_fingerprint
+from results_store import RESULTS_FILE, measurement_records, append_records
+from query_profiler import profile_sqlite, profile_duckdb, top_operators, save_profiles
+from result_verification import compare_results, format_verification, has_top_level_order_by
+from dataset_cache import DatasetCache, DEFAULT_CACHE_BUDGET_GB, dataset_info, read_stamp, write_stamp
+from physical_design import PHYSICAL_DESIGNS, design_info, database_size, object_sizes, user_indexes
+from tpcc_transactions import (stock_level_query, stock_level_transaction, DELIVERY_IMPLEMENTATIONS,
+                               verify_delivery, order_status_transaction, TransactionRollback)
+from tpcc_driver import run_driver, print_driver_report, format_driver_report, population_sizes, new_order, payment
+from tpch_scheduler import available_cpus, run_jobs
+from tpch_generator import generate_tpch_chunked
+from tpcc_generator import generate_tpcc, warehouses_for, DEFAULT_SEED, TPCC_TABLES
+from sqlite_parallel import ParallelSQLite, COLUMNS
+from sql_dialect import to_sqlite_query
+from benchmark_utils import benchmark_sqlite, benchmark_duckdb, measure, print_stats, format_stats, make_cold
 from colors import Colors
+from tabulate import tabulate
 from enum import Enum
-from datetime import datetime
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Callable, Tuple
+import importlib.util
 import time
 import random
 
@@ -16,6 +32,19 @@ import random
 SQL_BENCHMARKS_DIR = "../sql_benchmarks"
 TPC_H = SQL_BENCHMARKS_DIR + "/tpch"
 TPC_C = SQL_BENCHMARKS_DIR + "/tpcc"
+PHYSICAL_DIR = TPC_H + "/physical"
+OUT_DIR = "../out"
+LOAD_OUT_DIR = OUT_DIR + "/load"
+STATS_OUT_DIR = OUT_DIR + "/stats"
+DRIVER_OUT_DIR = OUT_DIR + "/driver"
+VERIFY_OUT_DIR = OUT_DIR + "/verify"
+RESULTS_PATH = OUT_DIR + "/" + RESULTS_FILE
+PROFILE_OUT_DIR = OUT_DIR + "/profile"
+SQLITE_DB_PATH = "sqlite.db"
+DUCKDB_DB_PATH = "duckdb.db"
+DATASET_STAMP = "dataset.json"
+CACHE_MODES = ["none", "cold", "warm"]
+DUCKDB_STORAGES = ["native", "parquet"]
 
 class BENCHMARK(Enum):
     TPC_H = 1
@@ -61,7 +90,269 @@ def parse_args() -> argparse.Namespace:
         help="Show query results in the output"
     )
 
-    return parser.parse_args()
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f"Rows per executemany batch when loading CSVs into SQLite (default: {DEFAULT_BATCH_SIZE})"
+    )
+
+    parser.add_argument(
+        '--commit-per-batch',
+        action='store_true',
+        help="Commit after every SQLite load batch instead of once per table"
+    )
+
+    parser.add_argument(
+        '--bulk-load',
+        action='store_true',
+        help="Load SQLite with relaxed PRAGMAs and build secondary indexes after the data is in"
+    )
+
+    parser.add_argument(
+        '--direct-load',
+        action='store_true',
+        help="Stream TPC-H tables from DuckDB straight into SQLite instead of going through CSV files"
+    )
+
+    parser.add_argument(
+        '--warmup',
+        type=int,
+        default=0,
+        help="Untimed warmup executions of every query/transaction before measuring (default: 0)"
+    )
+
+    parser.add_argument(
+        '--repetitions',
+        type=int,
+        default=1,
+        help="Measured executions of every query/transaction (default: 1)"
+    )
+
+    parser.add_argument(
+        '--clients',
+        type=int,
+        default=0,
+        help="Run TPC-C as N concurrent clients with a weighted transaction mix instead of one transaction of each type"
+    )
+
+    parser.add_argument(
+        '--duration',
+        type=float,
+        default=60.0,
+        help="Seconds the concurrent TPC-C clients keep submitting transactions (default: 60)"
+    )
+
+    parser.add_argument(
+        '--client-processes',
+        action='store_true',
+        help="Run concurrent SQLite clients as processes instead of threads (DuckDB always uses threads)"
+    )
+
+    parser.add_argument(
+        '--adhoc-statements',
+        action='store_true',
+        help="Build TPC-C statements as SQL text with inlined values on every call instead of "
+             "executing prepared statements with bound parameters"
+    )
+
+    parser.add_argument(
+        '--delivery',
+        type=str,
+        choices=list(DELIVERY_IMPLEMENTATIONS),
+        default="loop",
+        help="TPC-C Delivery implementation: 'loop' issues 7 statements per district, 'set' handles all "
+             "districts in 4 set-based statements after checking both give the same result (default: loop)"
+    )
+
+    parser.add_argument(
+        '--cache-mode',
+        type=str,
+        choices=CACHE_MODES,
+        default="none",
+        help="TPC-H cache state per timed query: 'cold' reopens connections before every execution, "
+             "'warm' pre-runs the query; results go to ../out/<mode> (default: none)"
+    )
+
+    parser.add_argument(
+        '--fetch-mode',
+        type=str,
+        choices=FETCH_MODES,
+        default="all",
+        help="How timed TPC-H queries hand their results to Python: 'all' builds a list of tuples, 'stream' "
+             "walks fetchmany chunks, 'count' runs the query unchanged and counts the rows client-side, "
+             "'numpy'/'arrow' fetch DuckDB results as columns (SQLite then uses 'all'); engine and fetch times are reported separately (default: all)"
+    )
+
+    parser.add_argument(
+        '--drop-page-cache',
+        action='store_true',
+        help="With --cache-mode cold, also evict the database files from the OS page cache (posix_fadvise)"
+    )
+
+    parser.add_argument(
+        '--parallel-jobs',
+        type=int,
+        default=0,
+        help="Run the TPC-H (engine, query) measurements as independent jobs in N worker processes, "
+             "each pinned to its own CPUs (default: 0, sequential)"
+    )
+
+    parser.add_argument(
+        '--cpus-per-job',
+        type=int,
+        default=1,
+        help="CPUs each --parallel-jobs worker is pinned to; DuckDB uses as many threads (default: 1)"
+    )
+
+    parser.add_argument(
+        '--sqlite-parallel',
+        type=int,
+        default=0,
+        help="Experimental: run TPC-H Q1 and Q6 on SQLite as N lineitem rowid-range partitions on parallel "
+             "read-only connections and merge the partial aggregates (default: 0, off)"
+    )
+
+    parser.add_argument(
+        '--duckdb-storage',
+        choices=DUCKDB_STORAGES,
+        default="native",
+        help="Where DuckDB reads the TPC-H tables from: its native database file, or Parquet files in "
+             "../sql_benchmarks/tpch/parquet through views (exported instead of CSVs, loaded into SQLite from "
+             "there and kept in the dataset cache); Parquet runs are recorded as variant duckdb-parquet "
+             "(default: native)"
+    )
+
+    parser.add_argument(
+        '--parquet-row-group-size',
+        type=int,
+        default=DEFAULT_ROW_GROUP_SIZE,
+        help=f"Rows per row group of the exported Parquet files (default: {DEFAULT_ROW_GROUP_SIZE})"
+    )
+
+    parser.add_argument(
+        '--parquet-compression',
+        choices=PARQUET_COMPRESSIONS,
+        default="zstd",
+        help="Compression codec of the exported Parquet files (default: zstd)"
+    )
+
+    parser.add_argument(
+        '--dbgen-chunks',
+        type=int,
+        default=0,
+        help="Generate TPC-H as N dbgen partitions (children/step) in worker processes, appended to DuckDB one "
+             "at a time, so large scale factors fit in memory; per-chunk times go to ../out/load "
+             "(default: 0, a single dbgen call)"
+    )
+
+    parser.add_argument(
+        '--dbgen-workers',
+        type=int,
+        default=0,
+        help="Worker processes generating --dbgen-chunks TPC-H partitions or TPC-C warehouses at the same time; "
+             "each uses CPUs / workers DuckDB threads (default: 0, one per CPU)"
+    )
+
+    parser.add_argument(
+        '--tpcc-seed',
+        type=int,
+        default=DEFAULT_SEED,
+        help=f"Seed of the generated TPC-C population; the same seed and --sf give the same data (default: {DEFAULT_SEED})"
+    )
+
+    parser.add_argument(
+        '--tpcc-csv-dir',
+        type=str,
+        default=None,
+        help="Load TPC-C from the headerless <TABLE>.csv files in this directory (e.g. written by py-tpcc) instead "
+             "of generating --sf warehouses"
+    )
+
+    parser.add_argument(
+        '--physical-design',
+        choices=list(PHYSICAL_DESIGNS),
+        default="none",
+        help="SQLite physical design applied after the TPC-H load: none (heap tables only), keys (primary and "
+             "foreign key indexes), covering (keys plus covering indexes for Q1, Q6 and Q13) or without_rowid "
+             "(tables clustered on their primary key, plus foreign key indexes). Build time and index sizes go to "
+             "../out/load; runs are recorded as variant physical-<design> (default: none)"
+    )
+
+    parser.add_argument(
+        '--verify',
+        action='store_true',
+        help="Compare the full TPC-H results of both engines after timing each query (streamed, with numeric "
+             "tolerance); reports go to ../out/verify"
+    )
+
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help="After timing each TPC-H query, run it once more with profiling: DuckDB's JSON profile (operator "
+             "timings, cardinalities) and SQLite's query plan and VM instruction count go to ../out/profile"
+    )
+
+    parser.add_argument(
+        '--result-cache-dir',
+        type=str,
+        default=None,
+        help="Directory caching query results per engine, dataset and query for --results display; "
+             "timed runs still execute every query"
+    )
+
+    parser.add_argument(
+        '--result-cache-mb',
+        type=float,
+        default=DEFAULT_RESULT_CACHE_MB,
+        help=f"Size budget of the result cache; least recently used results are evicted (default: {DEFAULT_RESULT_CACHE_MB})"
+    )
+
+    parser.add_argument(
+        '--cache-dir',
+        type=str,
+        default=None,
+        help="Directory of pre-built datasets keyed by benchmark, scale factor and schema; enables the dataset cache"
+    )
+
+    parser.add_argument(
+        '--cache-budget-gb',
+        type=float,
+        default=DEFAULT_CACHE_BUDGET_GB,
+        help=f"Disk budget of the dataset cache; least recently used datasets are evicted (default: {DEFAULT_CACHE_BUDGET_GB})"
+    )
+
+    args = parser.parse_args()
+    if args.fetch_mode == "arrow" and importlib.util.find_spec("pyarrow") is None:
+        parser.error("--fetch-mode arrow needs the pyarrow package")
+    if args.physical_design == "without_rowid" and args.sqlite_parallel > 0:
+        parser.error("--sqlite-parallel partitions lineitem by rowid and cannot run on --physical-design without_rowid")
+    if args.sqlite_parallel > 0 and args.parallel_jobs > 0:
+        parser.error("--sqlite-parallel cannot be combined with --parallel-jobs")
+    if args.results and args.parallel_jobs > 0:
+        parser.error("--results cannot be combined with --parallel-jobs, whose workers do not return query results")
+    if args.physical_design != "none" and args.benchmark != BENCHMARK.TPC_H.name:
+        parser.error("--physical-design only applies to TPC-H")
+    if args.duckdb_storage != "native" and args.benchmark != BENCHMARK.TPC_H.name:
+        parser.error("--duckdb-storage only applies to TPC-H")
+    if args.repetitions < 1 or args.warmup < 0:
+        parser.error("--repetitions must be at least 1 and --warmup cannot be negative")
+    if args.batch_size < 1:
+        parser.error("--batch-size must be at least 1")
+    if args.parquet_row_group_size < 1:
+        parser.error("--parquet-row-group-size must be at least 1")
+    if args.dbgen_chunks < 0 or args.dbgen_workers < 0:
+        parser.error("--dbgen-chunks and --dbgen-workers cannot be negative")
+    if args.dbgen_chunks > 0 and args.benchmark != BENCHMARK.TPC_H.name:
+        parser.error("--dbgen-chunks only applies to TPC-H")
+    if args.parallel_jobs < 0 or args.cpus_per_job < 1:
+        parser.error("--parallel-jobs cannot be negative and --cpus-per-job must be at least 1")
+    if args.parallel_jobs > 0 and args.parallel_jobs * args.cpus_per_job > len(available_cpus()):
+        parser.error(f"--parallel-jobs {args.parallel_jobs} x --cpus-per-job {args.cpus_per_job} "
+                     f"do not fit on {len(available_cpus())} available CPUs")
+    if args.benchmark == BENCHMARK.TPC_C.name and args.tpcc_csv_dir is None and args.sf < 1:
+        parser.error("TPC-C --sf is the number of warehouses and must be at least 1")
+    return args
 
 def main() -> None:
     """
@@ -76,10 +367,31 @@ def main() -> None:
 
     Colors.print_colored("Starting the database benchmark script...", Colors.HEADER)
 
+    schema_dir = TPC_H if selected_benchmark == BENCHMARK.TPC_H else TPC_C
+    design = design_info(args.physical_design, PHYSICAL_DIR) if args.physical_design != "none" else None
+    storage = ({"format": "parquet", "row_group_size": args.parquet_row_group_size,
+                "compression": args.parquet_compression} if args.duckdb_storage == "parquet" else None)
+    generator = ({"name": "builtin", "seed": args.tpcc_seed}
+                 if selected_benchmark == BENCHMARK.TPC_C and args.tpcc_csv_dir is None else None)
+    info = dataset_info(selected_benchmark.name, args.sf, f"{schema_dir}/setup.sql", design, storage, generator)
+    files = dataset_files(args.duckdb_storage)
+    dataset_cache = DatasetCache(args.cache_dir, args.cache_budget_gb) if args.cache_dir else None
+    result_cache = ResultCache(args.result_cache_dir, args.result_cache_mb) if args.result_cache_dir else None
+
+    # Make sure reused database files actually hold the requested dataset
+    if reuse_data:
+        stamp = read_stamp(DATASET_STAMP)
+        if stamp is None:
+            Colors.print_colored(f"No {DATASET_STAMP} found; cannot verify the reused data matches {info}.",
+                                 Colors.WARNING)
+        elif stamp != info:
+            Colors.print_colored(f"Existing data is {stamp}, but {info} was requested; regenerating.", Colors.FAIL)
+            reuse_data = False
+
     # If used the same files before, remove them
     files_to_remove: List[str] = []
     if not reuse_data:
-        files_to_remove.extend(['sqlite.db', 'duckdb.db'])
+        files_to_remove.extend([SQLITE_DB_PATH, DUCKDB_DB_PATH, DATASET_STAMP])
     for p in files_to_remove:
         try:
             os.remove(p)
@@ -87,24 +399,59 @@ def main() -> None:
         except FileNotFoundError:
             Colors.print_colored(f"File not found, skipping removal: {p}", Colors.WARNING)
 
-    sqlite_db = SQLite('sqlite.db')
-    duckdb_db = DuckDB('duckdb.db')
+    # Skip generation entirely when the dataset cache already holds this dataset
+    if not reuse_data and dataset_cache is not None:
+        methods = dataset_cache.restore(info, files, read_only=selected_benchmark == BENCHMARK.TPC_H)
+        if methods is not None:
+            write_stamp(DATASET_STAMP, info)
+            Colors.print_colored(f"Restored {info} from the dataset cache ({methods}).", Colors.OKGREEN)
+            reuse_data = True
+        else:
+            Colors.print_colored(f"Dataset cache miss for {info}.", Colors.WARNING)
+
+    # Results cached for earlier copies of this dataset can never match again
+    if not reuse_data and result_cache is not None:
+        result_cache.invalidate(info=info)
+
+    sqlite_db = SQLite(SQLITE_DB_PATH)
+    duckdb_db = DuckDB(DUCKDB_DB_PATH)
+    sqlite_db.use_prepared = duckdb_db.use_prepared = not args.adhoc_statements
+    after_load = lambda: save_dataset(sqlite_db, duckdb_db, info, dataset_cache, files)
 
     Colors.print_colored(f"Selected benchmark: {selected_benchmark.name}", Colors.OKCYAN)
 
     if selected_benchmark == BENCHMARK.TPC_H:
         run_tpch(sqlite_db, duckdb_db, run_all=args.all,
-                 reuse_data=reuse_data, show_results=show_results, scale_factor = args.sf)
+                 reuse_data=reuse_data, show_results=show_results, scale_factor = args.sf,
+                 batch_size=args.batch_size, commit_per_batch=args.commit_per_batch,
+                 bulk_load=args.bulk_load, direct_load=args.direct_load, after_load=after_load,
+                 warmup=args.warmup, repetitions=args.repetitions,
+                 cache_mode=args.cache_mode, drop_page_cache=args.drop_page_cache,
+                 parallel_jobs=args.parallel_jobs, cpus_per_job=args.cpus_per_job,
+                 sqlite_parallel=args.sqlite_parallel, result_cache=result_cache, dataset=info,
+                 verify=args.verify, fetch_mode=args.fetch_mode, profile=args.profile,
+                 physical_design=args.physical_design, duckdb_storage=args.duckdb_storage,
+                 parquet_row_group_size=args.parquet_row_group_size, parquet_compression=args.parquet_compression,
+                 dbgen_chunks=args.dbgen_chunks, dbgen_workers=args.dbgen_workers or os.cpu_count() or 1)
     elif selected_benchmark == BENCHMARK.TPC_C:
         run_tpcc(sqlite_db, duckdb_db, run_all=args.all,
-                 reuse_data=reuse_data, show_results=show_results, scale_factor = args.sf)
+                 reuse_data=reuse_data, show_results=show_results, scale_factor = args.sf,
+                 batch_size=args.batch_size, commit_per_batch=args.commit_per_batch,
+                 bulk_load=args.bulk_load, after_load=after_load,
+                 warmup=args.warmup, repetitions=args.repetitions,
+                 clients=args.clients, duration=args.duration, client_processes=args.client_processes,
+                 delivery=args.delivery, seed=args.tpcc_seed, csv_dir=args.tpcc_csv_dir,
+                 workers=args.dbgen_workers or os.cpu_count() or 1)
+        # The transactions wrote to both databases
+        if result_cache is not None:
+            result_cache.invalidate(info=info)
 
     # Clean up
     sqlite_db.close()
     duckdb_db.close()
     Colors.print_colored("Benchmark script completed successfully.", Colors.OKGREEN)
 
-def write_benchmark_output(benchmark_name: str, scale_factor: float, content: str) -> None:
+def write_benchmark_output(benchmark_name: str, scale_factor: float, content: str, out_dir: str = OUT_DIR) -> None:
     """
     Writes benchmark output to a file in ../out with a name based on the benchmark and scale factor.
     If run_number is provided, prepends "Run X:" to the content.
@@ -113,21 +460,347 @@ def write_benchmark_output(benchmark_name: str, scale_factor: float, content: st
         benchmark_name (str): Name of the benchmark (e.g., "TPC-H" or "TPC-C").
         scale_factor (float): The scale factor used.
         content (str): The content to write.
-        run_number (Optional[int]): The run number (for repeated runs).
+        out_dir (str): Directory to write to; load timings go to ../out/load to keep them apart from query timings.
     """
-    os.makedirs("../out", exist_ok=True)
+    os.makedirs(out_dir, exist_ok=True)
     file_name = f"{benchmark_name.upper()}_SF_{scale_factor}.txt"
-    file_path = os.path.join("../out", file_name)
+    file_path = os.path.join(out_dir, file_name)
     with open(file_path, "a") as f:
         f.write(content)
         if not content.endswith('\n'):
             f.write('\n')
 
+def record_timings(benchmark_name: str, scale_factor: float, label: str,
+                   sqlite_stats: Dict[str, Any], duckdb_stats: Dict[str, Any], cache_mode: str = "none",
+                   variant: str = "") -> None:
+    """
+    Prints the timing distribution of both engines and writes it to the output files:
+    one record per engine and measured repetition, with run metadata, in
+    ../out/results.jsonl (see results_store), one "<label>: SQLite=...s, DuckDB=...s"
+    line per measured repetition in ../out, and the summary statistics in ../out/stats. Cold and warm runs, and runs of an
+    execution variant, go to ../out/<mode>-<variant> so they are never averaged
+    together with each other or with unlabelled runs.
+
+    Args:
+        benchmark_name (str): Name of the benchmark (e.g., "TPC-H" or "TPC-C").
+        scale_factor (float): The scale factor used.
+        label (str): Query or transaction label, e.g. "Query 1" or "Delivery".
+        sqlite_stats (Dict[str, Any]): Statistics returned by benchmark_utils.measure for SQLite.
+        duckdb_stats (Dict[str, Any]): Statistics returned by benchmark_utils.measure for DuckDB.
+        cache_mode (str): One of CACHE_MODES.
+        variant (str): Execution variant, e.g. "sqlite-parallel-4"; empty for the default execution.
+    """
+    if cache_mode != "none":
+        Colors.print_colored(f"Cache mode: {cache_mode}", Colors.OKCYAN)
+    print_stats({"SQLite": sqlite_stats, "DuckDB": duckdb_stats})
+
+    tags = [tag for tag in (cache_mode if cache_mode != "none" else "", variant) if tag]
+    out_dir = f"{OUT_DIR}/{'-'.join(tags)}" if tags else OUT_DIR
+    content = ""
+    for sqlite_time, duckdb_time in zip(sqlite_stats["samples"], duckdb_stats["samples"]):
+        content += f"{label}: SQLite={sqlite_time:.6f}s, DuckDB={duckdb_time:.6f}s\n"
+    write_benchmark_output(benchmark_name, scale_factor, content, out_dir=out_dir)
+
+    append_records(RESULTS_PATH,
+                   measurement_records(benchmark_name, scale_factor, label, "SQLite", sqlite_stats, cache_mode, variant)
+                   + measurement_records(benchmark_name, scale_factor, label, "DuckDB", duckdb_stats, cache_mode, variant))
+
+    stats_label = f"{label} [{', '.join(tags)}]" if tags else label
+    stats_content = format_stats(stats_label, "SQLite", sqlite_stats) + format_stats(stats_label, "DuckDB", duckdb_stats)
+    write_benchmark_output(benchmark_name, scale_factor, stats_content, out_dir=STATS_OUT_DIR)
+
+def run_in_transaction(db: SQLite | DuckDB, fn: Callable[[], Any]) -> Any:
+    """
+    Runs `fn` between BEGIN and COMMIT on the given database. A body raising
+    TransactionRollback (e.g. New-Order with an unused item) is rolled back.
+
+    Args:
+        db (SQLite | DuckDB): Database handler.
+        fn (Callable[[], Any]): Transaction body.
+    """
+    db.begin()
+    try:
+        result = fn()
+    except TransactionRollback:
+        db.rollback()
+        return None
+    db.commit()
+    return result
+
+def dataset_files(duckdb_storage: str = "native") -> Dict[str, str]:
+    """
+    Working path of every file of a dataset, by its name in the dataset cache:
+    the two database files and, with Parquet storage, the Parquet files the DuckDB views read.
+    """
+    files = {SQLITE_DB_PATH: SQLITE_DB_PATH, DUCKDB_DB_PATH: DUCKDB_DB_PATH}
+    if duckdb_storage == "parquet":
+        files.update({f"{t}.parquet": f"{PARQUET_DIR}/{t}.parquet" for t in TPCH_TABLES})
+    return files
+
+def save_dataset(sqlite_db: SQLite, duckdb_db: DuckDB, info: Dict[str, Any],
+                 dataset_cache: Optional[DatasetCache] = None, files: Optional[Dict[str, str]] = None) -> None:
+    """
+    Stamps the freshly loaded database files with their dataset and, if enabled,
+    stores them in the dataset cache. Called before any query touches the data.
+
+    Args:
+        sqlite_db (SQLite): SQLite database handler.
+        duckdb_db (DuckDB): DuckDB database handler.
+        info (Dict[str, Any]): Dataset description from dataset_info.
+        dataset_cache (Optional[DatasetCache]): Cache to store the database files in.
+        files (Optional[Dict[str, str]]): Files to store (see dataset_files); the two database files by default.
+    """
+    write_stamp(DATASET_STAMP, info)
+    if dataset_cache is None:
+        return
+
+    # Flush everything into the main database files before copying them
+    sqlite_db.connection.commit()
+    duckdb_db.con.execute("CHECKPOINT;")
+    Colors.print_colored(f"Storing {info} in the dataset cache...", Colors.OKBLUE)
+    dataset_cache.store(info, files or dataset_files())
+
+def print_load_stats(table_name: str, stats: Dict[str, float]) -> None:
+    """
+    Prints the statistics returned by SQLite.load_csv for a single table.
+
+    Args:
+        table_name (str): Name of the loaded table.
+        stats (Dict[str, float]): Rows, seconds, rows/s and RSS of the load (see SQLite.load_rows).
+    """
+    growth = stats["rss_growth_mb"]
+    rss = (f"peak RSS {stats['peak_rss_mb']:.1f} MB, {growth:+.1f} MB during the load" if growth is not None
+           else f"process peak RSS {stats['peak_rss_mb']:.1f} MB")
+    Colors.print_colored(
+        f"Loaded {int(stats['rows'])} rows into {table_name} in {stats['seconds']:.2f}s "
+        f"({stats['rows_per_sec']:,.0f} rows/s, {rss})",
+        Colors.OKCYAN)
+
+def load_sqlite_tables(sqlite_db: SQLite, benchmark_name: str, scale_factor: float, tables: List[str],
+                       csv_dir: Optional[str] = None, duckdb_db: Optional[DuckDB] = None,
+                       batch_size: int = DEFAULT_BATCH_SIZE, commit_per_batch: bool = False,
+                       bulk_load: bool = False, source: Optional[str] = None) -> None:
+    """
+    Loads tables into SQLite, either from CSV files or straight from DuckDB,
+    and records the load timings under ../out/load.
+
+    Args:
+        sqlite_db (SQLite): SQLite database handler.
+        benchmark_name (str): Name of the benchmark (e.g., "TPC-H" or "TPC-C").
+        scale_factor (float): The scale factor used.
+        tables (List[str]): Tables to load, in load order.
+        csv_dir (Optional[str]): Directory holding one <table>.csv per table.
+        duckdb_db (Optional[DuckDB]): When given, rows are streamed from this DuckDB database instead of CSV files.
+        batch_size (int): Rows per batch when streaming rows into SQLite.
+        commit_per_batch (bool): Whether to commit after every batch instead of per table.
+        bulk_load (bool): Whether to relax PRAGMAs and defer secondary index builds during the load.
+        source (Optional[str]): Source recorded with the timings; "csv" or "duckdb" by default.
+    """
+    if bulk_load:
+        Colors.print_colored("Entering SQLite bulk load mode...", Colors.OKBLUE)
+        sqlite_db.begin_bulk_load()
+
+    content = ""
+    try:
+        for tbl in tables:
+            if duckdb_db is not None:
+                Colors.print_colored(f"Loading {tbl} into SQLite directly from DuckDB...", Colors.OKGREEN)
+                rows = duckdb_db.iter_table_rows(tbl, sqlite_db.column_names(tbl), batch_size=batch_size)
+                stats = sqlite_db.load_rows(tbl, rows, batch_size=batch_size,
+                                            commit_per_batch=commit_per_batch)
+            else:
+                csv_path = os.path.join(csv_dir, f"{tbl}.csv")
+                Colors.print_colored(f"Loading {tbl} into SQLite from {csv_path}...", Colors.OKGREEN)
+                stats = sqlite_db.load_csv(tbl, csv_path, batch_size=batch_size,
+                                           commit_per_batch=commit_per_batch)
+            print_load_stats(tbl, stats)
+            growth = stats["rss_growth_mb"]
+            content += (f"{tbl}: SQLite={stats['seconds']:.6f}s, rows={int(stats['rows'])}, "
+                        f"peak_rss_mb={stats['peak_rss_mb']:.1f}, "
+                        f"rss_growth_mb={f'{growth:.1f}' if growth is not None else 'n/a'}\n")
+    finally:
+        if bulk_load:
+            index_stats = sqlite_db.end_bulk_load()
+            Colors.print_colored(
+                f"Built {index_stats['indexes']} deferred indexes in {index_stats['seconds']:.2f}s "
+                "and restored durable settings.", Colors.OKCYAN)
+            content += f"Indexes: SQLite={index_stats['seconds']:.6f}s, count={index_stats['indexes']}\n"
+
+    mode = "bulk" if bulk_load else "default"
+    source = source or ("duckdb" if duckdb_db is not None else "csv")
+    write_benchmark_output(benchmark_name, scale_factor, f"# mode={mode} source={source}\n{content}",
+                           out_dir=LOAD_OUT_DIR)
+
+def read_tpch_queries(path: str) -> Dict[int, str]:
+    """
+    Reads the queries of a queries.sql file, keyed by the number of their "-- Query ID:" marker.
+
+    Args:
+        path (str): Path to the queries.sql file.
+    """
+    queries: Dict[int, str] = {}
+    with open(path, 'r') as f:
+        content = f.read()
+        # Split the content by query ID markers
+        query_blocks = content.split('-- Query ID:')
+        for block in query_blocks[1:]:  # Skip the first empty block
+            lines = block.strip().split('\n')
+            if not lines:
+                continue
+            query_id = int(lines[0].strip())
+            query_text = '\n'.join(lines[1:]).strip()
+            # Remove any trailing semicolons
+            while query_text.endswith(';'):
+                query_text = query_text[:-1].strip()
+            queries[query_id] = query_text
+    return queries
+
+def export_tpch_parquet(duckdb_db: DuckDB, scale_factor: float, row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+                        compression: str = "zstd") -> None:
+    """
+    Exports the generated TPC-H tables to Parquet and switches DuckDB over to
+    views on the files (see DuckDB.use_parquet_views). The export time and
+    the file sizes go to ../out/load.
+
+    Args:
+        duckdb_db (DuckDB): DuckDB database handler holding the generated tables.
+        scale_factor (float): The scale factor used.
+        row_group_size (int): Rows per Parquet row group.
+        compression (str): Parquet compression codec.
+    """
+    Colors.print_colored(f"Exporting TPC-H tables to Parquet ({compression}, {row_group_size} rows per row group)...",
+                         Colors.OKBLUE)
+    start = time.perf_counter()
+    sizes = duckdb_db.export_tpch_to_parquet(row_group_size=row_group_size, compression=compression)
+    seconds = time.perf_counter() - start
+    duckdb_db.use_parquet_views()
+    Colors.print_colored(f"Exported {sum(sizes.values()) / 1024 ** 2:.1f} MB of Parquet in {seconds:.2f}s; "
+                         "DuckDB now reads the tables through views on the files.", Colors.OKGREEN)
+
+    content = (f"# parquet compression={compression} row_group_size={row_group_size}\n"
+               f"Parquet export: DuckDB={seconds:.6f}s, bytes={sum(sizes.values())}\n")
+    for t, size in sizes.items():
+        content += f"{t}.parquet: bytes={size}\n"
+    write_benchmark_output("TPC-H", scale_factor, content, out_dir=LOAD_OUT_DIR)
+
+def generate_tpch_data(duckdb_db: DuckDB, scale_factor: float, chunks: int, workers: int) -> None:
+    """
+    Generates the TPC-H tables in DuckDB as `chunks` dbgen partitions (see
+    tpch_generator.generate_tpch_chunked), printing progress per chunk. The
+    total and per-chunk times, rows and worker peak RSS go to ../out/load.
+
+    Args:
+        duckdb_db (DuckDB): DuckDB database handler.
+        scale_factor (float): The scale factor used.
+        chunks (int): Number of dbgen partitions.
+        workers (int): Worker processes generating partitions at the same time.
+    """
+    lines: List[str] = []
+    summary = generate_tpch_chunked(duckdb_db, scale_factor, chunks, workers, progress=chunk_reporter("dbgen", lines))
+    Colors.print_colored(f"Generated {sum(summary['rows'].values())} rows in {summary['chunks']} chunks with "
+                         f"{summary['workers']} workers in {summary['seconds']:.2f}s.", Colors.OKGREEN)
+    content = (f"# dbgen chunks={summary['chunks']} workers={summary['workers']}\n"
+               f"dbgen: DuckDB={summary['seconds']:.6f}s, worker_peak_rss={summary['worker_peak_rss_mb']:.1f}MB, "
+               f"peak_rss={peak_rss_mb():.1f}MB\n")
+    write_benchmark_output("TPC-H", scale_factor, content + "".join(lines), out_dir=LOAD_OUT_DIR)
+
+def generate_tpcc_data(duckdb_db: DuckDB, scale_factor: float, seed: int, workers: int) -> None:
+    """
+    Generates the TPC-C population of `scale_factor` warehouses into DuckDB
+    (see tpcc_generator.generate_tpcc), printing progress per warehouse. The
+    total and per-chunk times, rows and worker peak RSS go to ../out/load.
+
+    Args:
+        duckdb_db (DuckDB): DuckDB database handler with the TPC-C schema.
+        scale_factor (float): The scale factor used, i.e. the number of warehouses.
+        seed (int): Seed of the population.
+        workers (int): Worker processes generating warehouses at the same time.
+    """
+    warehouses = warehouses_for(scale_factor)
+    Colors.print_colored(f"Generating TPC-C data for {warehouses} warehouses (seed {seed})...", Colors.OKBLUE)
+    lines: List[str] = []
+    summary = generate_tpcc(duckdb_db, warehouses, seed=seed, workers=workers,
+                            progress=chunk_reporter("generator", lines))
+    Colors.print_colored(f"Generated {sum(summary['rows'].values())} rows in {summary['chunks']} chunks with "
+                         f"{summary['workers']} workers in {summary['seconds']:.2f}s.", Colors.OKGREEN)
+    content = (f"# generator warehouses={warehouses} seed={seed} workers={summary['workers']}\n"
+               f"generator: DuckDB={summary['seconds']:.6f}s, worker_peak_rss={summary['worker_peak_rss_mb']:.1f}MB, "
+               f"peak_rss={peak_rss_mb():.1f}MB\n")
+    write_benchmark_output("TPC-C", scale_factor, content + "".join(lines), out_dir=LOAD_OUT_DIR)
+
+def chunk_reporter(name: str, lines: List[str]) -> Callable[[Dict[str, Any]], None]:
+    """
+    Progress callback of chunk_pipeline.append_chunks: prints every appended
+    chunk and adds a "<name> chunk <n>: ..." statistics line to `lines`.
+    """
+    def report(chunk: Dict[str, Any]) -> None:
+        rows = sum(chunk["rows"].values())
+        Colors.print_colored(f"  chunk {chunk['done']}/{chunk['chunks']}: {rows} rows, generated in "
+                             f"{chunk['seconds']:.2f}s, appended in {chunk['append_seconds']:.2f}s "
+                             f"({chunk['elapsed']:.1f}s elapsed)", Colors.OKCYAN)
+        lines.append(f"{name} chunk {chunk['done'] - 1}: rows={rows}, generate={chunk['seconds']:.6f}s, "
+                     f"append={chunk['append_seconds']:.6f}s, peak_rss={chunk['peak_rss_mb']:.1f}MB\n")
+    return report
+
+def apply_physical_design(sqlite_db: SQLite, name: str, scale_factor: float) -> None:
+    """
+    Applies a physical design (see physical_design.PHYSICAL_DESIGNS) to the
+    loaded TPC-H tables in SQLite and gathers statistics for the planner with
+    ANALYZE. The build time, the database size before and after and the size
+    of every table and index go to ../out/load.
+
+    Args:
+        sqlite_db (SQLite): SQLite database handler.
+        name (str): Physical design to apply.
+        scale_factor (float): The scale factor used.
+    """
+    Colors.print_colored(f"Applying SQLite physical design '{name}'...", Colors.OKBLUE)
+    sqlite_db.connection.commit()
+    size_before = database_size(sqlite_db)
+
+    start = time.perf_counter()
+    for file_name in PHYSICAL_DESIGNS[name]:
+        exec_sql_file(sqlite_db, f"{PHYSICAL_DIR}/{file_name}")
+    sqlite_db.connection.commit()
+    build_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    sqlite_db.cursor.execute("ANALYZE;")
+    sqlite_db.connection.commit()
+    analyze_seconds = time.perf_counter() - start
+
+    size_after = database_size(sqlite_db)
+    indexes = user_indexes(sqlite_db)
+    sizes = object_sizes(sqlite_db)
+    Colors.print_colored(
+        f"Built physical design '{name}' ({len(indexes)} indexes) in {build_seconds:.2f}s, ANALYZE took "
+        f"{analyze_seconds:.2f}s; database grew from {size_before / 1024 ** 2:.1f} MB to "
+        f"{size_after / 1024 ** 2:.1f} MB.", Colors.OKCYAN)
+
+    content = (f"# physical_design={name}\n"
+               f"Physical design: SQLite={build_seconds:.6f}s, indexes={len(indexes)}, "
+               f"size_before={size_before}, size_after={size_after}\n"
+               f"Analyze: SQLite={analyze_seconds:.6f}s\n")
+    # Every table and index, so the clustered tables of without_rowid are compared with heap tables plus indexes
+    for obj in sorted(set(indexes) | sizes.keys()):
+        kind = "Index" if obj in indexes else "Table"
+        content += f"{kind} {obj}: bytes={sizes.get(obj, 'unknown')}\n"
+    write_benchmark_output("TPC-H", scale_factor, content, out_dir=LOAD_OUT_DIR)
+
 ############################################
 #                  TPC-H                   #
 ############################################
 
-def run_tpch(sqlite_db: SQLite, duckdb_db: DuckDB, run_all: bool = False, reuse_data: bool = False, show_results: bool = False, scale_factor: float = 1) -> None:
+def run_tpch(sqlite_db: SQLite, duckdb_db: DuckDB, run_all: bool = False, reuse_data: bool = False, show_results: bool = False, scale_factor: float = 1,
+             batch_size: int = DEFAULT_BATCH_SIZE, commit_per_batch: bool = False, bulk_load: bool = False,
+             direct_load: bool = False, after_load: Optional[Callable[[], None]] = None,
+             warmup: int = 0, repetitions: int = 1, cache_mode: str = "none", drop_page_cache: bool = False,
+             parallel_jobs: int = 0, cpus_per_job: int = 1, sqlite_parallel: int = 0,
+             result_cache: Optional[ResultCache] = None, dataset: Optional[Dict[str, Any]] = None,
+             verify: bool = False, fetch_mode: str = "all", profile: bool = False,
+             physical_design: str = "none", duckdb_storage: str = "native",
+             parquet_row_group_size: int = DEFAULT_ROW_GROUP_SIZE, parquet_compression: str = "zstd",
+             dbgen_chunks: int = 0, dbgen_workers: int = 1) -> None:
     """
     Executes the TPC-H benchmark by setting up schemas, generating data,
     loading data, and running queries.
@@ -138,6 +811,36 @@ def run_tpch(sqlite_db: SQLite, duckdb_db: DuckDB, run_all: bool = False, reuse_
         run_all (bool): Whether to run all queries or a subset.
         reuse_data (bool): Whether to reuse existing data.
         show_results (bool): Whether to display query results.
+        batch_size (int): Rows per batch when streaming CSVs into SQLite.
+        commit_per_batch (bool): Whether to commit after every batch instead of per table.
+        bulk_load (bool): Whether to use SQLite bulk load mode for the load window.
+        direct_load (bool): Whether to stream tables from DuckDB into SQLite, skipping the CSV export.
+        after_load (Optional[Callable[[], None]]): Called once freshly generated data is loaded.
+        warmup (int): Untimed executions of each query before measuring.
+        repetitions (int): Measured executions of each query.
+        cache_mode (str): "cold" reopens both connections before every execution, "warm" runs each query
+            at least once untimed first, "none" leaves the caches as they are.
+        drop_page_cache (bool): In cold mode, also evict the database files from the OS page cache.
+        parallel_jobs (int): If > 0, run the (engine, query) measurements in that many pinned worker processes.
+        cpus_per_job (int): CPUs per worker process with parallel_jobs.
+        sqlite_parallel (int): If > 0, run the supported SQLite queries as that many rowid-range
+            partitions on parallel read-only connections (not combined with parallel_jobs).
+        result_cache (Optional[ResultCache]): Where displayed results come from, instead of the timed runs.
+        dataset (Optional[Dict[str, Any]]): Dataset description (see dataset_info), part of the result cache key.
+        verify (bool): Whether to compare the full results of both engines after timing each query.
+        fetch_mode (str): How the timed runs fetch results (see duckdb_handler.FETCH_MODES); SQLite falls back
+            to "all" for the columnar modes. Runs with another mode than "all" are recorded as variant fetch-<mode>.
+        profile (bool): Whether to profile each query on both engines after timing it (see profile_tpch_query).
+        physical_design (str): SQLite physical design applied after loading (see physical_design.PHYSICAL_DESIGNS),
+            before after_load so cached datasets include it. Runs with a design are recorded as variant
+            physical-<design>.
+        duckdb_storage (str): "parquet" exports the generated tables to Parquet instead of CSV, loads SQLite
+            from there and replaces DuckDB's tables by views over the files; runs are recorded as variant
+            duckdb-parquet. "native" keeps DuckDB's own storage.
+        parquet_row_group_size (int): Rows per row group of the Parquet files.
+        parquet_compression (str): Compression codec of the Parquet files (see duckdb_handler.PARQUET_COMPRESSIONS).
+        dbgen_chunks (int): If > 1, generate the data as that many dbgen partitions (see generate_tpch_data).
+        dbgen_workers (int): Worker processes generating partitions at the same time.
     """
     if not reuse_data:
         # Create TPC-H schema in both engines
@@ -149,45 +852,85 @@ def run_tpch(sqlite_db: SQLite, duckdb_db: DuckDB, run_all: bool = False, reuse_
 
         # Generate & export TPC-H data in DuckDB
         Colors.print_colored("Generating TPC-H data in DuckDB...", Colors.OKBLUE)
-        duckdb_db.generate_tpch(scale_factor=scale_factor)
-
-        Colors.print_colored("Exporting TPC-H tables to CSV...", Colors.OKBLUE)
-        duckdb_db.export_tpch_to_csv()
-        Colors.print_colored("TPC-H data generation and export completed.", Colors.OKGREEN)
+        if dbgen_chunks > 1:
+            generate_tpch_data(duckdb_db, scale_factor, dbgen_chunks, dbgen_workers)
+        else:
+            start = time.perf_counter()
+            duckdb_db.generate_tpch(scale_factor=scale_factor)
+            write_benchmark_output("TPC-H", scale_factor,
+                                   f"dbgen: DuckDB={time.perf_counter() - start:.6f}s\n", out_dir=LOAD_OUT_DIR)
+
+        if duckdb_storage == "parquet":
+            export_tpch_parquet(duckdb_db, scale_factor, parquet_row_group_size, parquet_compression)
+        elif direct_load:
+            Colors.print_colored("TPC-H data generation completed; skipping CSV export.", Colors.OKGREEN)
+        else:
+            Colors.print_colored("Exporting TPC-H tables to CSV...", Colors.OKBLUE)
+            duckdb_db.export_tpch_to_csv()
+            Colors.print_colored("TPC-H data generation and export completed.", Colors.OKGREEN)
 
         # Load data into SQLite
         tables: List[str] = ["region", "nation", "supplier", "customer",
                   "part", "partsupp", "orders", "lineitem"]
-        for tbl in tables:
-            csv_path = os.path.join(f"{TPC_H}/data", f"{tbl}.csv")
-            Colors.print_colored(f"Loading {tbl} into SQLite from {csv_path}...", Colors.OKGREEN)
-            sqlite_db.load_csv(tbl, csv_path)
+        # With Parquet storage the DuckDB tables are now views over the Parquet files
+        load_sqlite_tables(sqlite_db, "TPC-H", scale_factor, tables, csv_dir=f"{TPC_H}/data",
+                           duckdb_db=duckdb_db if direct_load or duckdb_storage == "parquet" else None,
+                           batch_size=batch_size, commit_per_batch=commit_per_batch, bulk_load=bulk_load,
+                           source="parquet" if duckdb_storage == "parquet" else None)
         Colors.print_colored("TPC-H data loading into SQLite completed.", Colors.OKGREEN)
+        if physical_design != "none":
+            apply_physical_design(sqlite_db, physical_design, scale_factor)
+        if after_load is not None:
+            after_load()
     else:
         Colors.print_colored("Reusing existing TPC-H data.", Colors.OKBLUE)
 
-    # Read all queries from the queries.sql file
-    queries: Dict[int, str] = {}
-    with open(f"{TPC_H}/queries.sql", 'r') as f:
-        content = f.read()
-        # Split the content by query ID markers
-        query_blocks = content.split('-- Query ID:')
-        for block in query_blocks[1:]:  # Skip the first empty block
-            lines = block.strip().split('\n')
-            if not lines:
-                continue
-            query_id = int(lines[0].strip())
-            query_text = '\n'.join(lines[1:]).strip()
-            # Remove any trailing semicolons
-            while query_text.endswith(';'):
-                query_text = query_text[:-1].strip()
-            queries[query_id] = query_text
+    queries = read_tpch_queries(f"{TPC_H}/queries.sql")
 
     # Pick which queries to run
     query_numbers: List[int] = sorted(queries.keys()) if run_all else [1, 6, 13]
 
     Colors.print_colored(f"Running benchmarks on TPC-H queries: {query_numbers}...", Colors.OKBLUE)
 
+    sqlite_setup: Optional[Callable[[], None]] = None
+    duckdb_setup: Optional[Callable[[], None]] = None
+    if cache_mode == "cold":
+        # Warmup runs would be undone by the reopen before every execution
+        warmup = 0
+        sqlite_setup = lambda: make_cold(sqlite_db, drop_page_cache)
+        duckdb_setup = lambda: make_cold(duckdb_db, drop_page_cache)
+    elif cache_mode == "warm":
+        warmup = max(warmup, 1)
+
+    sqlite_fetch_mode = fetch_mode if fetch_mode in SQLITE_FETCH_MODES else "all"
+    run_variant = "-".join(tag for tag in (f"physical-{physical_design}" if physical_design != "none" else "",
+                                           "duckdb-parquet" if duckdb_storage == "parquet" else "",
+                                           f"fetch-{fetch_mode}" if fetch_mode != "all" else "") if tag)
+
+    if parallel_jobs > 0:
+        run_tpch_parallel(sqlite_db, duckdb_db, queries, query_numbers, scale_factor=scale_factor,
+                          parallel_jobs=parallel_jobs, cpus_per_job=cpus_per_job, warmup=warmup,
+                          repetitions=repetitions, cache_mode=cache_mode, drop_page_cache=drop_page_cache,
+                          fetch_mode=fetch_mode, variant=run_variant)
+        for query_number in query_numbers:
+            if query_number not in queries:
+                continue
+            if verify:
+                verify_tpch_query(sqlite_db, duckdb_db, f"Query {query_number}",
+                                  to_sqlite_query(queries[query_number]), queries[query_number],
+                                  scale_factor, result_cache, dataset)
+            if profile:
+                profile_tpch_query(sqlite_db, duckdb_db, f"Query {query_number}",
+                                   to_sqlite_query(queries[query_number]), queries[query_number], scale_factor)
+        return
+
+    # Partitioned SQLite execution applies to the queries in sqlite_parallel.PARTIAL_AGGREGATES
+    parallel_sqlite: Optional[ParallelSQLite] = None
+    if sqlite_parallel > 0:
+        sqlite_db.connection.commit()
+        parallel_sqlite = ParallelSQLite(sqlite_db.db_path, sqlite_parallel,
+                                         {n: to_sqlite_query(queries[n]) for n in query_numbers if n in queries})
+
     # Execute the queries
     for query_number in query_numbers:
         Colors.print_colored("=" * 60, Colors.HEADER)
@@ -199,322 +942,333 @@ def run_tpch(sqlite_db: SQLite, duckdb_db: DuckDB, run_all: bool = False, reuse_
 
             # Store original query for DuckDB
             duckdb_query = query
-            
-            # Preprocess query to be compatible with SQLite
-            sqlite_query = query.replace("CAST('", "DATE('")
-            sqlite_query = sqlite_query.replace("AS date", "")
-
-            if query_number == 13:
-                sqlite_query = sqlite_query.replace("AS c_orders (c_custkey,\n        c_count)", "AS c_orders")
-                sqlite_query = sqlite_query.replace("count(o_orderkey)", "count(o_orderkey) AS c_count")
+            sqlite_query = to_sqlite_query(query)
+            sqlite_cached = duckdb_cached = None
+            if result_cache is not None:
+                sqlite_cached = lambda timed: result_cache.fetch(sqlite_db, "SQLite", dataset, sqlite_query, timed)
+                duckdb_cached = lambda timed: result_cache.fetch(duckdb_db, "DuckDB", dataset, duckdb_query, timed)
 
             Colors.print_colored(f"Executing query:\n{sqlite_query.strip()}", Colors.OKCYAN)
             Colors.print_colored("-" * 60, Colors.HEADER)
-            sqlite_time = benchmark_sqlite(sqlite_db, sqlite_query, show_results)
-            Colors.print_colored(f"SQLite Time: {sqlite_time:.6f} seconds", Colors.OKGREEN)
-            duckdb_time = benchmark_duckdb(duckdb_db, duckdb_query, show_results)
-            Colors.print_colored(f"DuckDB Time: {duckdb_time:.6f} seconds", Colors.OKGREEN)
-
-            content: str = f"Query {query_number}: SQLite={sqlite_time:.6f}s, DuckDB={duckdb_time:.6f}s\n"
-            write_benchmark_output("TPC-H", scale_factor, content, )
+            variant = run_variant
+            parallel_rows = None
+            if parallel_sqlite is not None and parallel_sqlite.supports(query_number):
+                variant = "-".join(tag for tag in (f"sqlite-parallel-{sqlite_parallel}", run_variant) if tag)
+                parallel_setup = (lambda: make_cold(parallel_sqlite, drop_page_cache)) if cache_mode == "cold" else None
+                parallel_rows, sqlite_stats = measure(lambda: parallel_sqlite.execute_query(query_number),
+                                                      warmup, repetitions, parallel_setup)
+                if show_results:
+                    print(tabulate(parallel_rows, headers=COLUMNS[query_number]))
+                Colors.print_colored(f"SQLite Time ({sqlite_parallel} partitions): "
+                                     f"{sqlite_stats['median']:.6f} seconds (median)", Colors.OKGREEN)
+            else:
+                sqlite_stats = benchmark_sqlite(sqlite_db, sqlite_query, show_results, warmup, repetitions, sqlite_setup,
+                                                sqlite_cached, sqlite_fetch_mode)
+                Colors.print_colored(f"SQLite Time: {sqlite_stats['median']:.6f} seconds (median)", Colors.OKGREEN)
+            duckdb_stats = benchmark_duckdb(duckdb_db, duckdb_query, show_results, warmup, repetitions, duckdb_setup,
+                                            duckdb_cached, fetch_mode)
+            Colors.print_colored(f"DuckDB Time: {duckdb_stats['median']:.6f} seconds (median)", Colors.OKGREEN)
+
+            record_timings("TPC-H", scale_factor, f"Query {query_number}", sqlite_stats, duckdb_stats, cache_mode,
+                           variant)
+            if verify:
+                verify_tpch_query(sqlite_db, duckdb_db, f"Query {query_number}", sqlite_query, duckdb_query,
+                                  scale_factor, result_cache, dataset, sqlite_rows=parallel_rows)
+            if profile:
+                profile_tpch_query(sqlite_db, duckdb_db, f"Query {query_number}", sqlite_query, duckdb_query,
+                                   scale_factor)
         else:
             Colors.print_colored(f"Query {query_number} not found in queries.sql", Colors.FAIL)
 
+    if parallel_sqlite is not None:
+        parallel_sqlite.close()
+    Colors.print_colored("\nFinished running TPC-H queries.", Colors.OKGREEN)
+
+def verify_tpch_query(sqlite_db: SQLite, duckdb_db: DuckDB, label: str, sqlite_query: str, duckdb_query: str,
+                      scale_factor: float = 1, result_cache: Optional[ResultCache] = None,
+                      dataset: Optional[Dict[str, Any]] = None,
+                      sqlite_rows: Optional[List[Tuple[Any, ...]]] = None) -> bool:
+    """
+    Compares the full results of a query on both engines, untimed, and writes
+    the report to ../out/verify. Rows are streamed from the engines (or taken
+    from the result cache when it holds them), so neither result set has to
+    fit in memory; results without a top-level ORDER BY are compared as
+    multisets. `sqlite_rows` are the rows a timed SQLite run returned without
+    running `sqlite_query` itself (the merged partitions of --sqlite-parallel);
+    they are verified instead of the query.
+
+    Returns:
+        bool: Whether both engines returned the same rows.
+    """
+    def rows(db: Any, engine: str, query: str) -> Any:
+        if result_cache is not None and dataset is not None:
+            cached = result_cache.get(engine, dataset, database_fingerprint(dataset, db.db_path), query)
+            if cached is not None:
+                return cached[0]
+        return db.iter_query_rows(query)
+
+    if sqlite_rows is None:
+        sqlite_rows = rows(sqlite_db, "SQLite", sqlite_query)
+    report = compare_results(sqlite_rows, rows(duckdb_db, "DuckDB", duckdb_query),
+                             ordered=has_top_level_order_by(duckdb_query))
+    content = format_verification(label, report)
+    Colors.print_colored(content.rstrip(), Colors.OKGREEN if report["match"] else Colors.FAIL)
+    write_benchmark_output("TPC-H", scale_factor, content, out_dir=VERIFY_OUT_DIR)
+    return report["match"]
+
+def profile_tpch_query(sqlite_db: SQLite, duckdb_db: DuckDB, label: str, sqlite_query: str, duckdb_query: str,
+                       scale_factor: float = 1) -> None:
+    """
+    Runs a query once more on each engine with profiling enabled, untimed, and
+    appends the profiles to ../out/profile/<benchmark>_SF_<sf>.jsonl (see
+    query_profiler.save_profiles). Prints the plan hashes and DuckDB's most
+    expensive operators.
+    """
+    profiles = {"SQLite": profile_sqlite(sqlite_db, sqlite_query), "DuckDB": profile_duckdb(duckdb_db, duckdb_query)}
+    path = save_profiles(PROFILE_OUT_DIR, "TPC-H", scale_factor, label, profiles)
+
+    Colors.print_colored(f"Profile of {label} written to {path}", Colors.OKCYAN)
+    sqlite_profile = profiles["SQLite"]
+    print(f"SQLite plan {sqlite_profile['plan_hash']}: "
+          f"{'; '.join(node['detail'] for node in sqlite_profile['plan'])} "
+          f"(~{sqlite_profile['vm_steps']} VM steps)")
+    print(f"DuckDB plan {profiles['DuckDB']['plan_hash']}, slowest operators: "
+          + ", ".join(f"{op['operator']} {op['timing_s']:.6f}s ({op['cardinality']} rows)"
+                      for op in top_operators(profiles["DuckDB"])))
+
+def run_tpch_parallel(sqlite_db: SQLite, duckdb_db: DuckDB, queries: Dict[int, str], query_numbers: List[int],
+                      scale_factor: float = 1, parallel_jobs: int = 2, cpus_per_job: int = 1, warmup: int = 0,
+                      repetitions: int = 1, cache_mode: str = "none", drop_page_cache: bool = False,
+                      fetch_mode: str = "all", variant: str = "") -> None:
+    """
+    Runs every (engine, query) measurement as an independent job in a process
+    pool (see tpch_scheduler.run_jobs) and records the timings per query once
+    both engines are done with it, as execution `variant`.
+
+    The main DuckDB connection is closed while the workers run, since DuckDB
+    does not allow read-only opens next to a read-write one.
+    """
+    Colors.print_colored(f"Scheduling {2 * len(query_numbers)} jobs on {parallel_jobs} workers "
+                         f"with {cpus_per_job} CPU(s) each...", Colors.OKBLUE)
+    # SQLite jobs are submitted first since they take far longer
+    jobs = [("SQLite", sqlite_db.db_path, str(q), to_sqlite_query(queries[q])) for q in query_numbers if q in queries]
+    jobs += [("DuckDB", duckdb_db.db_path, str(q), queries[q]) for q in query_numbers if q in queries]
+    for q in query_numbers:
+        if q not in queries:
+            Colors.print_colored(f"Query {q} not found in queries.sql", Colors.FAIL)
+
+    sqlite_db.connection.commit()
+    duckdb_db.close()
+    results: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    try:
+        for engine, label, stats, cpus in run_jobs(jobs, max_workers=parallel_jobs, cpus_per_job=cpus_per_job,
+                                                   warmup=warmup, repetitions=repetitions, cache_mode=cache_mode,
+                                                   drop_page_cache=drop_page_cache, fetch_mode=fetch_mode):
+            Colors.print_colored(f"Query {label} on {engine} (CPUs {cpus}): {stats['median']:.6f} seconds (median)",
+                                 Colors.OKGREEN)
+            results.setdefault(label, {})[engine] = stats
+            if len(results[label]) == 2:
+                record_timings("TPC-H", scale_factor, f"Query {label}", results[label]["SQLite"],
+                               results[label]["DuckDB"], cache_mode, variant)
+    finally:
+        duckdb_db.reopen()
+
     Colors.print_colored("\nFinished running TPC-H queries.", Colors.OKGREEN)
 
 ############################################
 #                  TPC-C                   #
 ############################################
 
-def run_tpcc(sqlite_db: SQLite, duckdb_db: DuckDB, run_all: bool = False, reuse_data: bool = False, show_results: bool = False, scale_factor: float = 1) -> None:
+def run_tpcc(sqlite_db: SQLite, duckdb_db: DuckDB, run_all: bool = False, reuse_data: bool = False, show_results: bool = False, scale_factor: float = 1,
+             batch_size: int = DEFAULT_BATCH_SIZE, commit_per_batch: bool = False, bulk_load: bool = False,
+             after_load: Optional[Callable[[], None]] = None, warmup: int = 0, repetitions: int = 1,
+             clients: int = 0, duration: float = 60.0, client_processes: bool = False,
+             delivery: str = "loop", seed: int = DEFAULT_SEED, csv_dir: Optional[str] = None,
+             workers: int = 1) -> None:
     """
     Executes the TPC-C benchmark by setting up schemas, generating data,
-    loading data, and running queries.
+    loading data, and running queries. With `clients` > 0, the transactions are
+    instead submitted by that many concurrent clients for `duration` seconds.
+    The data is generated from `seed` in `workers` processes, or loaded from `csv_dir` (see load_tpcc).
     """
+    if not reuse_data:
+        load_tpcc(sqlite_db, duckdb_db, scale_factor=scale_factor, batch_size=batch_size,
+                  commit_per_batch=commit_per_batch, bulk_load=bulk_load, csv_dir=csv_dir, seed=seed,
+                  workers=workers)
+        if after_load is not None:
+            after_load()
+    else:
+        Colors.print_colored("Reusing existing TPC-C data.", Colors.OKBLUE)
 
-    # Create TPC-C schema in both engines
-    schema_file = f"{TPC_C}/setup.sql"
-    Colors.print_colored("Setting up TPC-C schema...", Colors.OKBLUE)
-    exec_sql_file(sqlite_db, schema_file)
-    exec_sql_file(duckdb_db, schema_file)
-    Colors.print_colored("TPC-C schema setup completed.", Colors.OKGREEN)
-
-    tables = [
-        "WAREHOUSE",
-        "DISTRICT",
-        "CUSTOMER",
-        "HISTORY",
-        "ITEM",
-        "STOCK",
-        "ORDERS",
-        "NEW_ORDER",
-        "ORDER_LINE"
-    ]
-    for tbl in tables:
-        csv_path = os.path.join(f"/tmp/tpcc-tables", f"{tbl}.csv")
-        print(f"{Colors.OKGREEN}Loading {tbl} into SQLite from {csv_path}...{Colors.ENDC}")
-        sqlite_db.load_csv(tbl, csv_path)
-
-    for tbl in tables:
-        csv_path = os.path.join("/tmp/tpcc-tables", f"{tbl}.csv")
-        print(f"{Colors.OKGREEN}Loading {tbl} into DuckDB from {csv_path}...{Colors.ENDC}")
-        # HEADER FALSE because the CSVs are headerless
-        duckdb_db.con.execute(
-            f"COPY {tbl} FROM '{csv_path}' (DELIMITER ',', HEADER FALSE);"
-        )
+    if clients > 0:
+        run_tpcc_clients(sqlite_db, duckdb_db, scale_factor=scale_factor, clients=clients,
+                         duration=duration, client_processes=client_processes, delivery=delivery)
+        return
 
     print(f"{Colors.OKBLUE}Running TPC-C transactions {Colors.ENDC}")
 
     warehouse_id = random.randint(1,int(scale_factor))
     district_id = random.randint(1,10)
 
+    # Transaction latencies are recorded per statement mode, so prepared and ad-hoc runs can be compared
+    suffix = "" if sqlite_db.use_prepared else "-adhoc"
+
     # 1) Stock‐Level
     q = stock_level_query(warehouse_id, district_id, 100)
     Colors.print_colored(f"Stock‐Level SQL:\n{q}", Colors.OKCYAN)
 
     # SQLite
-    sqlite_db.connection.execute("BEGIN;")
-    sqlite_time = benchmark_sqlite(sqlite_db, q, True)
-    sqlite_db.connection.execute("COMMIT;")
-    Colors.print_colored(f"SQLite Time: {sqlite_time:.6f} seconds", Colors.OKGREEN)
+    stock_count, sqlite_stats = measure(
+        lambda: run_in_transaction(sqlite_db, lambda: stock_level_transaction(
+            sqlite_db, w_id=warehouse_id, d_id=district_id, threshold=100)),
+        warmup=warmup, repetitions=repetitions)
+    Colors.print_colored(f"SQLite Time: {sqlite_stats['median']:.6f} seconds (median), stock_count={stock_count}",
+                         Colors.OKGREEN)
 
     # DuckDB
-    duckdb_db.con.begin()
-    duckdb_time = benchmark_duckdb(duckdb_db, q, True)
-    duckdb_db.con.commit()
-    Colors.print_colored(f"DuckDB Time:   {duckdb_time:.6f} seconds", Colors.OKGREEN)
+    stock_count, duckdb_stats = measure(
+        lambda: run_in_transaction(duckdb_db, lambda: stock_level_transaction(
+            duckdb_db, w_id=warehouse_id, d_id=district_id, threshold=100)),
+        warmup=warmup, repetitions=repetitions)
+    Colors.print_colored(f"DuckDB Time:   {duckdb_stats['median']:.6f} seconds (median), stock_count={stock_count}",
+                         Colors.OKGREEN)
 
-    content = f"StockLevel: SQLite={sqlite_time:.6f}s, DuckDB={duckdb_time:.6f}s\n"
-    write_benchmark_output("TPC-C", scale_factor, content)
+    record_timings("TPC-C", scale_factor, "StockLevel" + suffix, sqlite_stats, duckdb_stats)
 
     # 2) Delivery
-    Colors.print_colored("Running Delivery transaction…", Colors.OKBLUE)
+    delivery_fn = DELIVERY_IMPLEMENTATIONS[delivery]
+    delivery_label = "DeliverySet" if delivery == "set" else "Delivery"
+    Colors.print_colored(f"Running {delivery_label} transaction…", Colors.OKBLUE)
+    if delivery == "set":
+        for name, db in [("SQLite", sqlite_db), ("DuckDB", duckdb_db)]:
+            if verify_delivery(db, w_id=warehouse_id, o_carrier_id=5):
+                Colors.print_colored(f"{name}: set-based Delivery matches the per-district one.", Colors.OKGREEN)
+            else:
+                Colors.print_colored(f"{name}: set-based Delivery differs from the per-district one!", Colors.FAIL)
 
     # SQLite
-    sqlite_db.connection.execute("BEGIN;")
-    start = time.perf_counter()
-    delivery_transaction(sqlite_db, w_id=warehouse_id, o_carrier_id=5)
-    sqlite_db.connection.execute("COMMIT;")
-    sqlite_latency = time.perf_counter() - start
-    Colors.print_colored(f"SQLite Delivery latency: {sqlite_latency:.6f} seconds", Colors.OKGREEN)
+    _, sqlite_stats = measure(
+        lambda: run_in_transaction(sqlite_db, lambda: delivery_fn(sqlite_db, w_id=warehouse_id, o_carrier_id=5)),
+        warmup=warmup, repetitions=repetitions)
+    Colors.print_colored(f"SQLite {delivery_label} latency: {sqlite_stats['median']:.6f} seconds (median)", Colors.OKGREEN)
 
     # DuckDB
-    duckdb_db.con.begin()
-    start = time.perf_counter()
-    delivery_transaction(duckdb_db, w_id=warehouse_id, o_carrier_id=5)
-    duckdb_db.con.commit()
-    duckdb_latency = time.perf_counter() - start
-    Colors.print_colored(f"DuckDB  Delivery latency: {duckdb_latency:.6f} seconds", Colors.OKGREEN)
-
-    content = f"Delivery: SQLite={sqlite_latency:.6f}s, DuckDB={duckdb_latency:.6f}s\n"
-    write_benchmark_output("TPC-C", scale_factor, content)
+    _, duckdb_stats = measure(
+        lambda: run_in_transaction(duckdb_db, lambda: delivery_fn(duckdb_db, w_id=warehouse_id, o_carrier_id=5)),
+        warmup=warmup, repetitions=repetitions)
+    Colors.print_colored(f"DuckDB  {delivery_label} latency: {duckdb_stats['median']:.6f} seconds (median)", Colors.OKGREEN)
 
+    record_timings("TPC-C", scale_factor, delivery_label + suffix, sqlite_stats, duckdb_stats)
 
     # 3) Order-Status
     Colors.print_colored("Running Order-Status transaction…", Colors.OKBLUE)
 
     # SQLite
-    sqlite_db.connection.execute("BEGIN;")
-    start = time.perf_counter()
-    order_status_transaction(sqlite_db, w_id=warehouse_id, d_id=district_id, by_name=True)
-    sqlite_db.connection.execute("COMMIT;")
-    sqlite_latency = time.perf_counter() - start
-    Colors.print_colored(f"SQLite Order-Status latency: {sqlite_latency:.6f} seconds", Colors.OKGREEN)
+    _, sqlite_stats = measure(
+        lambda: run_in_transaction(sqlite_db, lambda: order_status_transaction(
+            sqlite_db, w_id=warehouse_id, d_id=district_id, by_name=True)),
+        warmup=warmup, repetitions=repetitions)
+    Colors.print_colored(f"SQLite Order-Status latency: {sqlite_stats['median']:.6f} seconds (median)", Colors.OKGREEN)
 
     # DuckDB
-    duckdb_db.con.begin()
-    start = time.perf_counter()
-    order_status_transaction(duckdb_db,  w_id=warehouse_id, d_id=district_id, by_name=True)
-    duckdb_db.con.commit()
-    duckdb_latency = time.perf_counter() - start
-    Colors.print_colored(f"DuckDB  Order-Status latency: {duckdb_latency:.6f} seconds", Colors.OKGREEN)
+    _, duckdb_stats = measure(
+        lambda: run_in_transaction(duckdb_db, lambda: order_status_transaction(
+            duckdb_db, w_id=warehouse_id, d_id=district_id, by_name=True)),
+        warmup=warmup, repetitions=repetitions)
+    Colors.print_colored(f"DuckDB  Order-Status latency: {duckdb_stats['median']:.6f} seconds (median)", Colors.OKGREEN)
+
+    record_timings("TPC-C", scale_factor, "OrderStatus" + suffix, sqlite_stats, duckdb_stats)
+
+    # 4) New-Order and 5) Payment, with inputs drawn as a driver client would;
+    # both engines get the same input sequence
+    population = population_sizes(sqlite_db)
+    seed = random.randrange(2 ** 32)
+    for label, body in [("NewOrder", new_order), ("Payment", payment)]:
+        Colors.print_colored(f"Running {label} transaction…", Colors.OKBLUE)
+
+        # SQLite
+        rng = random.Random(seed)
+        _, sqlite_stats = measure(
+            lambda: run_in_transaction(sqlite_db, lambda: body(sqlite_db, warehouse_id, rng, population)),
+            warmup=warmup, repetitions=repetitions)
+        Colors.print_colored(f"SQLite {label} latency: {sqlite_stats['median']:.6f} seconds (median)", Colors.OKGREEN)
+
+        # DuckDB
+        rng = random.Random(seed)
+        _, duckdb_stats = measure(
+            lambda: run_in_transaction(duckdb_db, lambda: body(duckdb_db, warehouse_id, rng, population)),
+            warmup=warmup, repetitions=repetitions)
+        Colors.print_colored(f"DuckDB  {label} latency: {duckdb_stats['median']:.6f} seconds (median)", Colors.OKGREEN)
+
+        record_timings("TPC-C", scale_factor, label + suffix, sqlite_stats, duckdb_stats)
+
+    Colors.print_colored("Finished running TPC-C queries.", Colors.OKGREEN)
 
-    content = f"OrderStatus: SQLite={sqlite_latency:.6f}s, DuckDB={duckdb_latency:.6f}s\n"
-    write_benchmark_output("TPC-C", scale_factor, content)
 
+def run_tpcc_clients(sqlite_db: SQLite, duckdb_db: DuckDB, scale_factor: float = 1, clients: int = 4,
+                     duration: float = 60.0, client_processes: bool = False, delivery: str = "loop") -> None:
+    """
+    Runs the concurrent TPC-C driver against each engine in turn and writes
+    throughput and latency statistics to ../out/driver.
 
-    Colors.print_colored("Finished running TPC-C queries.", Colors.OKGREEN)
+    Args:
+        sqlite_db (SQLite): SQLite database handler; its connection stays idle while the clients run.
+        duckdb_db (DuckDB): DuckDB database handler the clients get cursors from.
+        scale_factor (float): The scale factor used.
+        clients (int): Number of concurrent clients.
+        duration (float): Seconds the clients keep submitting transactions.
+        client_processes (bool): Run SQLite clients as processes instead of threads.
+        delivery (str): Delivery implementation, "loop" or "set".
+    """
+    # Make sure the main connections hold no locks while the clients run
+    sqlite_db.connection.commit()
+
+    for engine in ["SQLite", "DuckDB"]:
+        Colors.print_colored(f"Running {clients} concurrent TPC-C clients on {engine} for {duration:.0f}s...",
+                             Colors.OKBLUE)
+        summary = run_driver(engine, sqlite_path=sqlite_db.db_path, duckdb_db=duckdb_db, clients=clients,
+                             duration=duration, use_processes=client_processes and engine == "SQLite",
+                             use_prepared=sqlite_db.use_prepared, delivery=delivery)
+        print_driver_report(summary)
+        write_benchmark_output("TPC-C", scale_factor, format_driver_report(summary), out_dir=DRIVER_OUT_DIR)
+
+def load_tpcc(sqlite_db: SQLite, duckdb_db: DuckDB, scale_factor: float = 1,
+              batch_size: int = DEFAULT_BATCH_SIZE, commit_per_batch: bool = False, bulk_load: bool = False,
+              csv_dir: Optional[str] = None, seed: int = DEFAULT_SEED, workers: int = 1) -> None:
+    """
+    Creates the TPC-C schema in both engines and loads the initial population:
+    generated into DuckDB with one warehouse per unit of scale factor (see
+    generate_tpcc_data) and streamed from there into SQLite, or, with
+    `csv_dir`, loaded into both from the headerless <TABLE>.csv files there.
+    """
+    # Create TPC-C schema in both engines
+    schema_file = f"{TPC_C}/setup.sql"
+    Colors.print_colored("Setting up TPC-C schema...", Colors.OKBLUE)
+    exec_sql_file(sqlite_db, schema_file)
+    exec_sql_file(duckdb_db, schema_file)
+    Colors.print_colored("TPC-C schema setup completed.", Colors.OKGREEN)
+
+    tables = TPCC_TABLES
+    if csv_dir is None:
+        generate_tpcc_data(duckdb_db, scale_factor, seed, workers)
+        load_sqlite_tables(sqlite_db, "TPC-C", scale_factor, tables, duckdb_db=duckdb_db, batch_size=batch_size,
+                           commit_per_batch=commit_per_batch, bulk_load=bulk_load)
+        return
 
+    load_sqlite_tables(sqlite_db, "TPC-C", scale_factor, tables, csv_dir=csv_dir, batch_size=batch_size,
+                       commit_per_batch=commit_per_batch, bulk_load=bulk_load)
 
-def stock_level_query(w_id: int, d_id: int, threshold: int) -> str:
-    return f"""
-    WITH d AS (
-      SELECT d_next_o_id AS next_o_id
-        FROM district
-       WHERE d_w_id = {w_id}
-         AND d_id   = {d_id}
-    )
-    SELECT
-      COUNT(DISTINCT s.s_i_id) AS stock_count
-    FROM order_line AS ol
-      JOIN stock AS s
-        ON s.s_i_id = ol.ol_i_id
-       AND s.s_w_id = {w_id}
-    WHERE
-          ol.ol_w_id = {w_id}
-      AND ol.ol_d_id = {d_id}
-      AND ol.ol_o_id <  (SELECT next_o_id      FROM d)
-      AND ol.ol_o_id >= (SELECT next_o_id - 20 FROM d)
-      AND s.s_quantity <  {threshold}
-    ;
-    """
-
-
-def delivery_transaction(db, w_id: int, o_carrier_id: int, districts_per_warehouse: int = 10):
-    now = datetime.now().isoformat(sep=' ')
-
-    for d_id in range(1, districts_per_warehouse + 1):
-        # 1) Find the smallest new_order ID for this (w_id, d_id)
-        sql = f"""
-            SELECT MIN(no_o_id)
-              FROM new_order
-             WHERE no_w_id = {w_id}
-               AND no_d_id = {d_id}
-        """
-        rows, _, _ = db.execute_query(sql)
-        if not rows or rows[0][0] is None:
-            # no pending orders
-            continue
-        no_o_id = rows[0][0]
-
-        # 2) Delete it from new_order
-        db.execute_query(f"""
-            DELETE FROM new_order
-             WHERE no_w_id = {w_id}
-               AND no_d_id = {d_id}
-               AND no_o_id = {no_o_id}
-        """)
-
-        # 3) Lookup the customer id for that order
-        rows, _, _ = db.execute_query(f"""
-            SELECT o_c_id
-              FROM orders
-             WHERE o_w_id = {w_id}
-               AND o_d_id = {d_id}
-               AND o_id   = {no_o_id}
-        """)
-        c_id = rows[0][0]
-
-        # 4) Update the order’s carrier
-        db.execute_query(f"""
-            UPDATE orders
-               SET o_carrier_id = {o_carrier_id}
-             WHERE o_w_id       = {w_id}
-               AND o_d_id       = {d_id}
-               AND o_id         = {no_o_id}
-        """)
-
-        # 5) Stamp order_line rows with delivery timestamp
-        db.execute_query(f"""
-            UPDATE order_line
-               SET ol_delivery_d = '{now}'
-             WHERE ol_w_id       = {w_id}
-               AND ol_d_id       = {d_id}
-               AND ol_o_id       = {no_o_id}
-        """)
-
-        # 6) Sum up the line amounts
-        rows, _, _ = db.execute_query(f"""
-            SELECT COALESCE(SUM(ol_amount), 0)
-              FROM order_line
-             WHERE ol_w_id = {w_id}
-               AND ol_d_id = {d_id}
-               AND ol_o_id = {no_o_id}
-        """)
-        total = rows[0][0]
-
-        # 7) Add that to the customer’s balance
-        db.execute_query(f"""
-            UPDATE customer
-               SET c_balance = c_balance + {total}
-             WHERE c_w_id   = {w_id}
-               AND c_d_id   = {d_id}
-               AND c_id     = {c_id}
-        """)
-
-
-def order_status_transaction(
-    db,
-    w_id: int,
-    d_id: int,
-    by_name: bool = True,
-    c_last: Optional[str] = None,
-    c_id:   Optional[int] = None
-) -> Dict[str, Any]:
-
-    rows, _, _ = db.execute_query(f"""
-        SELECT DISTINCT o_c_id
-          FROM orders
-         WHERE o_w_id = {w_id}
-           AND o_d_id = {d_id}
-         LIMIT 1
-    """)
-    if not rows:
-        raise RuntimeError(f"No orders found in W={w_id}, D={d_id}")
-    found_c_id = rows[0][0]
-
-    sql_c = f"""
-    SELECT c_balance, c_first, c_middle, c_last, c_id
-      FROM customer
-     WHERE c_w_id = {w_id}
-       AND c_d_id = {d_id}
-       AND c_id   = {found_c_id}
-    ;
-    """
-    rows, _, _ = db.execute_query(sql_c)
-    if not rows:
-        raise RuntimeError(f"Customer {found_c_id} not found in W={w_id}, D={d_id}")
-    c_balance, c_first, c_middle, c_last, c_id = rows[0]
-
-    sql_o = f"""
-    SELECT o_id, o_carrier_id, o_entry_d
-      FROM orders
-     WHERE o_w_id = {w_id}
-       AND o_d_id = {d_id}
-       AND o_c_id = {c_id}
-     ORDER BY o_id DESC
-     LIMIT 1
-    ;
-    """
-    rows, _, _ = db.execute_query(sql_o)
-    if not rows:
-        raise RuntimeError(f"No orders found for customer {c_id} in W={w_id}, D={d_id}")
-    o_id, o_carrier_id, o_entry_d = rows[0]
-
-    sql_lines = f"""
-    SELECT ol_i_id, ol_supply_w_id, ol_quantity, ol_amount, ol_delivery_d
-      FROM order_line
-     WHERE ol_w_id = {w_id}
-       AND ol_d_id = {d_id}
-       AND ol_o_id = {o_id}
-    ;
-    """
-    line_rows, _, _ = db.execute_query(sql_lines)
-
-    return {
-        "customer": {
-            "c_id":      c_id,
-            "c_last":    c_last,
-            "c_balance": c_balance,
-            "c_first":   c_first,
-            "c_middle":  c_middle,
-        },
-        "order": {
-            "o_id":         o_id,
-            "o_carrier_id": o_carrier_id,
-            "o_entry_d":    o_entry_d
-        },
-        "lines": [
-            {
-                "ol_i_id":        lr[0],
-                "ol_supply_w_id": lr[1],
-                "ol_quantity":    lr[2],
-                "ol_amount":      lr[3],
-                "ol_delivery_d":  lr[4]
-            }
-            for lr in line_rows
-        ]
-    }
+    content = ""
+    for tbl in tables:
+        csv_path = os.path.join(csv_dir, f"{tbl}.csv")
+        print(f"{Colors.OKGREEN}Loading {tbl} into DuckDB from {csv_path}...{Colors.ENDC}")
+        start = time.perf_counter()
+        # HEADER FALSE because the CSVs are headerless
+        duckdb_db.con.execute(
+            f"COPY {tbl} FROM '{csv_path}' (DELIMITER ',', HEADER FALSE);"
+        )
+        content += f"{tbl}: DuckDB={time.perf_counter() - start:.6f}s\n"
+    write_benchmark_output("TPC-C", scale_factor, content, out_dir=LOAD_OUT_DIR)
 
 def exec_sql_file(db: SQLite | DuckDB, path: str) -> None:
     """
@@ -1,14 +1,40 @@
-from typing import List, Tuple, Any
+from typing import List, Tuple, Any, Iterator, Dict, Set, Sequence
 import duckdb
+import json
 import os
+import tempfile
+import time
+
+from sql_params import inline_parameters, numbered_placeholders, sql_literal
+
+# How execute_fetch hands result rows to Python: "all" builds the full list of tuples, "stream" walks
+# the result in fetchmany chunks and keeps only the row count, "count" runs the query unchanged and
+# takes the row count of its columnar (NumPy) result without building tuples, "numpy" and "arrow"
+# fetch the result as columns (NumPy arrays / an Arrow table, which needs pyarrow)
+FETCH_MODES = ("all", "stream", "count", "numpy", "arrow")
 
 SQL_BENCHMARKS_DIR = "../sql_benchmarks"
 TPC_H = SQL_BENCHMARKS_DIR + "/tpch"
+PARQUET_DIR = TPC_H + "/parquet"
+TPCH_TABLES = ["region", "nation", "supplier", "customer", "part", "partsupp", "orders", "lineitem"]
+
+# Parquet export settings: codecs DuckDB writes, and its default rows per row group
+PARQUET_COMPRESSIONS = ("zstd", "snappy", "gzip", "lz4", "brotli", "uncompressed")
+DEFAULT_ROW_GROUP_SIZE = 122_880
 
 class DuckDB:
     """Interface for interacting with DuckDB database (incl. TPC-H extension)."""
-    def __init__(self, db_path: str) -> None:
-        self.con: duckdb.DuckDBPyConnection = duckdb.connect(db_path)
+    def __init__(self, db_path: str, read_only: bool = False) -> None:
+        self.db_path: str = db_path
+        self.read_only: bool = read_only
+        self.con: duckdb.DuckDBPyConnection = duckdb.connect(db_path, read_only=read_only)
+        # Whether execute_prepared runs PREPAREd statements (True) or inlines the parameters
+        self.use_prepared: bool = True
+        self.__statements: Dict[str, str] = {}
+        self.__prepared: Set[str] = set()
+        if read_only:
+            # Secondary handler (e.g. a benchmark worker process); the read-write one sets up the extension
+            return
         self.con.execute("INSTALL tpch;")
         self.con.execute("LOAD tpch;")
 
@@ -30,6 +56,18 @@ class DuckDB:
         # This will create all 8 standard TPC-H tables
         self.con.execute(f"CALL dbgen(sf={scale_factor});")
 
+    def append_tables(self, db_path: str, tables: List[str]) -> None:
+        """
+        Append the rows of the given tables of another DuckDB database file
+        (attached read-only) to the tables of the same names in this one.
+        """
+        self.con.execute(f"ATTACH '{db_path}' AS appended (READ_ONLY);")
+        try:
+            for t in tables:
+                self.con.execute(f"INSERT INTO {t} SELECT * FROM appended.{t};")
+        finally:
+            self.con.execute("DETACH appended;")
+
     def export_tpch_to_csv(self) -> None:
         """Export each TPC-H table to a CSV (with HEADER) under tpch/data/."""
         os.makedirs(TPC_H + "/data", exist_ok=True)
@@ -40,6 +78,75 @@ class DuckDB:
             # HEADER ensures column names in row 1
             self.con.execute(f"COPY {t} TO '{dst}' (HEADER, DELIMITER ',');")
 
+    def export_tpch_to_parquet(self, out_dir: str = PARQUET_DIR, row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+                               compression: str = "zstd") -> Dict[str, int]:
+        """
+        Export each TPC-H table to a Parquet file under tpch/parquet/.
+
+        Returns:
+            Dict[str, int]: Size in bytes of each table's file.
+        """
+        if compression not in PARQUET_COMPRESSIONS:
+            raise ValueError(f"Unsupported Parquet compression: {compression}")
+        os.makedirs(out_dir, exist_ok=True)
+        sizes: Dict[str, int] = {}
+        for t in TPCH_TABLES:
+            dst = os.path.join(out_dir, f"{t}.parquet")
+            self.con.execute(f"COPY {t} TO '{dst}' "
+                             f"(FORMAT PARQUET, ROW_GROUP_SIZE {row_group_size}, COMPRESSION {compression});")
+            sizes[t] = os.path.getsize(dst)
+        return sizes
+
+    def use_parquet_views(self, parquet_dir: str = PARQUET_DIR) -> None:
+        """
+        Replace the TPC-H tables by views over their Parquet files (see
+        export_tpch_to_parquet), so the unchanged queries scan Parquet instead
+        of DuckDB's native storage. The connection is reopened afterwards,
+        since DuckDB only gives the space of the dropped tables back on close.
+        """
+        for t in TPCH_TABLES:
+            path = os.path.join(parquet_dir, f"{t}.parquet")
+            self.con.execute(f"DROP TABLE IF EXISTS {t};")
+            self.con.execute(f"CREATE VIEW {t} AS SELECT * FROM read_parquet('{path}');")
+        self.con.execute("CHECKPOINT;")
+        self.con.close()
+        self.reopen()
+
+    def iter_table_rows(self, table_name: str, columns: List[str], batch_size: int = 100_000) -> Iterator[Tuple[Any, ...]]:
+        """
+        Stream the rows of a table in `fetchmany` chunks, in the given column order.
+
+        DECIMAL columns are fetched as DOUBLE and DATE columns as ISO text so the
+        values can be bound directly by sqlite3 and compare like the CSV-loaded data.
+        """
+        types = dict(self.con.execute(
+            "SELECT column_name, data_type FROM information_schema.columns WHERE table_name = ?;",
+            [table_name]).fetchall())
+        select_list = []
+        for col in columns:
+            col_type = types.get(col, "").upper()
+            if col_type.startswith("DECIMAL"):
+                select_list.append(f"CAST({col} AS DOUBLE)")
+            elif col_type == "DATE":
+                select_list.append(f"CAST({col} AS VARCHAR)")
+            else:
+                select_list.append(col)
+
+        yield from self.iter_query_rows(f"SELECT {', '.join(select_list)} FROM {table_name};", batch_size)
+
+    def iter_query_rows(self, query: str, batch_size: int = 100_000) -> Iterator[Tuple[Any, ...]]:
+        """Stream the result rows of a query in `fetchmany` chunks on a separate cursor."""
+        cur = self.con.cursor()
+        try:
+            cur.execute(query)
+            while True:
+                chunk = cur.fetchmany(batch_size)
+                if not chunk:
+                    break
+                yield from chunk
+        finally:
+            cur.close()
+
     def __get_column_metadata(self, result: duckdb.DuckDBPyRelation) -> Tuple[List[str], List[str]]:
         col_names: List[str] = result.columns
         col_types: List[str] = [str(t).split('.')[-1] for t in result.types]
@@ -56,5 +163,134 @@ class DuckDB:
             names, types = [], []
         return rows, names, types
 
+    def execute_fetch(self, query: str, fetch_mode: str = "all", fetch_metadata: bool = False,
+                      batch_size: int = 100_000) -> Tuple[Any, List[str], List[str], int]:
+        """
+        Execute a query and retrieve its result according to `fetch_mode` (see FETCH_MODES).
+
+        DuckDB computes the whole result in execute(), so the fetch time is
+        only the conversion into Python objects.
+
+        Returns:
+            Tuple[Any, List[str], List[str], int]: the rows ("all"), the row count ("stream", "count"),
+            a dict of NumPy arrays ("numpy") or an Arrow table ("arrow"); the column names and types
+            (if fetch_metadata), and the nanoseconds spent fetching.
+        """
+        if fetch_mode not in FETCH_MODES:
+            raise ValueError(f"Unsupported DuckDB fetch mode: {fetch_mode}")
+        # "count" never wraps the query in a count(*): the optimizer would then drop the columns
+        # nobody reads (e.g. every aggregate of Q1) and a cheaper query would be timed
+        cur = self.con.execute(query)
+        start = time.perf_counter_ns()
+        if fetch_mode == "all":
+            result: Any = cur.fetchall()
+        elif fetch_mode == "count":
+            result = len(next(iter(cur.fetchnumpy().values())))
+        elif fetch_mode == "numpy":
+            result = cur.fetchnumpy()
+        elif fetch_mode == "arrow":
+            result = cur.fetch_arrow_table()
+        else:
+            result = 0
+            while True:
+                chunk = cur.fetchmany(batch_size)
+                if not chunk:
+                    break
+                result += len(chunk)
+        fetch_ns = time.perf_counter_ns() - start
+
+        # Binding the relation resolves the column types without executing the query again
+        names, types = self.__get_column_metadata(self.con.sql(query)) if fetch_metadata else ([], [])
+        return result, names, types, fetch_ns
+
+    def result_metadata(self, query: str) -> Tuple[List[str], List[str]]:
+        """Column names and types of a query's result; binding the relation resolves them without executing it."""
+        return self.__get_column_metadata(self.con.sql(query))
+
+    def profile_query(self, query: str, batch_size: int = 100_000) -> Dict[str, Any]:
+        """
+        Execute a query once with DuckDB's JSON profiling enabled and return the
+        profile: latency, CPU time, rows scanned/returned and the operator tree
+        with per-operator timings and cardinalities.
+        """
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "profile.json")
+            self.con.execute("SET enable_profiling = 'json';")
+            self.con.execute(f"SET profiling_output = '{path}';")
+            try:
+                cur = self.con.execute(query)
+                # The profile is written once the result has been consumed
+                while cur.fetchmany(batch_size):
+                    pass
+            finally:
+                self.con.execute("PRAGMA disable_profiling;")
+                self.con.execute("RESET profiling_output;")
+            with open(path, "r") as f:
+                return json.load(f)
+
+    def prepare(self, name: str, sql: str) -> None:
+        """
+        Register a statement with `?` placeholders under a name.
+
+        The Python API prepares a parameterized statement anew on every
+        execute() call, so registered statements are PREPAREd in SQL once per
+        connection and run with EXECUTE.
+        """
+        self.__statements[name] = sql
+        self.__prepared.discard(name)
+
+    def has_statement(self, name: str) -> bool:
+        return name in self.__statements
+
+    def execute_prepared(self, name: str, params: Sequence[Any] = ()) -> List[Tuple[Any, ...]]:
+        """
+        Execute a registered statement with the given parameters, or, when
+        `use_prepared` is off, as an ad-hoc statement with the parameters inlined.
+        """
+        sql = self.__statements[name]
+        if not self.use_prepared:
+            return self.con.execute(inline_parameters(sql, params)).fetchall()
+        if name not in self.__prepared:
+            self.con.execute(f"PREPARE {name} AS {numbered_placeholders(sql)}")
+            self.__prepared.add(name)
+        # EXECUTE does not accept bound parameters itself; its arguments are literals
+        args = ", ".join(sql_literal(p) for p in params)
+        return self.con.execute(f"EXECUTE {name}({args})" if params else f"EXECUTE {name}").fetchall()
+
+    def begin(self) -> None:
+        self.con.begin()
+
+    def commit(self) -> None:
+        self.con.commit()
+
+    def rollback(self) -> None:
+        self.con.rollback()
+
+    def client(self) -> "DuckDB":
+        """
+        A handler on a new cursor of this connection, for use by another thread.
+
+        DuckDB allows a single read-write process per database file, so
+        concurrent clients share the database through cursors.
+        """
+        handler = DuckDB.__new__(DuckDB)
+        handler.db_path = self.db_path
+        handler.read_only = self.read_only
+        handler.con = self.con.cursor()
+        handler.use_prepared = self.use_prepared
+        handler.__statements = dict(self.__statements)
+        handler.__prepared = set()  # prepared statements belong to a connection
+        return handler
+
+    def reopen(self) -> None:
+        """
+        Open a fresh connection to the same file, discarding DuckDB's buffer
+        manager state. The current connection is closed first, releasing its
+        file lock (closing it twice is harmless, e.g. after make_cold's close).
+        """
+        self.close()
+        self.con = duckdb.connect(self.db_path, read_only=self.read_only)
+        self.__prepared = set()
+
     def close(self) -> None:
         self.con.close()
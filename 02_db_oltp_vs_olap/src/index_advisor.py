@@ -0,0 +1,373 @@
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+import argparse
+import os
+import re
+import shutil
+import tempfile
+
+from tabulate import tabulate
+
+from benchmark_utils import measure
+from dataset_cache import copy_file, read_stamp
+from db_benchmark import TPC_H, OUT_DIR, SQLITE_DB_PATH, DATASET_STAMP, read_tpch_queries, write_benchmark_output
+from physical_design import object_size
+from sql_dialect import to_sqlite_query
+from sqlite_handler import SQLite
+from tpcc_transactions import STATEMENTS
+
+ADVISOR_OUT_DIR = OUT_DIR + "/advisor"
+INDEX_PREFIX = "advisor_"
+# Covering candidates are only proposed up to this many columns
+MAX_INDEX_COLUMNS = 8
+
+# EXPLAIN QUERY PLAN details the advisor reacts to (older SQLite versions print "SCAN TABLE t AS a")
+PLAN_SCAN = re.compile(r"^SCAN (?:TABLE )?(\w+)(?: AS (\w+))?(?: USING (?:COVERING )?INDEX \w+)?$")
+PLAN_AUTOMATIC_INDEX = re.compile(
+    r"^SEARCH (?:TABLE )?(\w+)(?: AS (\w+))? USING AUTOMATIC (?:PARTIAL )?(?:COVERING )?INDEX \(([^)]*)\)")
+PLAN_TEMP_BTREE = re.compile(r"^USE TEMP B-TREE FOR (?:RIGHT PART OF |LAST \d+ TERMS OF )?(ORDER BY|GROUP BY)")
+
+# <column> <operator> <operand>: the predicates an index can serve
+PREDICATE = re.compile(
+    r"(?:\b\w+\.)?\b(\w+)\s*(=|<=|>=|<|>|\bbetween\b|\blike\b|\bin\b)\s*((?:\w+\.)?\w+|'[^']*'|\?|\()",
+    re.IGNORECASE)
+# A `?` placeholder, with the column it is compared with or assigned to when there is one
+PLACEHOLDER = re.compile(r"(?:(?:\b\w+\.)?\b(\w+)\s*(?:=|<=|>=|<|>)\s*)?\?")
+CLAUSE_END = r"(?=\bhaving\b|\border\s+by\b|\blimit\b|\)|;|$)"
+# Words that can follow a table name without being its alias
+SQL_KEYWORDS = {"where", "join", "inner", "left", "right", "full", "outer", "cross", "natural", "on", "using", "group",
+                "order", "having", "limit", "union", "set", "values", "select", "from", "and", "or", "as", "not",
+                "exists", "in"}
+
+
+class Statement:
+    """A query or transaction statement to advise on, with the parameters it is planned and timed with."""
+    def __init__(self, label: str, sql: str, params: Optional[Sequence[Any]] = None) -> None:
+        self.label: str = label
+        self.sql: str = sql
+        # None when no parameter values could be sampled: the statement is then planned but not timed
+        self.params: Optional[Sequence[Any]] = params
+        self.writes: bool = not sql.lstrip().upper().startswith(("SELECT", "WITH"))
+
+
+class Schema:
+    """Tables, columns and existing indexes of a SQLite database, with names in lower case."""
+    def __init__(self, db: SQLite) -> None:
+        db.cursor.execute("SELECT lower(name) FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%';")
+        self.tables: List[str] = [name for name, in db.cursor.fetchall()]
+        self.columns: Dict[str, List[str]] = {
+            table: [name.lower() for _, name, *_ in db.cursor.execute(f"PRAGMA table_info({table});").fetchall()]
+            for table in self.tables}
+        # Column names are prefixed per table in both benchmarks, so a column name identifies its table
+        self.table_of: Dict[str, str] = {column: table for table, columns in self.columns.items() for column in columns}
+        self.indexes: Dict[str, List[List[str]]] = {}
+        for table in self.tables:
+            for _, name, *_ in db.cursor.execute(f"PRAGMA index_list({table});").fetchall():
+                columns = [(column or "").lower() for _, _, column in
+                           db.cursor.execute(f"PRAGMA index_info(\"{name}\");").fetchall()]
+                self.indexes.setdefault(table, []).append(columns)
+
+    def is_indexed(self, table: str, columns: List[str]) -> bool:
+        """Whether an existing index starts with `columns`."""
+        return any(index[:len(columns)] == columns for index in self.indexes.get(table, []))
+
+
+def table_aliases(sql: str, schema: Schema) -> Dict[str, str]:
+    """Maps every table name and alias of a query (as EXPLAIN QUERY PLAN prints them) to its table."""
+    aliases = {table: table for table in schema.tables}
+    for table in schema.tables:
+        for match in re.finditer(rf"\b{table}\s+(?:as\s+)?(\w+)", sql, re.IGNORECASE):
+            alias = match.group(1).lower()
+            if alias not in SQL_KEYWORDS and alias not in schema.table_of:
+                aliases[alias] = table
+    return aliases
+
+
+def predicates(sql: str, schema: Schema) -> Dict[str, Dict[str, List[str]]]:
+    """
+    Columns of each table compared with a value ("equality", e.g. x = 'a',
+    x = ?, x IN (...)), with another column ("join", only =) or by a range
+    ("range": <, >, BETWEEN, LIKE 'prefix%'), in order of appearance.
+    """
+    found: Dict[str, Dict[str, List[str]]] = {}
+
+    def add(kind: str, column: str) -> None:
+        columns = found.setdefault(schema.table_of[column], {"equality": [], "join": [], "range": []})[kind]
+        if column not in columns:
+            columns.append(column)
+
+    for match in PREDICATE.finditer(sql):
+        column, operator, operand = match.group(1).lower(), match.group(2).lower(), match.group(3)
+        if column not in schema.table_of:
+            continue
+        other = operand.split(".")[-1].lower()
+        if other in schema.table_of:
+            if operator == "=":
+                add("join", column)
+                add("join", other)
+        elif operator in ("=", "in"):
+            add("equality", column)
+        elif operator == "like":
+            if operand.startswith("'") and operand[1:2] not in ("%", "_", "'"):
+                add("range", column)
+        else:
+            add("range", column)
+    return found
+
+
+def clause_columns(sql: str, clause: str, schema: Schema) -> List[List[str]]:
+    """The columns of every GROUP BY or ORDER BY clause of a query."""
+    keyword = clause.replace(" ", r"\s+")
+    clauses = []
+    for match in re.finditer(rf"\b{keyword}\b(.*?){CLAUSE_END}", sql, re.IGNORECASE | re.DOTALL):
+        columns = []
+        for item in match.group(1).split(","):
+            words = re.findall(r"\w+", item.lower())
+            if words and words[-1] in ("asc", "desc"):
+                words = words[:-1]
+            # Only plain (possibly qualified) columns can be read in index order
+            if not words or words[-1] not in schema.table_of or len(words) > 2:
+                columns = []
+                break
+            columns.append(words[-1])
+        if columns:
+            clauses.append(columns)
+    return clauses
+
+
+def referenced_columns(sql: str, table: str, schema: Schema) -> List[str]:
+    columns = []
+    for word in re.findall(r"\w+", sql.lower()):
+        if schema.table_of.get(word) == table and word not in columns:
+            columns.append(word)
+    return columns
+
+
+def candidate_indexes(statement: Statement, plan: List[Dict[str, Any]], schema: Schema
+                      ) -> List[Tuple[str, Tuple[str, ...], str]]:
+    """
+    Proposes indexes for the full scans, automatic (per-execution) indexes
+    and temporary sort B-trees in a statement's plan.
+
+    Returns:
+        List[Tuple[str, Tuple[str, ...], str]]: (table, columns, reason) per candidate.
+    """
+    aliases = table_aliases(statement.sql, schema)
+    filters = predicates(statement.sql, schema)
+    candidates: List[Tuple[str, Tuple[str, ...], str]] = []
+
+    def propose(table: str, columns: List[str], reason: str) -> None:
+        columns = list(dict.fromkeys(columns))
+        if columns and len(columns) <= MAX_INDEX_COLUMNS and not schema.is_indexed(table, columns):
+            candidates.append((table, tuple(columns), reason))
+
+    for node in plan:
+        detail = node["detail"]
+        scan, automatic, temp_btree = PLAN_SCAN.match(detail), PLAN_AUTOMATIC_INDEX.match(detail), \
+            PLAN_TEMP_BTREE.match(detail)
+        if scan is not None and scan.group(1).lower() in aliases:
+            table = aliases[scan.group(1).lower()]
+            table_filters = filters.get(table, {"equality": [], "join": [], "range": []})
+            key = table_filters["equality"] + table_filters["range"][:1]
+            propose(table, key, "scan")
+            # The same index with every other column the statement reads, so the table rows are never visited
+            if key:
+                propose(table, key + referenced_columns(statement.sql, table, schema), "covering scan")
+            for column in table_filters["join"]:
+                propose(table, [column] + table_filters["equality"], "join on scan")
+        elif automatic is not None and automatic.group(1).lower() in aliases:
+            columns = [term.split("=")[0].strip().lower() for term in automatic.group(3).split(" AND ")]
+            propose(aliases[automatic.group(1).lower()], columns, "automatic index")
+        elif temp_btree is not None:
+            clause = temp_btree.group(1).lower()
+            for columns in clause_columns(statement.sql, clause, schema):
+                tables = {schema.table_of[column] for column in columns}
+                if len(tables) == 1:
+                    table = tables.pop()
+                    propose(table, filters.get(table, {"equality": []})["equality"] + columns, clause)
+    return candidates
+
+
+def sample_parameters(db: SQLite, sql: str, schema: Schema) -> Optional[List[Any]]:
+    """
+    Values for the placeholders of a statement: each `?` compared with or
+    assigned to a column gets that column's value in the first row of its
+    table, so the key columns of one table are consistent with each other.
+    None if some placeholder is not tied to a known column.
+    """
+    params = []
+    for match in PLACEHOLDER.finditer(sql):
+        column = (match.group(1) or "").lower()
+        if column not in schema.table_of:
+            return None
+        row = db.cursor.execute(f"SELECT {column} FROM {schema.table_of[column]} LIMIT 1;").fetchone()
+        if row is None:
+            return None
+        params.append(row[0])
+    return params
+
+
+def benchmark_statements(db: SQLite, benchmark: str, run_all: bool, schema: Schema) -> List[Statement]:
+    """The TPC-H queries (in SQLite's dialect) or the TPC-C transaction statements (without the INSERTs)."""
+    if benchmark == "TPC_H":
+        queries = read_tpch_queries(f"{TPC_H}/queries.sql")
+        numbers = sorted(queries) if run_all else [1, 6, 13]
+        return [Statement(f"Query {n}", to_sqlite_query(queries[n]), []) for n in numbers if n in queries]
+    return [Statement(name, sql.strip().rstrip(";"), sample_parameters(db, sql, schema))
+            for name, sql in STATEMENTS.items() if not sql.lstrip().upper().startswith("INSERT")]
+
+
+def execute_statement(db: SQLite, statement: Statement) -> int:
+    """Runs a statement to completion; statements that write are rolled back, so every run sees the same data."""
+    if statement.writes:
+        db.begin()
+    try:
+        return len(db.cursor.execute(statement.sql, statement.params).fetchall())
+    finally:
+        if statement.writes:
+            db.rollback()
+
+
+def time_statement(db: SQLite, statement: Statement, warmup: int, repetitions: int) -> Optional[float]:
+    """Median latency of a statement in seconds, or None if it cannot be run (no parameter values)."""
+    if statement.params is None:
+        return None
+    _, stats = measure(lambda: execute_statement(db, statement), warmup, repetitions)
+    return stats["median"]
+
+
+def index_name(table: str, columns: Tuple[str, ...]) -> str:
+    return f"{INDEX_PREFIX}{table}_{'_'.join(columns)}"
+
+
+def advise(db: SQLite, statements: List[Statement], schema: Schema, warmup: int = 0,
+           repetitions: int = 3) -> List[Dict[str, Any]]:
+    """
+    Collects the candidate indexes of all statements, then validates them one
+    at a time: the index is built (and analyzed), the statements that
+    proposed it are re-planned, those whose plan uses the index are re-timed,
+    and the index is dropped again. The latency change of a statement that
+    does not use the index is timing noise, so a candidate no plan uses has no
+    benefit. Statements whose parameters could not be sampled are planned but
+    not timed, so they add no measured benefit either.
+
+    Returns:
+        List[Dict[str, Any]]: One row per candidate, ranked by total benefit (seconds saved
+        over the median latencies of the statements using it), best first.
+    """
+    proposals: Dict[Tuple[str, Tuple[str, ...]], Dict[str, Any]] = {}
+    for statement in statements:
+        plan = db.query_plan(statement.sql, statement.params or [None] * statement.sql.count("?"))
+        for table, columns, reason in candidate_indexes(statement, plan, schema):
+            proposal = proposals.setdefault((table, columns), {"reasons": [], "statements": []})
+            if reason not in proposal["reasons"]:
+                proposal["reasons"].append(reason)
+            if statement not in proposal["statements"]:
+                proposal["statements"].append(statement)
+
+    # Baselines are all taken before the first index (and its statistics) exists
+    baselines: Dict[str, Optional[float]] = {}
+    for proposal in proposals.values():
+        for statement in proposal["statements"]:
+            if statement.label not in baselines:
+                baselines[statement.label] = time_statement(db, statement, warmup, repetitions)
+
+    rows = []
+    for (table, columns), proposal in proposals.items():
+        name = index_name(table, columns)
+        _, build = measure(lambda: db.cursor.execute(f"CREATE INDEX {name} ON {table} ({', '.join(columns)});"))
+        db.cursor.execute(f"ANALYZE {name};")
+        db.connection.commit()
+        try:
+            using = [statement for statement in proposal["statements"]
+                     if any(name in node["detail"] for node in db.query_plan(
+                         statement.sql, statement.params or [None] * statement.sql.count("?")))]
+            before = after = 0.0
+            timed = 0
+            for statement in using:
+                latency = time_statement(db, statement, warmup, repetitions)
+                if latency is not None and baselines[statement.label] is not None:
+                    before += baselines[statement.label]
+                    after += latency
+                    timed += 1
+            size = object_size(db, name)
+        finally:
+            db.cursor.execute(f"DROP INDEX {name};")
+            db.connection.commit()
+
+        benefit = before - after if timed else None
+        rows.append({
+            "table": table,
+            "columns": columns,
+            "reasons": proposal["reasons"],
+            "statements": [statement.label for statement in proposal["statements"]],
+            "used_by": [statement.label for statement in using],
+            "before_s": before if timed else None,
+            "after_s": after if timed else None,
+            "benefit_s": benefit,
+            "build_s": build["median"],
+            "size_bytes": size,
+        })
+    return sorted(rows, key=lambda row: -row["benefit_s"] if row["benefit_s"] is not None else float("inf"))
+
+
+def format_advice(rows: List[Dict[str, Any]]) -> str:
+    headers = ["Rank", "Index", "Reason", "Statements", "Used by", "Before (s)", "After (s)", "Speedup",
+               "Benefit (s)", "Size (MB)", "Benefit/MB (s)", "Build (s)"]
+    table = []
+    for rank, row in enumerate(rows, start=1):
+        size_mb = row["size_bytes"] / 1024 ** 2 if row["size_bytes"] is not None else None
+        speedup = row["before_s"] / row["after_s"] if row["after_s"] else None
+        per_mb = row["benefit_s"] / size_mb if row["benefit_s"] is not None and size_mb else None
+        table.append([rank, f"{row['table']}({', '.join(row['columns'])})", ", ".join(row["reasons"]),
+                      ", ".join(row["statements"]), ", ".join(row["used_by"]) or "-",
+                      row["before_s"], row["after_s"], f"{speedup:.2f}x" if speedup is not None else None,
+                      row["benefit_s"], size_mb, per_mb, row["build_s"]])
+    return tabulate(table, headers=headers, floatfmt=".6f", missingval="n/a")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Propose indexes for the full scans, automatic indexes and temporary sort B-trees in SQLite's "
+                    "EXPLAIN QUERY PLAN of the benchmark statements, and validate each one by re-timing the "
+                    "statements with the index on a scratch copy of the database.")
+    parser.add_argument("--db", default=SQLITE_DB_PATH, help=f"SQLite database to advise on (default: {SQLITE_DB_PATH})")
+    parser.add_argument("--benchmark", choices=["TPC_H", "TPC_C"], default=None,
+                        help=f"Benchmark whose statements are analyzed (default: the one recorded in {DATASET_STAMP})")
+    parser.add_argument("--all", action="store_true", help="Analyze all TPC-H queries instead of 1, 6 and 13")
+    parser.add_argument("--warmup", type=int, default=0, help="Untimed executions before each timing (default: 0)")
+    parser.add_argument("--repetitions", type=int, default=3,
+                        help="Timed executions per statement and index; the median is compared (default: 3)")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    stamp = read_stamp(DATASET_STAMP) or {}
+    benchmark = args.benchmark or stamp.get("benchmark")
+    if benchmark is None:
+        raise SystemExit(f"No {DATASET_STAMP} found; pass --benchmark")
+
+    # Indexes are built and dropped on a scratch copy, so the benchmark database and its caches stay valid
+    scratch_dir = tempfile.mkdtemp(prefix="index-advisor-", dir=os.path.dirname(os.path.abspath(args.db)))
+    try:
+        scratch_path = os.path.join(scratch_dir, os.path.basename(args.db))
+        copy_file(args.db, scratch_path)
+        db = SQLite(scratch_path)
+        try:
+            schema = Schema(db)
+            statements = benchmark_statements(db, benchmark, args.all, schema)
+            rows = advise(db, statements, schema, warmup=args.warmup, repetitions=args.repetitions)
+        finally:
+            db.close()
+    finally:
+        shutil.rmtree(scratch_dir)
+
+    report = format_advice(rows) if rows else "No candidate indexes: no statement plan has a full scan, automatic " \
+                                               "index or sort B-tree an index could remove."
+    print(report)
+    scale_factor = stamp.get("scale_factor", "unknown") if stamp.get("benchmark") == benchmark else "unknown"
+    write_benchmark_output(benchmark.replace("_", "-"), scale_factor, report, out_dir=ADVISOR_OUT_DIR)
+
+
+if __name__ == "__main__":
+    main()
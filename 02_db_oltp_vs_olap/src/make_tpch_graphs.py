@@ -1,55 +1,29 @@
-from typing import Dict
-import os
+from typing import Any, Dict
 import pprint
 import sys
 import math
 import matplotlib.pyplot as plt
 
+from results_store import load_results, group_statistics, ratio_ci
 
-def read_many_latencies(dir_path: str):
-    latencies = {}
-    for filename in os.listdir(dir_path):
-        if "TPC-H" in filename and filename.endswith(".txt"):
-            file_path = os.path.join(dir_path, filename)
-            sf = filename.split("SF_")[-1].split(".")[0]
-            latencies[sf] = calculate_average(read_latencies(file_path))
 
-    return latencies
-
-
-def read_latencies(file_path: str) -> Dict[int, Dict[str, float]]:
-    latencies: Dict[int, Dict[str, float]] = {}
-    with open(file_path, "r") as file:
-        for line in file:
-            parts = line.strip().split(":")
-            if len(parts) == 2:
-                query_part, time_part = parts
-                query_number = int(query_part.split()[1])
-                sqlite_time, duckdb_time = time_part.split(",")
-                if latencies.get(query_number) is None:
-                    latencies[query_number] = {
-                        "sqlite": [float(sqlite_time.split("=")[1].split('s')[0])],
-                        "duckdb": [float(duckdb_time.split("=")[1].split('s')[0])],
-                    }
-                else:
-                    latencies[query_number]["sqlite"].append(
-                        float(sqlite_time.split("=")[1].split('s')[0]))
-                    latencies[query_number]["duckdb"].append(
-                        float(duckdb_time.split("=")[1].split('s')[0]))
-
-    return latencies
+def read_many_latencies(results_path: str) -> Dict[str, Dict[Any, Dict[str, Any]]]:
+    """
+    Latency statistics (mean, median and bootstrap CI of the median, see
+    results_store.group_statistics) per scale factor, query and engine over
+    all default runs (no cache mode or execution variant) in a results store,
+    plus the speedup of DuckDB over SQLite where both engines have samples.
+    """
+    results = load_results(results_path, benchmark="TPC-H", cache_mode="none", variant="")
+    latencies: Dict[str, Dict[Any, Dict[str, Any]]] = {}
+    for (sf, query, engine), stats in group_statistics(results, ["scale_factor", "query", "engine"]).items():
+        latencies.setdefault(str(sf), {}).setdefault(int(query.split()[1]), {})[engine.lower()] = stats
 
+    for queries in latencies.values():
+        for times in queries.values():
+            if "sqlite" in times and "duckdb" in times:
+                times["speedup"] = ratio_ci(times["sqlite"]["samples"], times["duckdb"]["samples"])
 
-def calculate_average(latencies: Dict[int, Dict[str, float]]) -> Dict[int, Dict[str, float]]:
-    for query_number, times in latencies.items():
-        sqlite_times = times["sqlite"]
-        duckdb_times = times["duckdb"]
-        avg_sqlite_time = sum(sqlite_times) / len(sqlite_times)
-        avg_duckdb_time = sum(duckdb_times) / len(duckdb_times)
-        latencies[query_number] = {
-            "sqlite": avg_sqlite_time,
-            "duckdb": avg_duckdb_time
-        }
     return latencies
 
 
@@ -83,8 +57,11 @@ def create_bar_graph(latencies, savename: str) -> None:
 
     for i, sf in enumerate(scale_factors):
         for j, engine in enumerate(engines):
-            vals = [latencies[sf][q][engine]
-                    if q in latencies[sf] else 0.01 for q in queries]
+            stats = [latencies[sf].get(q, {}).get(engine) for q in queries]
+            vals = [s["median"] if s else 0.01 for s in stats]
+            # Asymmetric error bars spanning the confidence interval of the median
+            errors = [[s["median"] - s["ci_low"] if s else 0 for s in stats],
+                      [s["ci_high"] - s["median"] if s else 0 for s in stats]]
             # Add extra gap between scale factor groups
             offset = ((i * len(engines) + j) + i * group_gap) - \
                 n_bars_per_query / 2 + 0.5
@@ -94,19 +71,19 @@ def create_bar_graph(latencies, savename: str) -> None:
                 plt.bar(
                     x + offset, vals, bar_width,
                     label=f'{engine.capitalize()} SF={sf}',
-                    color=color, edgecolor='black'
+                    color=color, edgecolor='black', yerr=errors, capsize=2
                 )
             else:
                 color = duckdb_colors[i]
                 plt.bar(
                     x + offset, vals, bar_width,
                     label=f'{engine.capitalize()} SF={sf}',
-                    color=color, edgecolor='black', hatch="//"
+                    color=color, edgecolor='black', hatch="//", yerr=errors, capsize=2
                 )
 
     plt.xticks(x, queries)
     plt.xlabel('Query')
-    plt.ylabel('Latency (s) - Log Scale')
+    plt.ylabel('Median Latency (s), 95% CI - Log Scale')
     plt.yscale('log')
     plt.title('SQLite vs DuckDB Latencies for All Scale Factors - TPC-H Benchmark')
     plt.legend()
@@ -115,32 +92,82 @@ def create_bar_graph(latencies, savename: str) -> None:
     plt.savefig(savename)
 
 
-def save_average_latencies(latencies: Dict[int, Dict[str, float]], filename: str) -> None:
+def create_scaling_graph(latencies, savename: str) -> None:
+    """
+    Creates one line plot per query of the median latency against the scale
+    factor for both engines, with the confidence interval of the median
+    shaded, on log-log axes.
+    """
+    import numpy as np
+    import matplotlib.pyplot as plt
+
+    scale_factors = sorted(latencies.keys(), key=lambda x: float(x))
+    queries = sorted({q for sf in latencies.values() for q in sf.keys()})
+    n_cols = min(4, len(queries))
+    n_rows = math.ceil(len(queries) / n_cols)
+    fig, axes = plt.subplots(n_rows, n_cols, figsize=(4 * n_cols, 3 * n_rows), squeeze=False)
+
+    for ax, q in zip(axes.flat, queries):
+        for engine, color in (('sqlite', 'tab:blue'), ('duckdb', 'tab:orange')):
+            points = [(float(sf), latencies[sf][q][engine]) for sf in scale_factors
+                      if engine in latencies[sf].get(q, {})]
+            if not points:
+                continue
+            x = np.array([sf for sf, _ in points])
+            ax.plot(x, [s["median"] for _, s in points], marker='o', color=color, label=engine.capitalize())
+            ax.fill_between(x, [s["ci_low"] for _, s in points], [s["ci_high"] for _, s in points],
+                            color=color, alpha=0.25)
+        ax.set_title(f'Query {q}')
+        ax.set_xscale('log')
+        ax.set_yscale('log')
+        ax.set_xlabel('Scale Factor')
+        ax.set_ylabel('Median Latency (s)')
+        ax.grid(linestyle='--', alpha=0.5)
+        ax.legend(fontsize='small')
+    for ax in list(axes.flat)[len(queries):]:
+        ax.set_visible(False)
+
+    fig.suptitle('SQLite vs DuckDB Latency Scaling - TPC-H Benchmark')
+    fig.tight_layout()
+    fig.savefig(savename)
+
+
+def format_latency(stats: Dict[str, Any]) -> str:
+    return f"{stats['median']:.4f}s [{stats['ci_low']:.4f}, {stats['ci_high']:.4f}] (mean {stats['mean']:.4f}s, n={stats['n']})"
+
+
+def save_average_latencies(latencies: Dict[str, Dict[Any, Dict[str, Any]]], filename: str) -> None:
+    """Writes median latencies with their 95% confidence interval, means and the DuckDB speedup."""
     with open(filename, "w") as file:
         for sf, queries in sorted(latencies.items(), key=lambda x: float(x[0])):
             file.write(f"Scale Factor: {sf}\n")
-            for query_number, times in queries.items():
-                sqlite_time = times["sqlite"]
-                duckdb_time = times["duckdb"]
-                file.write(
-                    f"{query_number}: SQLite={sqlite_time:.4f}s, DuckDB={duckdb_time:.4f}s\n")
+            for query_number, times in sorted(queries.items()):
+                parts = [f"{engine}={format_latency(times[engine.lower()])}" for engine in ("SQLite", "DuckDB")
+                         if engine.lower() in times]
+                if "speedup" in times:
+                    ratio, low, high = times["speedup"]
+                    parts.append(f"speedup={ratio:.2f}x [{low:.2f}, {high:.2f}]")
+                file.write(f"{query_number}: {', '.join(parts)}\n")
             file.write("\n")
 
 
 if __name__ == "__main__":
     if len(sys.argv) != 2:
-        print("Usage: python make_graphs.py <latencies_dir>")
+        print(f"Usage: python {sys.argv[0]} <results.jsonl or out dir>")
         sys.exit(1)
 
-    latencies_dir: str = sys.argv[1]
-    latencies = read_many_latencies(latencies_dir)
+    results_path: str = sys.argv[1]
+    latencies = read_many_latencies(results_path)
     print()
-    print("Latencies:")
-    pprint.pp(latencies)
+    print("Median latencies:")
+    pprint.pp({sf: {q: {engine: stats["median"] for engine, stats in times.items() if engine != "speedup"}
+                    for q, times in queries.items()}
+               for sf, queries in latencies.items()})
     print()
 
     # Save average latencies to a file
     save_average_latencies(latencies, "tpc-h-latencies.txt")
 
     create_bar_graph(latencies, "tpc-h-graph.png")
+    create_scaling_graph(latencies, "tpc-h-scaling.png")
     print()
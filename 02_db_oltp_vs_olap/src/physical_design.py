@@ -0,0 +1,66 @@
+from typing import Dict, List, Any, Optional
+import hashlib
+import os
+import sqlite3
+
+from sqlite_handler import SQLite
+
+# SQL files of sql_benchmarks/tpch/physical applied, in order, after the TPC-H load for each physical design
+PHYSICAL_DESIGNS: Dict[str, List[str]] = {
+    "none": [],
+    "keys": ["primary_keys.sql", "foreign_keys.sql"],
+    "covering": ["primary_keys.sql", "foreign_keys.sql", "covering.sql"],
+    # The clustered tables are their own primary key index, so only the foreign key indexes are added
+    "without_rowid": ["without_rowid.sql", "foreign_keys.sql"],
+}
+
+
+def design_info(name: str, sql_dir: str) -> Dict[str, Any]:
+    """
+    Describes a physical design by name and a hash of its SQL files, so that
+    datasets built with a changed design are never mistaken for each other.
+    """
+    digest = hashlib.sha256()
+    for file_name in PHYSICAL_DESIGNS[name]:
+        with open(os.path.join(sql_dir, file_name), "rb") as f:
+            digest.update(f.read())
+    return {"name": name, "hash": digest.hexdigest()[:16]}
+
+
+def database_size(sqlite_db: SQLite) -> int:
+    """
+    Bytes of the database pages in use: free pages (e.g. left by the tables
+    without_rowid.sql drops) are not counted, since the file does not shrink without a VACUUM.
+    """
+    page_count = sqlite_db.cursor.execute("PRAGMA page_count;").fetchone()[0]
+    free_pages = sqlite_db.cursor.execute("PRAGMA freelist_count;").fetchone()[0]
+    page_size = sqlite_db.cursor.execute("PRAGMA page_size;").fetchone()[0]
+    return (page_count - free_pages) * page_size
+
+
+def object_sizes(sqlite_db: SQLite) -> Dict[str, int]:
+    """
+    On-disk bytes of every table and index, from the dbstat virtual table.
+    Empty when SQLite was built without it.
+    """
+    try:
+        rows = sqlite_db.cursor.execute(
+            "SELECT name, SUM(pgsize) FROM dbstat GROUP BY name ORDER BY name;").fetchall()
+    except sqlite3.OperationalError:
+        return {}
+    return {name: int(size) for name, size in rows}
+
+
+def object_size(sqlite_db: SQLite, name: str) -> Optional[int]:
+    """On-disk bytes of one table or index (see object_sizes), or None without dbstat."""
+    try:
+        size = sqlite_db.cursor.execute("SELECT SUM(pgsize) FROM dbstat WHERE name = ?;", (name,)).fetchone()[0]
+    except sqlite3.OperationalError:
+        return None
+    return int(size or 0)
+
+
+def user_indexes(sqlite_db: SQLite) -> List[str]:
+    """Names of the explicitly created indexes."""
+    sqlite_db.cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL ORDER BY name;")
+    return [name for name, in sqlite_db.cursor.fetchall()]
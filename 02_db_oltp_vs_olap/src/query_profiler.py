@@ -0,0 +1,71 @@
+from typing import Dict, List, Any
+import hashlib
+import os
+
+from sqlite_handler import SQLite
+from duckdb_handler import DuckDB
+from results_store import run_metadata, append_json_lines
+
+
+def duckdb_operators(node: Dict[str, Any], depth: int = 0) -> List[Dict[str, Any]]:
+    """Flattens a DuckDB JSON profile into its operators in pre-order, with their depth in the tree."""
+    operators = []
+    for child in node.get("children", []):
+        extra_info = child.get("extra_info", {})
+        operators.append({
+            "depth": depth,
+            "operator": (child.get("operator_name") or child.get("operator_type") or "").strip(),
+            "timing_s": child.get("operator_timing"),
+            "cardinality": child.get("operator_cardinality"),
+            "estimated_cardinality": extra_info.get("Estimated Cardinality"),
+            "rows_scanned": child.get("operator_rows_scanned"),
+            "extra_info": extra_info,
+        })
+        operators.extend(duckdb_operators(child, depth + 1))
+    return operators
+
+
+def plan_hash(shape: List[str]) -> str:
+    """Short hash of a plan's shape (operators and structure, no timings), to spot plan changes at a glance."""
+    return hashlib.sha256("\n".join(shape).encode()).hexdigest()[:12]
+
+
+def profile_sqlite(db: SQLite, query: str) -> Dict[str, Any]:
+    profile = db.profile_query(query)
+    profile["plan_hash"] = plan_hash([f"{node['parent']}:{node['detail']}" for node in profile["plan"]])
+    return profile
+
+
+def profile_duckdb(db: DuckDB, query: str) -> Dict[str, Any]:
+    raw = db.profile_query(query)
+    operators = duckdb_operators(raw)
+    return {
+        "latency_s": raw.get("latency"),
+        "cpu_time_s": raw.get("cpu_time"),
+        "rows_returned": raw.get("rows_returned"),
+        "rows_scanned": raw.get("cumulative_rows_scanned"),
+        "operators": operators,
+        "plan_hash": plan_hash([f"{op['depth']}:{op['operator']}" for op in operators]),
+    }
+
+
+def top_operators(profile: Dict[str, Any], count: int = 3) -> List[Dict[str, Any]]:
+    """The DuckDB operators that took the most time."""
+    return sorted(profile.get("operators", []), key=lambda op: op["timing_s"] or 0, reverse=True)[:count]
+
+
+def save_profiles(out_dir: str, benchmark: str, scale_factor: float, label: str,
+                  profiles: Dict[str, Dict[str, Any]]) -> str:
+    """
+    Appends one record per engine to <out_dir>/<benchmark>_SF_<sf>.jsonl with
+    the run metadata (date, git revision, engine versions, see
+    results_store.run_metadata), so plans can be compared across runs.
+
+    Returns:
+        str: Path of the profile file.
+    """
+    path = os.path.join(out_dir, f"{benchmark.upper()}_SF_{scale_factor}.jsonl")
+    append_json_lines(path, (dict(run_metadata(), benchmark=benchmark, scale_factor=float(scale_factor),
+                                  query=label, engine=engine, **profile)
+                             for engine, profile in profiles.items()))
+    return path
@@ -0,0 +1,131 @@
+from typing import Dict, List, Tuple, Any, Optional
+import glob
+import gzip
+import hashlib
+import json
+import os
+import pickle
+import re
+
+from dataset_cache import dataset_key
+
+DEFAULT_RESULT_CACHE_MB = 256.0
+
+# (rows, column names, column types) as returned by the handlers' execute_query
+Result = Tuple[List[Tuple[Any, ...]], List[str], List[str]]
+
+
+def normalize_query(query: str) -> str:
+    """Query text with whitespace collapsed and trailing semicolons removed."""
+    return re.sub(r"\s+", " ", query).strip().rstrip(";").strip()
+
+
+def database_fingerprint(info: Dict[str, Any], db_path: str) -> str:
+    """
+    Identifies the exact contents of a database file: the dataset it was
+    loaded with plus the size and modification time of the file and its
+    WAL/journal, so that any write yields a new fingerprint.
+    """
+    state = [dataset_key(info)]
+    for path in (db_path, db_path + ".wal", db_path + "-wal", db_path + "-journal"):
+        if os.path.exists(path):
+            stat = os.stat(path)
+            state.append(f"{os.path.basename(path)}:{stat.st_size}:{stat.st_mtime_ns}")
+    return hashlib.sha256("|".join(state).encode()).hexdigest()[:16]
+
+
+class ResultCache:
+    """
+    On-disk cache of query results keyed by engine, database fingerprint and
+    normalized query text, used to display and verify results without
+    re-executing the query. Timed executions never read from it.
+
+    Entries are gzip-compressed pickles named <engine>-<dataset>-<hash>; the
+    least recently used ones are evicted once the cache exceeds its budget.
+    """
+    def __init__(self, cache_dir: str, budget_mb: float = DEFAULT_RESULT_CACHE_MB) -> None:
+        self.cache_dir: str = cache_dir
+        self.budget_bytes: int = int(budget_mb * 1024 ** 2)
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def __entry_path(self, engine: str, info: Dict[str, Any], fingerprint: str, query: str) -> str:
+        digest = hashlib.sha256(json.dumps([fingerprint, normalize_query(query)]).encode()).hexdigest()[:24]
+        return os.path.join(self.cache_dir, f"{engine}-{dataset_key(info)}-{digest}.pkl.gz")
+
+    def get(self, engine: str, info: Dict[str, Any], fingerprint: str, query: str) -> Optional[Result]:
+        """Returns the cached result of a query, or None on a miss."""
+        path = self.__entry_path(engine, info, fingerprint, query)
+        try:
+            with gzip.open(path, "rb") as f:
+                result = pickle.load(f)
+        except (FileNotFoundError, EOFError, pickle.UnpicklingError, OSError):
+            return None
+        os.utime(path)  # mark as recently used
+        return result
+
+    def put(self, engine: str, info: Dict[str, Any], fingerprint: str, query: str, result: Result) -> None:
+        """Stores a query result and evicts old entries; results larger than the whole budget are not kept."""
+        path = self.__entry_path(engine, info, fingerprint, query)
+        tmp_path = path + ".tmp"
+        with gzip.open(tmp_path, "wb", compresslevel=6) as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        if os.path.getsize(tmp_path) > self.budget_bytes:
+            os.remove(tmp_path)
+            return
+        os.replace(tmp_path, path)
+        self.evict(keep=path)
+
+    def fetch(self, db: Any, engine: str, info: Dict[str, Any], query: str,
+              result: Optional[Result] = None) -> Result:
+        """
+        Returns the result of a query from the cache. On a miss, `result` (e.g.
+        the rows a timed run already fetched) is cached and returned; only
+        without one is the query executed again, untimed.
+        """
+        fingerprint = database_fingerprint(info, db.db_path)
+        cached = self.get(engine, info, fingerprint, query)
+        if cached is not None:
+            return cached
+        if result is None:
+            result = db.execute_query(query, fetch_metadata=True)
+        self.put(engine, info, fingerprint, query, result)
+        return result
+
+    def invalidate(self, engine: Optional[str] = None, info: Optional[Dict[str, Any]] = None) -> int:
+        """
+        Removes the entries of an engine and/or dataset (all entries by default),
+        e.g. after a benchmark wrote to the database.
+
+        Returns:
+            int: Number of removed entries.
+        """
+        pattern = f"{engine or '*'}-{dataset_key(info) if info else '*'}-*.pkl.gz"
+        paths = glob.glob(os.path.join(self.cache_dir, pattern))
+        for path in paths:
+            os.remove(path)
+        return len(paths)
+
+    def evict(self, keep: Optional[str] = None) -> List[str]:
+        """
+        Removes least recently used entries until the cache fits its budget.
+
+        Returns:
+            List[str]: Paths of the evicted entries.
+        """
+        entries = []
+        total = 0
+        for path in glob.glob(os.path.join(self.cache_dir, "*.pkl.gz")):
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, path, stat.st_size))
+            total += stat.st_size
+
+        evicted = []
+        for _, path, size in sorted(entries):
+            if total <= self.budget_bytes:
+                break
+            if path == keep:
+                continue
+            os.remove(path)
+            total -= size
+            evicted.append(path)
+        return evicted
@@ -0,0 +1,226 @@
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from datetime import date, datetime
+from decimal import Decimal
+import heapq
+import itertools
+import math
+import pickle
+import re
+import tempfile
+
+DEFAULT_REL_TOL = 1e-6
+DEFAULT_ABS_TOL = 1e-4
+# Rows sorted in memory before a run is spilled to disk (order-insensitive comparison)
+SORT_RUN_ROWS = 100_000
+# Mismatching rows kept for the report
+MAX_REPORTED_MISMATCHES = 10
+
+
+def normalize_value(value: Any) -> Any:
+    """
+    Maps engine-specific representations of a value onto one form: DECIMAL
+    becomes float, DATE/TIMESTAMP become ISO text (SQLite returns dates as
+    text), and fixed-width CHAR padding is stripped.
+    """
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.isoformat(sep=" ")
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, str):
+        return value.rstrip()
+    return value
+
+
+def normalize_row(row: Tuple[Any, ...]) -> Tuple[Any, ...]:
+    return tuple(normalize_value(v) for v in row)
+
+
+def sort_key(row: Tuple[Any, ...]) -> Tuple[Tuple[int, Any], ...]:
+    """Total order over normalized rows with mixed types (NULL < numbers < text < anything else)."""
+    key = []
+    for v in row:
+        if v is None:
+            key.append((0, 0))
+        elif isinstance(v, (int, float)):
+            key.append((1, v))
+        elif isinstance(v, str):
+            key.append((2, v))
+        else:
+            key.append((3, repr(v)))
+    return tuple(key)
+
+
+def values_match(a: Any, b: Any, rel_tol: float = DEFAULT_REL_TOL, abs_tol: float = DEFAULT_ABS_TOL) -> bool:
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+        return math.isclose(a, b, rel_tol=rel_tol, abs_tol=abs_tol)
+    return a == b
+
+
+def rows_match(a: Tuple[Any, ...], b: Tuple[Any, ...], rel_tol: float = DEFAULT_REL_TOL,
+               abs_tol: float = DEFAULT_ABS_TOL) -> bool:
+    return len(a) == len(b) and all(values_match(x, y, rel_tol, abs_tol) for x, y in zip(a, b))
+
+
+def has_top_level_order_by(query: str) -> bool:
+    """Whether the outermost SELECT of a query has an ORDER BY (ORDER BYs inside subqueries do not count)."""
+    depth = 0
+    for token in re.finditer(r"\(|\)|\border\s+by\b", query, flags=re.IGNORECASE):
+        text = token.group(0)
+        if text == "(":
+            depth += 1
+        elif text == ")":
+            depth -= 1
+        elif depth == 0:
+            return True
+    return False
+
+
+def __spill(rows: List[Tuple[Any, ...]]) -> Iterator[Tuple[Any, ...]]:
+    """Writes a sorted run to a temporary file and returns an iterator reading it back."""
+    f = tempfile.TemporaryFile()
+    for row in rows:
+        pickle.dump(row, f, protocol=pickle.HIGHEST_PROTOCOL)
+    f.seek(0)
+
+    def read() -> Iterator[Tuple[Any, ...]]:
+        with f:
+            while True:
+                try:
+                    yield pickle.load(f)
+                except EOFError:
+                    return
+    return read()
+
+
+def external_sort(rows: Iterable[Tuple[Any, ...]], key: Callable[[Tuple[Any, ...]], Any],
+                  run_rows: int = SORT_RUN_ROWS) -> Iterator[Tuple[Any, ...]]:
+    """Sorts a stream with at most `run_rows` rows in memory, merging sorted runs spilled to disk."""
+    rows = iter(rows)
+    first_run = sorted(itertools.islice(rows, run_rows), key=key)
+    if len(first_run) < run_rows:
+        yield from first_run
+        return
+
+    runs = [__spill(first_run)]
+    while True:
+        run = sorted(itertools.islice(rows, run_rows), key=key)
+        if not run:
+            break
+        runs.append(__spill(run))
+    yield from heapq.merge(*runs, key=key)
+
+
+def match_bound(row: Tuple[Any, ...], rel_tol: float = DEFAULT_REL_TOL,
+                abs_tol: float = DEFAULT_ABS_TOL) -> Tuple[Tuple[int, Any], ...]:
+    """
+    Largest sort_key a row matching `row` within the tolerances can have:
+    every number raised by its tolerance (doubled, which covers rel_tol up to
+    0.5, where the tolerance is relative to the larger of the two values).
+    """
+    return tuple((tag, value + 2 * max(abs_tol, rel_tol * abs(value))) if tag == 1 else (tag, value)
+                 for tag, value in sort_key(row))
+
+
+def aligned_pairs(left: Iterator[Tuple[Any, ...]], right: Iterator[Tuple[Any, ...]],
+                  rel_tol: float = DEFAULT_REL_TOL, abs_tol: float = DEFAULT_ABS_TOL
+                  ) -> Iterator[Tuple[Optional[Tuple[Any, ...]], Optional[Tuple[Any, ...]]]]:
+    """
+    Merge-joins two streams sorted by sort_key: matching rows are paired, and a
+    row present on one side only is paired with None, so a single missing row
+    does not shift every following comparison.
+
+    Rows equal within the tolerances need not sort the same way on both sides
+    ((0.3, "b") sorts before (0.30000000000000004, "a")), so rows are taken in
+    key order from both streams and each is matched against the still
+    unmatched rows of the other side. An unmatched row is only given up once
+    both streams have moved past its match_bound.
+    """
+    heads = [next(left, None), next(right, None)]
+    streams = [left, right]
+    pending: List[List[Tuple[Any, ...]]] = [[], []]
+    while heads[0] is not None or heads[1] is not None:
+        take_left = heads[1] is None or (heads[0] is not None and sort_key(heads[0]) <= sort_key(heads[1]))
+        side = 0 if take_left else 1
+        row = heads[side]
+        heads[side] = next(streams[side], None)
+
+        other = pending[1 - side]
+        match = next((i for i, candidate in enumerate(other) if rows_match(row, candidate, rel_tol, abs_tol)),
+                     None)
+        if match is None:
+            pending[side].append(row)
+        else:
+            candidate = other.pop(match)
+            yield (row, candidate) if side == 0 else (candidate, row)
+
+        # Rows no later row of the other side can match anymore
+        head_keys = [sort_key(head) for head in heads if head is not None]
+        lowest = min(head_keys) if head_keys else None
+        for pending_side in (0, 1):
+            keep = []
+            for unmatched in pending[pending_side]:
+                if lowest is None or match_bound(unmatched, rel_tol, abs_tol) < lowest:
+                    yield (unmatched, None) if pending_side == 0 else (None, unmatched)
+                else:
+                    keep.append(unmatched)
+            pending[pending_side] = keep
+
+
+def compare_results(sqlite_rows: Iterable[Tuple[Any, ...]], duckdb_rows: Iterable[Tuple[Any, ...]],
+                    ordered: bool, rel_tol: float = DEFAULT_REL_TOL, abs_tol: float = DEFAULT_ABS_TOL,
+                    max_mismatches: int = MAX_REPORTED_MISMATCHES) -> Dict[str, Any]:
+    """
+    Compares two result streams row by row without materializing them.
+
+    Ordered results are compared in the order the engines return them;
+    unordered ones are first brought into a canonical order by an external
+    sort and then merge-joined (see aligned_pairs). Rows with equal sort keys
+    in an ordered result (ties) may come back in different orders and are
+    then reported as mismatches.
+
+    Returns:
+        Dict[str, Any]: whether the results match, the row count of each side
+        and up to `max_mismatches` (position, SQLite row, DuckDB row) triples.
+    """
+    left = (normalize_row(row) for row in sqlite_rows)
+    right = (normalize_row(row) for row in duckdb_rows)
+    if ordered:
+        pairs = itertools.zip_longest(left, right)
+    else:
+        pairs = aligned_pairs(external_sort(left, key=sort_key), external_sort(right, key=sort_key),
+                              rel_tol, abs_tol)
+
+    counts = {"SQLite": 0, "DuckDB": 0}
+    mismatch_count = 0
+    mismatches: List[Tuple[int, Optional[Tuple[Any, ...]], Optional[Tuple[Any, ...]]]] = []
+    for position, (a, b) in enumerate(pairs):
+        if a is not None:
+            counts["SQLite"] += 1
+        if b is not None:
+            counts["DuckDB"] += 1
+        if a is None or b is None or not rows_match(a, b, rel_tol, abs_tol):
+            mismatch_count += 1
+            if len(mismatches) < max_mismatches:
+                mismatches.append((position, a, b))
+
+    return {
+        "match": mismatch_count == 0,
+        "ordered": ordered,
+        "rows": counts,
+        "mismatch_count": mismatch_count,
+        "mismatches": mismatches,
+    }
+
+
+def format_verification(label: str, report: Dict[str, Any]) -> str:
+    """One summary line per verified query, followed by the reported mismatches."""
+    status = "OK" if report["match"] else f"MISMATCH ({report['mismatch_count']} rows)"
+    content = (f"{label}: {status}, ordered={report['ordered']}, "
+               f"SQLite rows={report['rows']['SQLite']}, DuckDB rows={report['rows']['DuckDB']}\n")
+    for position, a, b in report["mismatches"]:
+        content += f"  row {position}: SQLite={a} DuckDB={b}\n"
+    return content
@@ -0,0 +1,323 @@
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Callable, Tuple
+from datetime import datetime, timezone
+from functools import lru_cache
+import fcntl
+import json
+import math
+import os
+import platform
+import re
+import sqlite3
+import subprocess
+import sys
+import uuid
+
+import numpy as np
+
+RESULTS_FILE = "results.jsonl"
+SCHEMA_VERSION = 1
+
+# Fields of a measurement record, in the order they are written. Timings are in seconds;
+# fetch_s is only set when the fetch was timed separately (see benchmark_utils.add_fetch_stats).
+FIELDS = [
+    "schema", "run_id", "date", "git_rev", "host", "python", "sqlite_version", "duckdb_version",
+    "benchmark", "scale_factor", "query", "engine", "cache_mode", "variant", "fetch_mode",
+    "warmup", "repetitions", "iteration", "wall_s", "cpu_s", "fetch_s",
+]
+NUMERIC_FIELDS = {"scale_factor", "warmup", "repetitions", "iteration", "wall_s", "cpu_s", "fetch_s"}
+
+# Bootstrap confidence intervals: confidence level, number of resamples and a fixed seed for reproducible output
+DEFAULT_CONFIDENCE = 0.95
+DEFAULT_RESAMPLES = 2000
+BOOTSTRAP_SEED = 0
+
+
+def git_revision() -> Optional[str]:
+    """Commit the benchmark code is at (with a -dirty suffix for uncommitted changes), if known."""
+    src_dir = os.path.dirname(os.path.abspath(__file__))
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=src_dir, capture_output=True,
+                             text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no", "."], cwd=src_dir,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return rev + "-dirty" if dirty else rev
+
+
+@lru_cache(maxsize=None)
+def run_metadata() -> Dict[str, Any]:
+    """Describes this benchmark process; shared by every record it writes."""
+    try:
+        import duckdb
+        duckdb_version = duckdb.__version__
+    except ImportError:
+        duckdb_version = None
+    return {
+        "schema": SCHEMA_VERSION,
+        "run_id": uuid.uuid4().hex[:12],
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_rev": git_revision(),
+        "host": platform.node(),
+        "python": platform.python_version(),
+        "sqlite_version": sqlite3.sqlite_version,
+        "duckdb_version": duckdb_version,
+    }
+
+
+def measurement_records(benchmark: str, scale_factor: float, query: str, engine: str, stats: Dict[str, Any],
+                        cache_mode: str = "none", variant: str = "") -> List[Dict[str, Any]]:
+    """
+    One record per measured repetition of a query or transaction.
+
+    Args:
+        stats (Dict[str, Any]): Statistics returned by benchmark_utils.measure.
+    """
+    fetch_samples = stats.get("fetch_samples") or [None] * len(stats["samples"])
+    base = dict(run_metadata(), benchmark=benchmark, scale_factor=float(scale_factor), query=query,
+                engine=engine, cache_mode=cache_mode, variant=variant, fetch_mode=stats.get("fetch_mode"),
+                warmup=stats.get("warmup"), repetitions=stats["n"])
+    return [dict(base, iteration=i, wall_s=wall, cpu_s=cpu, fetch_s=fetch)
+            for i, (wall, cpu, fetch) in enumerate(zip(stats["samples"], stats["cpu_samples"], fetch_samples))]
+
+
+def append_records(path: str, records: Iterable[Dict[str, Any]]) -> None:
+    """Appends measurement records (restricted to FIELDS) to a results file."""
+    append_json_lines(path, ({field: record.get(field) for field in FIELDS} for record in records))
+
+
+def append_json_lines(path: str, records: Iterable[Dict[str, Any]]) -> None:
+    """Appends records as JSON lines; the file is locked so concurrent benchmark processes do not interleave."""
+    lines = "".join(json.dumps(record) + "\n" for record in records)
+    if not lines:
+        return
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            f.write(lines)
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def read_records(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, "r") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def load_results(path: str, **filters: Any) -> Dict[str, np.ndarray]:
+    """
+    Loads a results file as one NumPy array per field, so analyses over many
+    runs are array operations. Numeric fields are float arrays (NaN where
+    unset), the others object arrays. Keyword arguments keep only the records
+    whose field equals the given value, e.g. benchmark="TPC-H".
+
+    Args:
+        path (str): A results.jsonl file, or a directory containing one. A directory
+            without one is read as text results (see read_text_results).
+    """
+    if os.path.isdir(path) and not os.path.exists(os.path.join(path, RESULTS_FILE)):
+        records: Iterable[Dict[str, Any]] = read_text_results(path)
+    else:
+        records = read_records(os.path.join(path, RESULTS_FILE) if os.path.isdir(path) else path)
+
+    columns: Dict[str, List[Any]] = {field: [] for field in FIELDS}
+    for record in records:
+        if any(record.get(field) != value for field, value in filters.items()):
+            continue
+        for field in FIELDS:
+            columns[field].append(record.get(field))
+
+    arrays: Dict[str, np.ndarray] = {}
+    for field, values in columns.items():
+        if field in NUMERIC_FIELDS:
+            arrays[field] = np.array([np.nan if v is None else v for v in values], dtype=float)
+        else:
+            arrays[field] = np.array(values, dtype=object)
+    return arrays
+
+
+def group_indices(results: Dict[str, np.ndarray], keys: List[str]) -> Dict[tuple, np.ndarray]:
+    """Record indices per distinct combination of the `keys` fields."""
+    key_rows = list(zip(*(results[k] for k in keys)))
+    if not key_rows:
+        return {}
+    _, first, inverse = np.unique(np.array([repr(k) for k in key_rows]), return_index=True, return_inverse=True)
+    order = np.argsort(inverse, kind="stable")
+    bounds = np.cumsum(np.bincount(inverse))[:-1]
+    return {key_rows[first[g]]: indices for g, indices in enumerate(np.split(order, bounds))}
+
+
+def bootstrap_ci(samples: np.ndarray, statistic: Callable[..., np.ndarray] = np.median,
+                 confidence: float = DEFAULT_CONFIDENCE, resamples: int = DEFAULT_RESAMPLES,
+                 rng: Optional[np.random.Generator] = None) -> Tuple[float, float]:
+    """
+    Percentile bootstrap confidence interval of a statistic, computed on all
+    resamples at once. `statistic` must accept an `axis` argument.
+    """
+    samples = np.asarray(samples, dtype=float)
+    if len(samples) < 2:
+        value = float(statistic(samples, axis=0)) if len(samples) else math.nan
+        return value, value
+    rng = rng if rng is not None else np.random.default_rng(BOOTSTRAP_SEED)
+    resampled = statistic(samples[rng.integers(0, len(samples), size=(resamples, len(samples)))], axis=1)
+    alpha = (1 - confidence) / 2
+    low, high = np.quantile(resampled, [alpha, 1 - alpha])
+    return float(low), float(high)
+
+
+def ratio_ci(numerator: np.ndarray, denominator: np.ndarray, confidence: float = DEFAULT_CONFIDENCE,
+             resamples: int = DEFAULT_RESAMPLES, rng: Optional[np.random.Generator] = None
+             ) -> Tuple[float, float, float]:
+    """
+    Ratio of the medians of two independent samples (e.g. the speedup of one
+    engine over another) and its bootstrap confidence interval.
+    """
+    numerator = np.asarray(numerator, dtype=float)
+    denominator = np.asarray(denominator, dtype=float)
+    ratio = float(np.median(numerator) / np.median(denominator))
+    if len(numerator) < 2 or len(denominator) < 2:
+        return ratio, ratio, ratio
+    rng = rng if rng is not None else np.random.default_rng(BOOTSTRAP_SEED)
+    num = np.median(numerator[rng.integers(0, len(numerator), size=(resamples, len(numerator)))], axis=1)
+    den = np.median(denominator[rng.integers(0, len(denominator), size=(resamples, len(denominator)))], axis=1)
+    alpha = (1 - confidence) / 2
+    low, high = np.quantile(num / den, [alpha, 1 - alpha])
+    return ratio, float(low), float(high)
+
+
+
+def __incomplete_beta(a: float, b: float, x: float) -> float:
+    """Regularized incomplete beta function I_x(a, b), by Lentz's continued fraction."""
+    if x <= 0 or x >= 1:
+        return 0.0 if x <= 0 else 1.0
+    if x > (a + 1) / (a + b + 2):
+        return 1 - __incomplete_beta(b, a, 1 - x)
+    front = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) + a * math.log(x) + b * math.log1p(-x)) / a
+    tiny = 1e-300
+    c, d = 1.0, 1 - (a + b) * x / (a + 1)
+    d = 1 / (d if abs(d) > tiny else tiny)
+    fraction = d
+    for m in range(1, 300):
+        for numerator in (m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+                          -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1))):
+            d = 1 + numerator * d
+            d = 1 / (d if abs(d) > tiny else tiny)
+            c = 1 + numerator / c
+            c = c if abs(c) > tiny else tiny
+            fraction *= c * d
+        if abs(c * d - 1) < 1e-14:
+            break
+    return front * fraction
+
+
+def student_t_quantile(p: float, df: float) -> float:
+    """Quantile of Student's t distribution with `df` (possibly fractional) degrees of freedom, for p >= 0.5."""
+    def upper_tail(t: float) -> float:
+        return 0.5 * __incomplete_beta(df / 2, 0.5, df / (df + t * t))
+
+    low, high = 0.0, 1.0
+    while upper_tail(high) > 1 - p:
+        low, high = high, high * 2
+    for _ in range(100):
+        mid = (low + high) / 2
+        low, high = (mid, high) if upper_tail(mid) > 1 - p else (low, mid)
+    return (low + high) / 2
+
+
+def log_ratio_ci(numerator: np.ndarray, denominator: np.ndarray, confidence: float = DEFAULT_CONFIDENCE
+                 ) -> Tuple[float, float, float]:
+    """
+    Ratio of the geometric means of two independent samples of positive
+    values and its Welch t confidence interval, computed on the logarithms.
+    Unlike ratio_ci, the interval keeps its coverage at 3 to 5 samples per
+    side (for roughly log-normal timings), also at the high confidence levels
+    a multiple-comparison correction asks for.
+    """
+    log_num = np.log(np.asarray(numerator, dtype=float))
+    log_den = np.log(np.asarray(denominator, dtype=float))
+    difference = float(np.mean(log_num) - np.mean(log_den))
+    if len(log_num) < 2 or len(log_den) < 2:
+        return math.exp(difference), math.nan, math.nan
+    var_num, var_den = np.var(log_num, ddof=1) / len(log_num), np.var(log_den, ddof=1) / len(log_den)
+    se = math.sqrt(var_num + var_den)
+    if se == 0:
+        return (math.exp(difference),) * 3
+    df = se ** 4 / (var_num ** 2 / (len(log_num) - 1) + var_den ** 2 / (len(log_den) - 1))
+    margin = student_t_quantile(1 - (1 - confidence) / 2, df) * se
+    return math.exp(difference), math.exp(difference - margin), math.exp(difference + margin)
+
+
+def group_statistics(results: Dict[str, np.ndarray], keys: List[str], value: str = "wall_s",
+                     confidence: float = DEFAULT_CONFIDENCE, resamples: int = DEFAULT_RESAMPLES
+                     ) -> Dict[tuple, Dict[str, Any]]:
+    """
+    Per distinct combination of the `keys` fields: number of samples, mean,
+    median and a bootstrap confidence interval of the median of `value`, plus
+    the samples themselves (e.g. for ratio_ci).
+    """
+    rng = np.random.default_rng(BOOTSTRAP_SEED)
+    statistics: Dict[tuple, Dict[str, Any]] = {}
+    for key, indices in group_indices(results, keys).items():
+        samples = results[value][indices]
+        samples = samples[~np.isnan(samples)]
+        ci_low, ci_high = bootstrap_ci(samples, np.median, confidence, resamples, rng)
+        statistics[key] = {
+            "n": len(samples),
+            "mean": float(np.mean(samples)),
+            "median": float(np.median(samples)),
+            "ci_low": ci_low,
+            "ci_high": ci_high,
+            "samples": samples,
+        }
+    return statistics
+
+
+def read_text_results(dir_path: str) -> List[Dict[str, Any]]:
+    """
+    Converts the "<label>: SQLite=...s, DuckDB=...s" lines of the <benchmark>_SF_<sf>.txt
+    files in a directory (the format written before this store existed) into
+    records. Their run metadata is unknown and left empty.
+    """
+    line_pattern = re.compile(r"^(.+): SQLite=([0-9.eE+-]+)s, DuckDB=([0-9.eE+-]+)s$")
+    records = []
+    for filename in sorted(os.listdir(dir_path)):
+        match = re.match(r"^(TPC-[HC])_SF_([0-9.]+)\.txt$", filename)
+        if match is None:
+            continue
+        benchmark, scale_factor = match.group(1), float(match.group(2))
+        counts: Dict[str, int] = {}
+        with open(os.path.join(dir_path, filename), "r") as f:
+            for line in f:
+                parsed = line_pattern.match(line.strip())
+                if parsed is None:
+                    continue
+                label, sqlite_time, duckdb_time = parsed.groups()
+                iteration = counts[label] = counts.get(label, -1) + 1
+                for engine, wall in (("SQLite", sqlite_time), ("DuckDB", duckdb_time)):
+                    records.append({"schema": SCHEMA_VERSION, "run_id": "imported", "benchmark": benchmark,
+                                    "scale_factor": scale_factor, "query": label, "engine": engine,
+                                    "cache_mode": "none", "variant": "", "iteration": iteration,
+                                    "wall_s": float(wall)})
+    return records
+
+
+def import_text_results(dir_path: str, path: str) -> int:
+    """
+    Appends the text results of a directory (see read_text_results) to a results file.
+
+    Returns:
+        int: Number of records appended to `path`.
+    """
+    records = read_text_results(dir_path)
+    append_records(path, records)
+    return len(records)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print(f"Usage: python {sys.argv[0]} <dir with TPC-*_SF_*.txt files> <results.jsonl>")
+        sys.exit(1)
+    print(f"Imported {import_text_results(sys.argv[1], sys.argv[2])} records into {sys.argv[2]}")
@@ -0,0 +1,177 @@
+from typing import Callable, Optional
+from functools import lru_cache
+import re
+
+# strftime formats of the EXTRACT fields SQLite can compute
+EXTRACT_FORMATS = {
+    "year": "%Y",
+    "month": "%m",
+    "day": "%d",
+    "hour": "%H",
+    "minute": "%M",
+    "second": "%S",
+}
+
+DATE_LITERAL = re.compile(r"\bdate\s+'(\d{4}-\d{2}-\d{2})'", re.IGNORECASE)
+CAST_DATE = re.compile(r"\bcast\s*\(\s*('[^']*')\s+as\s+date\s*\)", re.IGNORECASE)
+# <date expression> +/- INTERVAL 'n' unit, where the expression is DATE(...) or a column
+DATE_INTERVAL = re.compile(
+    r"(DATE\('[^']*'\)|\b[a-z_][a-z0-9_.]*)\s*([+-])\s*interval\s*'?(\d+)'?\s*(day|month|year)s?\b",
+    re.IGNORECASE)
+EXTRACT = re.compile(r"\bextract\s*\(", re.IGNORECASE)
+SUBSTRING = re.compile(r"\bsubstring\s*\(", re.IGNORECASE)
+# ") AS alias (col, ...)": a derived table with a column alias list
+DERIVED_COLUMNS = re.compile(r"\)\s*AS\s+([a-z_][a-z0-9_]*)\s*\(([a-z0-9_,\s]+)\)", re.IGNORECASE)
+
+
+def __skip_string(sql: str, i: int) -> int:
+    """Index just past the string literal starting at sql[i]."""
+    i += 1
+    while i < len(sql):
+        if sql[i] == "'":
+            if i + 1 < len(sql) and sql[i + 1] == "'":
+                i += 2
+                continue
+            return i + 1
+        i += 1
+    raise ValueError("Unterminated string literal")
+
+
+def closing_paren(sql: str, start: int) -> int:
+    """Index of the parenthesis closing the one at sql[start], ignoring parentheses in string literals."""
+    depth = 0
+    i = start
+    while i < len(sql):
+        c = sql[i]
+        if c == "'":
+            i = __skip_string(sql, i)
+            continue
+        if c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+            if depth == 0:
+                return i
+        i += 1
+    raise ValueError(f"Unbalanced parenthesis at offset {start}")
+
+
+def opening_paren(sql: str, end: int) -> int:
+    """Index of the parenthesis opened by the one closing at sql[end] (no string literals may contain parentheses)."""
+    depth = 0
+    for i in range(end, -1, -1):
+        if sql[i] == ")":
+            depth += 1
+        elif sql[i] == "(":
+            depth -= 1
+            if depth == 0:
+                return i
+    raise ValueError(f"Unbalanced parenthesis at offset {end}")
+
+
+def top_level_keyword(body: str, keyword: str) -> Optional[int]:
+    """Offset of `keyword` in `body` outside any parentheses or string literals, or None."""
+    pattern = re.compile(rf"\b{keyword}\b", re.IGNORECASE)
+    depth = 0
+    i = 0
+    while i < len(body):
+        c = body[i]
+        if c == "'":
+            i = __skip_string(body, i)
+            continue
+        if c == "(":
+            depth += 1
+        elif c == ")":
+            depth -= 1
+        elif depth == 0 and pattern.match(body, i) and (i == 0 or not (body[i - 1].isalnum() or body[i - 1] == "_")):
+            return i
+        i += 1
+    return None
+
+
+def rewrite_calls(sql: str, pattern: re.Pattern, rewrite: Callable[[str], str]) -> str:
+    """
+    Replaces every call matched by `pattern` (which ends at the opening
+    parenthesis) by rewrite(<text between the parentheses>). Arguments are
+    rewritten first, so nested calls work.
+    """
+    while True:
+        match = pattern.search(sql)
+        if match is None:
+            return sql
+        open_idx = match.end() - 1
+        close_idx = closing_paren(sql, open_idx)
+        body = rewrite_calls(sql[open_idx + 1:close_idx], pattern, rewrite)
+        sql = sql[:match.start()] + rewrite(body) + sql[close_idx + 1:]
+
+
+def __extract(body: str) -> str:
+    """extract(<field> FROM <expr>) -> CAST(strftime(<format>, <expr>) AS INTEGER)"""
+    field, _, expr = body.strip().partition(" ")
+    expr = expr.strip()
+    if not expr.lower().startswith("from"):
+        raise ValueError(f"Unsupported EXTRACT: {body}")
+    fmt = EXTRACT_FORMATS.get(field.lower())
+    if fmt is None:
+        raise ValueError(f"Unsupported EXTRACT field: {field}")
+    return f"CAST(strftime('{fmt}', {expr[4:].strip()}) AS INTEGER)"
+
+
+def __substring(body: str) -> str:
+    """substring(<expr> FROM <start> [FOR <length>]) -> substr(<expr>, <start>[, <length>])"""
+    from_idx = top_level_keyword(body, "from")
+    if from_idx is None:
+        return f"substr({body})"
+    expr, rest = body[:from_idx].strip(), body[from_idx + 4:]
+    for_idx = top_level_keyword(rest, "for")
+    if for_idx is None:
+        return f"substr({expr}, {rest.strip()})"
+    return f"substr({expr}, {rest[:for_idx].strip()}, {rest[for_idx + 3:].strip()})"
+
+
+def __date_interval(match: re.Match) -> str:
+    """<date> +/- INTERVAL 'n' unit -> DATE(<date>, '+/-n unit')"""
+    expr, sign, amount, unit = match.groups()
+    if expr.upper().startswith("DATE("):
+        expr = expr[5:-1]
+    return f"DATE({expr}, '{sign}{amount} {unit.lower()}')"
+
+
+def __derived_columns(sql: str) -> str:
+    """
+    (<subquery>) AS t (a, b) -> (WITH t (a, b) AS (<subquery>) SELECT * FROM t) AS t,
+    since SQLite accepts column alias lists on CTEs but not on derived tables.
+    """
+    while True:
+        match = DERIVED_COLUMNS.search(sql)
+        if match is None:
+            return sql
+        close_idx = match.start()
+        open_idx = opening_paren(sql, close_idx)
+        alias, columns = match.group(1), " ".join(match.group(2).split())
+        subquery = sql[open_idx + 1:close_idx]
+        sql = (f"{sql[:open_idx]}(WITH {alias} ({columns}) AS ({subquery}) SELECT * FROM {alias}) AS {alias}"
+               f"{sql[match.end():]}")
+
+
+@lru_cache(maxsize=None)
+def to_sqlite_query(query: str) -> str:
+    """
+    Translates a DuckDB (ANSI) query into SQLite's dialect:
+    - CAST('...' AS date) and date '...' literals become DATE('...')
+    - date +/- INTERVAL 'n' day/month/year becomes DATE(date, '+/-n unit')
+    - extract(field FROM expr) becomes CAST(strftime(...) AS INTEGER)
+    - substring(expr FROM start FOR length) becomes substr(expr, start, length)
+    - column alias lists of derived tables move onto an equivalent CTE
+
+    Translations are cached per query text.
+
+    Raises:
+        ValueError: for constructs it cannot translate.
+    """
+    sql = CAST_DATE.sub(r"DATE(\1)", query)
+    sql = DATE_LITERAL.sub(r"DATE('\1')", sql)
+    sql = DATE_INTERVAL.sub(__date_interval, sql)
+    sql = rewrite_calls(sql, EXTRACT, __extract)
+    sql = rewrite_calls(sql, SUBSTRING, __substring)
+    return __derived_columns(sql)
@@ -0,0 +1,35 @@
+from typing import Any, Sequence
+import re
+
+# Positional placeholder used by the registered statements (sqlite3 "qmark" style)
+PLACEHOLDER = re.compile(r"\?")
+
+
+def sql_str(value: str) -> str:
+    """Quote a string as an SQL literal."""
+    return "'" + value.replace("'", "''") + "'"
+
+
+def sql_literal(value: Any) -> str:
+    """Render a bound parameter as an SQL literal."""
+    if value is None:
+        return "NULL"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    return sql_str(str(value))
+
+
+def inline_parameters(sql: str, params: Sequence[Any]) -> str:
+    """Substitute each `?` of a statement with the literal of the matching parameter."""
+    if sql.count("?") != len(params):
+        raise ValueError(f"Statement has {sql.count('?')} placeholders but {len(params)} parameters were given")
+    values = iter(params)
+    return PLACEHOLDER.sub(lambda _: sql_literal(next(values)), sql)
+
+
+def numbered_placeholders(sql: str) -> str:
+    """Rewrite `?` placeholders as `$1, $2, ...`, the form accepted by DuckDB's PREPARE."""
+    counter = iter(range(1, sql.count("?") + 1))
+    return PLACEHOLDER.sub(lambda _: f"${next(counter)}", sql)
@@ -1,45 +1,191 @@
-from typing import List, Tuple, Any
+from typing import List, Tuple, Any, Dict, Iterable, Iterator, Sequence, Optional
 import sqlite3
 import csv
+import itertools
+import os
+import resource
+import sys
+import time
+
+from sql_params import inline_parameters
+
+DEFAULT_BATCH_SIZE = 100_000
+# How execute_fetch hands result rows to Python: "all" builds the full list of tuples, "stream" walks
+# the result in fetchmany chunks and keeps only the row count, "count" steps through the rows of the
+# unchanged query one at a time and keeps only their count
+FETCH_MODES = ("all", "stream", "count")
+# VM instructions between two progress handler calls while profiling (granularity of the vm_steps count)
+PROFILE_PROGRESS_STEPS = 1000
+# Compiled statements kept per connection by sqlite3, keyed by SQL text (the default is 128)
+STATEMENT_CACHE_SIZE = 256
+
+# Settings used while bulk loading; durability is traded for speed and restored afterwards
+BULK_LOAD_PRAGMAS: Dict[str, str] = {
+    "journal_mode": "OFF",
+    "synchronous": "OFF",
+    "cache_size": "-1048576",  # negative means KiB, i.e. 1 GiB of page cache
+    "temp_store": "MEMORY",
+}
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB (ru_maxrss is KB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def current_rss_mb() -> Optional[float]:
+    """Current resident set size of this process in MB, from /proc/self/statm (None where there is no /proc)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except OSError:
+        return None
 
 class SQLite:
-    def __init__(self, db_path: str) -> None:
-        self.connection: sqlite3.Connection = sqlite3.connect(db_path)
+    def __init__(self, db_path: str, read_only: bool = False) -> None:
+        self.db_path: str = db_path
+        self.read_only: bool = read_only
+        self.connection: sqlite3.Connection = self.__connect()
         self.cursor: sqlite3.Cursor = self.connection.cursor()
+        # Whether execute_prepared binds parameters (True) or inlines them as literals
+        self.use_prepared: bool = True
+        self.__statements: Dict[str, str] = {}
+        self.__saved_pragmas: Dict[str, Any] = {}
+        self.__deferred_indexes: List[Tuple[str, str]] = []
+
+    def __connect(self) -> sqlite3.Connection:
+        if self.read_only:
+            # mode=ro lets several processes read the file while nothing can write through this connection.
+            # Read-only connections may be handed to worker threads (one thread at a time).
+            return sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, cached_statements=STATEMENT_CACHE_SIZE,
+                                   check_same_thread=False)
+        return sqlite3.connect(self.db_path, cached_statements=STATEMENT_CACHE_SIZE)
+
+    def begin_bulk_load(self) -> None:
+        """
+        Enter bulk load mode: relax journaling/sync settings and drop secondary indexes.
+
+        The dropped indexes are rebuilt by `end_bulk_load` once the data is in.
+        Primary keys and UNIQUE constraints are part of the table definition
+        and cannot be deferred, so they are still maintained row by row.
+        """
+        self.connection.commit()
+        for pragma, value in BULK_LOAD_PRAGMAS.items():
+            self.__saved_pragmas[pragma] = self.cursor.execute(f"PRAGMA {pragma};").fetchone()[0]
+            self.cursor.execute(f"PRAGMA {pragma} = {value};")
+
+        # Explicit CREATE INDEX statements have their SQL stored; autoindexes do not
+        self.cursor.execute("SELECT name, sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL;")
+        self.__deferred_indexes = self.cursor.fetchall()
+        for name, _ in self.__deferred_indexes:
+            self.cursor.execute(f"DROP INDEX {name};")
+        self.connection.commit()
+
+    def end_bulk_load(self) -> Dict[str, float]:
+        """
+        Leave bulk load mode: build the deferred indexes and restore the durable settings.
+
+        Returns:
+            Dict[str, float]: number of indexes built and the time spent building them.
+        """
+        start = time.perf_counter()
+        try:
+            for _, sql in self.__deferred_indexes:
+                self.cursor.execute(sql)
+            self.connection.commit()
+        finally:
+            index_seconds = time.perf_counter() - start
+            for pragma, value in self.__saved_pragmas.items():
+                self.cursor.execute(f"PRAGMA {pragma} = {value};")
+            built = len(self.__deferred_indexes)
+            self.__saved_pragmas = {}
+            self.__deferred_indexes = []
 
-    def load_csv(self, table_name: str, csv_path: str) -> None:
-        # 1) Get the column names from the table schema
+        return {"indexes": built, "seconds": index_seconds}
+
+    def column_names(self, table_name: str) -> List[str]:
+        """Return the column names of a table in schema order."""
         self.cursor.execute(f"PRAGMA table_info({table_name});")
         cols_info = self.cursor.fetchall()
         if not cols_info:
             raise ValueError(f"Table {table_name} has no columns or does not exist")
-        cols = [col[1] for col in cols_info]  # column-name is at index 1
+        return [col[1] for col in cols_info]  # column-name is at index 1
+
+    def load_csv(self, table_name: str, csv_path: str, batch_size: int = DEFAULT_BATCH_SIZE,
+                 commit_per_batch: bool = False) -> Dict[str, float]:
+        """
+        Stream a CSV file into a table in bounded batches of `batch_size` rows.
+
+        Rows are never materialized as a whole; each batch is handed to
+        `executemany` as soon as it is read. Commits happen after every batch
+        when `commit_per_batch` is set, otherwise once per table.
+
+        Returns:
+            Dict[str, float]: rows loaded, elapsed seconds, rows/s and the RSS of the load (see load_rows).
+        """
+        cols = self.column_names(table_name)
+        with open(csv_path, newline='') as f:
+            return self.load_rows(table_name, self.__iter_csv_rows(csv.reader(f), cols),
+                                  batch_size=batch_size, commit_per_batch=commit_per_batch)
+
+    def load_rows(self, table_name: str, rows: Iterable[Sequence[Any]], batch_size: int = DEFAULT_BATCH_SIZE,
+                  commit_per_batch: bool = False) -> Dict[str, float]:
+        """
+        Insert rows (in table column order) from any iterable in bounded batches.
 
-        # 2) Build the INSERT statement
+        Used by `load_csv` and by the direct DuckDB transfer, which passes
+        natively typed tuples instead of CSV text.
+
+        Returns:
+            Dict[str, float]: rows loaded, elapsed seconds, rows/s, the highest RSS (MB) sampled after each
+            batch of this load and how far it rose above the RSS the load started at. Without /proc, the
+            peak is the process-wide high-water mark (which may predate the load) and the growth is None.
+
+        Raises:
+            ValueError: if batch_size is less than 1.
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        cols = self.column_names(table_name)
         placeholders = ", ".join("?" for _ in cols)
         insert_sql = f"INSERT INTO {table_name} ({', '.join(cols)}) VALUES ({placeholders});"
 
-        # 3) Read the CSV, detect header, and collect all data rows
-        rows = []
-        with open(csv_path, newline='') as f:
-            reader = csv.reader(f)
-            try:
-                first = next(reader)
-            except StopIteration:
-                return  # empty file, nothing to load
-
-            # If the first row *exactly* matches our column names, skip it
-            if first != cols:
-                rows.append(first)
-
-            # Read the rest
-            for row in reader:
-                rows.append(row)
-
-        # 4) Bulk‐insert
-        if rows:
-            self.cursor.executemany(insert_sql, rows)
-            self.connection.commit()
+        total_rows = 0
+        # ru_maxrss is a lifetime high-water mark (e.g. of an in-process dbgen), so the loader's own
+        # memory use is sampled as the current RSS after every batch instead
+        start_rss = current_rss_mb()
+        load_peak_rss = start_rss
+        start = time.perf_counter()
+        rows = iter(rows)
+        while True:
+            batch = list(itertools.islice(rows, batch_size))
+            if not batch:
+                break
+            self.cursor.executemany(insert_sql, batch)
+            total_rows += len(batch)
+            if commit_per_batch:
+                self.connection.commit()
+            if start_rss is not None:
+                load_peak_rss = max(load_peak_rss, current_rss_mb())
+        self.connection.commit()
+        elapsed = time.perf_counter() - start
+
+        return {
+            "rows": total_rows,
+            "seconds": elapsed,
+            "rows_per_sec": total_rows / elapsed if elapsed > 0 else 0.0,
+            "peak_rss_mb": load_peak_rss if start_rss is not None else peak_rss_mb(),
+            "rss_growth_mb": load_peak_rss - start_rss if start_rss is not None else None,
+        }
+
+    @staticmethod
+    def __iter_csv_rows(reader: Iterator[List[str]], cols: List[str]) -> Iterator[List[str]]:
+        """Yield data rows, skipping the first row if it *exactly* matches the column names."""
+        first = next(reader, None)
+        if first is None:
+            return  # empty file, nothing to load
+        if first != cols:
+            yield first
+        yield from reader
 
     def __get_column_metadata(self) -> Tuple[List[str], List[str]]:
         names: List[str] = []
@@ -61,5 +207,150 @@ class SQLite:
 
         return rows, names, types
 
+    def result_metadata(self, query: str) -> Tuple[List[str], List[str]]:
+        """
+        Column names and types of a query's result. sqlite3 cannot describe a
+        statement without stepping it, so they are read from the cursor, which
+        must have just executed `query`.
+        """
+        return self.__get_column_metadata()
+
+    def execute_fetch(self, query: str, fetch_mode: str = "all", fetch_metadata: bool = False,
+                      batch_size: int = DEFAULT_BATCH_SIZE) -> Tuple[Any, List[str], List[str], int]:
+        """
+        Execute a query and retrieve its result according to `fetch_mode` (see FETCH_MODES).
+
+        sqlite3 only runs a statement up to its first row in execute(); the
+        remaining rows are computed while fetching, so the fetch time includes
+        engine work after the first row.
+
+        Returns:
+            Tuple[Any, List[str], List[str], int]: the rows ("all") or the row count, the column
+            names and types (if fetch_metadata), and the nanoseconds spent fetching.
+        """
+        if fetch_mode not in FETCH_MODES:
+            raise ValueError(f"Unsupported SQLite fetch mode: {fetch_mode}")
+        # "count" never wraps the query in a count(*), which would let the planner skip the
+        # columns nobody reads and time a cheaper query
+        self.cursor.execute(query)
+        start = time.perf_counter_ns()
+        if fetch_mode == "all":
+            result: Any = self.cursor.fetchall()
+        elif fetch_mode == "count":
+            result = sum(1 for _ in self.cursor)
+        else:
+            result = 0
+            while True:
+                chunk = self.cursor.fetchmany(batch_size)
+                if not chunk:
+                    break
+                result += len(chunk)
+        fetch_ns = time.perf_counter_ns() - start
+
+        names, types = self.__get_column_metadata() if fetch_metadata else ([], [])
+        return result, names, types, fetch_ns
+
+    def profile_query(self, query: str, batch_size: int = DEFAULT_BATCH_SIZE) -> Dict[str, Any]:
+        """
+        Execute a query once for profiling: its EXPLAIN QUERY PLAN, the size of
+        its bytecode program and the number of VM instructions it executed.
+
+        Python's sqlite3 module does not expose sqlite3_stmt_scanstatus, so
+        executed instructions are counted with a progress handler instead, in
+        steps of PROFILE_PROGRESS_STEPS.
+        """
+        plan = self.query_plan(query)
+        program_size = len(self.cursor.execute(f"EXPLAIN {query}").fetchall())
+
+        progress_calls = 0
+
+        def count_progress() -> int:
+            nonlocal progress_calls
+            progress_calls += 1
+            return 0
+
+        self.connection.set_progress_handler(count_progress, PROFILE_PROGRESS_STEPS)
+        try:
+            start = time.perf_counter()
+            self.cursor.execute(query)
+            rows = 0
+            while True:
+                chunk = self.cursor.fetchmany(batch_size)
+                if not chunk:
+                    break
+                rows += len(chunk)
+            latency = time.perf_counter() - start
+        finally:
+            self.connection.set_progress_handler(None, 0)
+
+        return {
+            "latency_s": latency,
+            "rows_returned": rows,
+            "plan": plan,
+            "program_opcodes": program_size,
+            "vm_steps": progress_calls * PROFILE_PROGRESS_STEPS,
+        }
+
+    def query_plan(self, query: str, params: Sequence[Any] = ()) -> List[Dict[str, Any]]:
+        """The EXPLAIN QUERY PLAN nodes of a query (with `params` bound to its placeholders)."""
+        return [{"id": node_id, "parent": parent, "detail": detail}
+                for node_id, parent, _, detail in self.cursor.execute(f"EXPLAIN QUERY PLAN {query}", params).fetchall()]
+
+    def prepare(self, name: str, sql: str) -> None:
+        """
+        Register a statement with `?` placeholders under a name.
+
+        sqlite3 compiles the statement on its first execution and reuses the
+        compiled form from the connection's statement cache afterwards.
+        """
+        self.__statements[name] = sql
+
+    def has_statement(self, name: str) -> bool:
+        return name in self.__statements
+
+    def execute_prepared(self, name: str, params: Sequence[Any] = ()) -> List[Tuple[Any, ...]]:
+        """
+        Execute a registered statement with bound parameters, or, when
+        `use_prepared` is off, as an ad-hoc statement with the parameters inlined.
+        """
+        sql = self.__statements[name]
+        if self.use_prepared:
+            self.cursor.execute(sql, params)
+        else:
+            self.cursor.execute(inline_parameters(sql, params))
+        return self.cursor.fetchall()
+
+    def iter_query_rows(self, query: str, batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[Tuple[Any, ...]]:
+        """Stream the result rows of a query in `fetchmany` chunks on a separate cursor."""
+        cursor = self.connection.cursor()
+        try:
+            cursor.execute(query)
+            while True:
+                chunk = cursor.fetchmany(batch_size)
+                if not chunk:
+                    break
+                yield from chunk
+        finally:
+            cursor.close()
+
+    def begin(self) -> None:
+        self.connection.execute("BEGIN;")
+
+    def commit(self) -> None:
+        self.connection.execute("COMMIT;")
+
+    def rollback(self) -> None:
+        self.connection.rollback()
+
+    def reopen(self) -> None:
+        """
+        Open a fresh connection to the same file, discarding SQLite's page
+        cache. The current connection is closed first (closing it twice is
+        harmless, e.g. after make_cold's close).
+        """
+        self.close()
+        self.connection = self.__connect()
+        self.cursor = self.connection.cursor()
+
     def close(self) -> None:
         self.connection.close()
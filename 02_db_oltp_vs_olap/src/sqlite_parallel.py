@@ -0,0 +1,129 @@
+from typing import Dict, List, Tuple, Any, Callable, Optional
+from concurrent.futures import ThreadPoolExecutor
+import re
+
+from sqlite_handler import SQLite
+
+# Per-partition versions of scan-heavy TPC-H aggregates over lineitem: the
+# select list, returning mergeable partial aggregates (sums and counts instead
+# of averages), and the GROUP BY of each. Their filter is taken from the
+# query text itself (see partial_query).
+PARTIAL_AGGREGATES: Dict[int, Tuple[str, str]] = {
+    1: ("l_returnflag, l_linestatus, sum(l_quantity), sum(l_extendedprice), sum(l_extendedprice * (1 - l_discount)), "
+        "sum(l_extendedprice * (1 - l_discount) * (1 + l_tax)), sum(l_discount), count(*)",
+        "l_returnflag, l_linestatus"),
+    6: ("sum(l_extendedprice * l_discount)", ""),
+}
+
+
+def query_filter(query: str) -> str:
+    """The WHERE condition of a single-table query (up to its GROUP BY, ORDER BY or end)."""
+    match = re.search(r"\bWHERE\b(.*?)(?:\bGROUP\s+BY\b|\bORDER\s+BY\b|;|$)", query,
+                      flags=re.IGNORECASE | re.DOTALL)
+    if match is None:
+        raise ValueError("Query has no WHERE clause to partition")
+    return match.group(1).strip()
+
+
+def partial_query(query_number: int, query: str) -> str:
+    """
+    Per-partition version of a supported TPC-H query (in SQLite dialect): its
+    partial aggregates for the lineitem rows with rowid in [?, ?] that pass the
+    query's own filter.
+    """
+    select_list, group_by = PARTIAL_AGGREGATES[query_number]
+    sql = f"SELECT {select_list} FROM lineitem WHERE rowid BETWEEN ? AND ? AND ({query_filter(query)})"
+    return f"{sql} GROUP BY {group_by}" if group_by else sql
+
+
+def merge_q1(partials: List[List[Tuple[Any, ...]]]) -> List[Tuple[Any, ...]]:
+    """Combines Q1 partial groups and derives the averages from the merged sums and counts."""
+    groups: Dict[Tuple[str, str], List[float]] = {}
+    for rows in partials:
+        for returnflag, linestatus, *sums in rows:
+            merged = groups.setdefault((returnflag, linestatus), [0.0] * len(sums))
+            for i, value in enumerate(sums):
+                merged[i] += value
+    result = []
+    for (returnflag, linestatus), (qty, base, disc_price, charge, disc, count) in sorted(groups.items()):
+        result.append((returnflag, linestatus, qty, base, disc_price, charge,
+                       qty / count, base / count, disc / count, int(count)))
+    return result
+
+
+def merge_q6(partials: List[List[Tuple[Any, ...]]]) -> List[Tuple[Any, ...]]:
+    """Adds up the Q6 partial revenues; SUM over no rows is NULL, as in the single query."""
+    revenues = [rows[0][0] for rows in partials if rows and rows[0][0] is not None]
+    return [(sum(revenues) if revenues else None,)]
+
+
+# Result columns of the merged rows, as named by the original queries
+COLUMNS: Dict[int, List[str]] = {
+    1: ["l_returnflag", "l_linestatus", "sum_qty", "sum_base_price", "sum_disc_price", "sum_charge",
+        "avg_qty", "avg_price", "avg_disc", "count_order"],
+    6: ["revenue"],
+}
+
+MERGES: Dict[int, Callable[[List[List[Tuple[Any, ...]]]], List[Tuple[Any, ...]]]] = {
+    1: merge_q1,
+    6: merge_q6,
+}
+
+
+def rowid_partitions(db: SQLite, table_name: str, partitions: int) -> List[Tuple[int, int]]:
+    """Splits the rowid range of a table into `partitions` contiguous, equally wide ranges."""
+    rows, _, _ = db.execute_query(f"SELECT MIN(rowid), MAX(rowid) FROM {table_name};", fetch_metadata=False)
+    low, high = rows[0]
+    if low is None:
+        return []
+    width = (high - low + 1 + partitions - 1) // partitions
+    return [(start, min(start + width - 1, high)) for start in range(low, high + 1, width)]
+
+
+class ParallelSQLite:
+    """
+    Experimental intra-query parallelism for SQLite: runs a TPC-H aggregate as
+    rowid-range partitions of lineitem on a pool of read-only connections and
+    merges the partial aggregates in Python.
+
+    sqlite3 releases the GIL while a statement runs, so the partitions execute
+    in parallel threads. `queries` holds the SQLite-dialect text of the
+    queries to run by number; those not in PARTIAL_AGGREGATES are ignored.
+    """
+    def __init__(self, db_path: str, workers: int, queries: Dict[int, str]) -> None:
+        self.db_path: str = db_path
+        self.workers: int = workers
+        self.partial_queries: Dict[int, str] = {n: partial_query(n, query) for n, query in queries.items()
+                                                if n in PARTIAL_AGGREGATES}
+        self.connections: List[SQLite] = []
+        self.executor: Optional[ThreadPoolExecutor] = None
+        self.reopen()
+        self.partitions: List[Tuple[int, int]] = rowid_partitions(self.connections[0], "lineitem", workers)
+
+    def supports(self, query_number: int) -> bool:
+        return query_number in self.partial_queries
+
+    def execute_query(self, query_number: int) -> List[Tuple[Any, ...]]:
+        """Runs one partition per connection and returns the merged result rows of the query."""
+        name = f"tpch_q{query_number}_partition"
+        futures = [self.executor.submit(connection.execute_prepared, name, partition)
+                   for connection, partition in zip(self.connections, self.partitions)]
+        return MERGES[query_number]([future.result() for future in futures])
+
+    def reopen(self) -> None:
+        """
+        Open a fresh set of connections (e.g. for cold runs, see
+        benchmark_utils.make_cold), closing the current ones first.
+        """
+        self.close()
+        self.connections = [SQLite(self.db_path, read_only=True) for _ in range(self.workers)]
+        for connection in self.connections:
+            for query_number, sql in self.partial_queries.items():
+                connection.prepare(f"tpch_q{query_number}_partition", sql)
+        self.executor = ThreadPoolExecutor(max_workers=self.workers)
+
+    def close(self) -> None:
+        if self.executor is not None:
+            self.executor.shutdown()
+        for connection in self.connections:
+            connection.close()
@@ -0,0 +1,301 @@
+from typing import Dict, List, Any, Callable, Optional
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, Future
+import bisect
+import random
+import sqlite3
+import time
+
+import duckdb
+from tabulate import tabulate
+
+from sqlite_handler import SQLite
+from duckdb_handler import DuckDB
+from benchmark_utils import percentile
+from tpcc_transactions import (stock_level_transaction, delivery_transaction, delivery_set_transaction,
+                               order_status_transaction,
+                               new_order_transaction, payment_transaction, TransactionRollback, nurand, last_name,
+                               DISTRICTS_PER_WAREHOUSE)
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS_MS: List[float] = [0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000]
+
+
+def new_order(db: Any, w_id: int, rng: random.Random, population: Dict[str, int]) -> Any:
+    """New-Order input generation (clause 2.4.1): 5-15 lines, 1% remote lines, 1% unused item."""
+    d_id = rng.randint(1, DISTRICTS_PER_WAREHOUSE)
+    c_id = nurand(rng, 1023, 1, population["customers"])
+    ol_cnt = rng.randint(5, 15)
+    items = []
+    for _ in range(ol_cnt):
+        i_id = nurand(rng, 8191, 1, population["items"])
+        supply_w_id = w_id
+        if population["warehouses"] > 1 and rng.randint(1, 100) == 1:
+            supply_w_id = rng.choice([w for w in range(1, population["warehouses"] + 1) if w != w_id])
+        items.append((i_id, supply_w_id, rng.randint(1, 10)))
+    if rng.randint(1, 100) == 1:
+        i_id, supply_w_id, quantity = items[-1]
+        items[-1] = (population["items"] + 1, supply_w_id, quantity)
+    return new_order_transaction(db, w_id=w_id, d_id=d_id, c_id=c_id, items=items)
+
+
+def payment(db: Any, w_id: int, rng: random.Random, population: Dict[str, int]) -> Any:
+    """Payment input generation (clause 2.5.1): 15% remote customers, 60% looked up by last name."""
+    d_id = rng.randint(1, DISTRICTS_PER_WAREHOUSE)
+    c_w_id, c_d_id = w_id, d_id
+    if population["warehouses"] > 1 and rng.randint(1, 100) <= 15:
+        c_w_id = rng.choice([w for w in range(1, population["warehouses"] + 1) if w != w_id])
+        c_d_id = rng.randint(1, DISTRICTS_PER_WAREHOUSE)
+    h_amount = round(rng.uniform(1.0, 5000.0), 2)
+    if rng.randint(1, 100) <= 60:
+        c_last = last_name(nurand(rng, 255, 0, min(999, population["customers"] - 1)))
+        return payment_transaction(db, w_id=w_id, d_id=d_id, c_w_id=c_w_id, c_d_id=c_d_id,
+                                   h_amount=h_amount, by_name=True, c_last=c_last)
+    c_id = nurand(rng, 1023, 1, population["customers"])
+    return payment_transaction(db, w_id=w_id, d_id=d_id, c_w_id=c_w_id, c_d_id=c_d_id,
+                               h_amount=h_amount, by_name=False, c_id=c_id)
+
+
+def stock_level(db: Any, w_id: int, rng: random.Random, population: Dict[str, int]) -> Any:
+    d_id = rng.randint(1, DISTRICTS_PER_WAREHOUSE)
+    return stock_level_transaction(db, w_id=w_id, d_id=d_id, threshold=rng.randint(10, 20))
+
+
+def delivery(db: Any, w_id: int, rng: random.Random, population: Dict[str, int]) -> Any:
+    return delivery_transaction(db, w_id=w_id, o_carrier_id=rng.randint(1, 10))
+
+
+def delivery_set(db: Any, w_id: int, rng: random.Random, population: Dict[str, int]) -> Any:
+    return delivery_set_transaction(db, w_id=w_id, o_carrier_id=rng.randint(1, 10))
+
+
+def order_status(db: Any, w_id: int, rng: random.Random, population: Dict[str, int]) -> Any:
+    return order_status_transaction(db, w_id=w_id, d_id=rng.randint(1, DISTRICTS_PER_WAREHOUSE), by_name=True)
+
+
+# Transaction type -> body run by a client against its home warehouse
+TRANSACTIONS: Dict[str, Callable[[Any, int, random.Random, Dict[str, int]], Any]] = {
+    "NewOrder": new_order,
+    "Payment": payment,
+    "StockLevel": stock_level,
+    "Delivery": delivery,
+    "DeliverySet": delivery_set,
+    "OrderStatus": order_status,
+}
+# Transaction type -> relative weight in the mix (clause 5.2.3 minimum percentages)
+TRANSACTION_MIX: Dict[str, int] = {
+    "NewOrder": 45,
+    "Payment": 43,
+    "StockLevel": 4,
+    "Delivery": 4,
+    "OrderStatus": 4,
+}
+
+
+def is_retryable(e: Exception) -> bool:
+    """Whether an error is a lock/write conflict (SQLITE_BUSY, DuckDB conflicts) rather than a bug."""
+    if isinstance(e, sqlite3.OperationalError):
+        message = str(e).lower()
+        return "locked" in message or "busy" in message
+    return isinstance(e, duckdb.TransactionException)
+
+
+def population_sizes(db: Any) -> Dict[str, int]:
+    """Number of warehouses, items and customers per district the transaction inputs are drawn from."""
+    sizes = {}
+    for key, sql in (("warehouses", "SELECT COUNT(*) FROM warehouse;"),
+                     ("items", "SELECT MAX(i_id) FROM item;"),
+                     ("customers", "SELECT MAX(c_id) FROM customer;")):
+        rows, _, _ = db.execute_query(sql, fetch_metadata=False)
+        sizes[key] = rows[0][0] or 0
+    return sizes
+
+
+def client_loop(db: Any, w_id: int, duration: float, mix: Dict[str, int], seed: int,
+                population: Dict[str, int], max_retries: int = 3) -> Dict[str, Dict[str, Any]]:
+    """
+    Emulates one terminal: runs transactions drawn from `mix` against its home
+    warehouse until `duration` seconds have passed.
+
+    Latency is measured from the first attempt to the end of the transaction, so
+    it includes time lost to aborted attempts. Transactions rolled back by design
+    (TransactionRollback) count as completed, as in TPC-C.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: latencies (s) and rollback/abort/retry/failure counts per transaction type.
+    """
+    rng = random.Random(seed)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    stats = {name: {"latencies": [], "rollbacks": 0, "aborts": 0, "retries": 0, "failures": 0} for name in names}
+
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        name = rng.choices(names, weights)[0]
+        type_stats = stats[name]
+        start = time.perf_counter()
+        for attempt in range(max_retries + 1):
+            try:
+                db.begin()
+                TRANSACTIONS[name](db, w_id, rng, population)
+                db.commit()
+                type_stats["latencies"].append(time.perf_counter() - start)
+                break
+            except TransactionRollback:
+                db.rollback()
+                type_stats["rollbacks"] += 1
+                type_stats["latencies"].append(time.perf_counter() - start)
+                break
+            except Exception as e:
+                if not is_retryable(e):
+                    raise
+                try:
+                    db.rollback()
+                except Exception:
+                    pass  # the engine may already have rolled back
+                type_stats["aborts"] += 1
+                if attempt < max_retries:
+                    type_stats["retries"] += 1
+        else:
+            type_stats["failures"] += 1
+
+    return stats
+
+
+def sqlite_client(db_path: str, w_id: int, duration: float, mix: Dict[str, int], seed: int,
+                  population: Dict[str, int], max_retries: int = 3,
+                  use_prepared: bool = True) -> Dict[str, Dict[str, Any]]:
+    """Runs a client on its own SQLite connection; usable as a thread or a process target."""
+    db = SQLite(db_path)
+    db.use_prepared = use_prepared
+    try:
+        return client_loop(db, w_id, duration, mix, seed, population, max_retries)
+    finally:
+        db.close()
+
+
+def duckdb_client(db: DuckDB, w_id: int, duration: float, mix: Dict[str, int], seed: int,
+                  population: Dict[str, int], max_retries: int = 3) -> Dict[str, Dict[str, Any]]:
+    """Runs a client on a DuckDB cursor handler (see DuckDB.client)."""
+    try:
+        return client_loop(db, w_id, duration, mix, seed, population, max_retries)
+    finally:
+        db.close()
+
+
+def histogram(latencies: List[float]) -> List[int]:
+    """Counts of latencies per LATENCY_BUCKETS_MS bucket, plus one overflow bucket."""
+    counts = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+    for latency in latencies:
+        counts[bisect.bisect_left(LATENCY_BUCKETS_MS, latency * 1000)] += 1
+    return counts
+
+
+def run_driver(engine: str, sqlite_path: Optional[str] = None, duckdb_db: Optional[DuckDB] = None,
+               clients: int = 4, duration: float = 60.0, use_processes: bool = False,
+               mix: Optional[Dict[str, int]] = None, seed: int = 0, max_retries: int = 3,
+               use_prepared: bool = True, delivery: str = "loop") -> Dict[str, Any]:
+    """
+    Runs `clients` concurrent terminals against one engine for `duration` seconds.
+
+    Args:
+        engine (str): "SQLite" or "DuckDB".
+        sqlite_path (Optional[str]): SQLite database file; every client opens its own connection.
+        duckdb_db (Optional[DuckDB]): DuckDB handler whose connection the clients get cursors from.
+        clients (int): Number of concurrent clients.
+        duration (float): Seconds each client keeps submitting transactions.
+        use_processes (bool): Run SQLite clients in processes instead of threads.
+        mix (Optional[Dict[str, int]]): Relative weight per transaction type (default: TRANSACTION_MIX).
+        seed (int): Base seed; client i uses seed + i.
+        max_retries (int): Retries of a transaction after a lock/write conflict before giving up.
+        use_prepared (bool): Execute the transaction statements prepared (True) or ad hoc.
+            DuckDB clients inherit the setting of `duckdb_db`.
+        delivery (str): Delivery implementation, "loop" (per district) or "set" (all districts at once);
+            with "set" the Delivery share of the mix runs as DeliverySet.
+
+    Returns:
+        Dict[str, Any]: throughput and per-type latency/abort statistics.
+    """
+    mix = mix or TRANSACTION_MIX
+    if delivery == "set":
+        mix = {("DeliverySet" if name == "Delivery" else name): weight for name, weight in mix.items()}
+    if engine == "SQLite":
+        probe = SQLite(sqlite_path)
+        population = population_sizes(probe)
+        probe.close()
+    else:
+        if use_processes:
+            raise ValueError("DuckDB allows one read-write process per database; use threads")
+        population = population_sizes(duckdb_db)
+    n_warehouses = population["warehouses"]
+    if not n_warehouses:
+        raise RuntimeError("No warehouses loaded")
+
+    executor_cls = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    start = time.perf_counter()
+    with executor_cls(max_workers=clients) as executor:
+        futures: List[Future] = []
+        for client_id in range(clients):
+            w_id = client_id % n_warehouses + 1
+            if engine == "SQLite":
+                futures.append(executor.submit(sqlite_client, sqlite_path, w_id, duration, mix,
+                                               seed + client_id, population, max_retries, use_prepared))
+            else:
+                futures.append(executor.submit(duckdb_client, duckdb_db.client(), w_id, duration, mix,
+                                               seed + client_id, population, max_retries))
+        results = [f.result() for f in futures]
+    elapsed = time.perf_counter() - start
+
+    types: Dict[str, Dict[str, Any]] = {}
+    for name in mix:
+        latencies = sorted(lat for r in results for lat in r[name]["latencies"])
+        types[name] = {
+            "completed": len(latencies),
+            "rollbacks": sum(r[name]["rollbacks"] for r in results),
+            "aborts": sum(r[name]["aborts"] for r in results),
+            "retries": sum(r[name]["retries"] for r in results),
+            "failures": sum(r[name]["failures"] for r in results),
+            "p50": percentile(latencies, 50),
+            "p95": percentile(latencies, 95),
+            "p99": percentile(latencies, 99),
+            "histogram": histogram(latencies),
+        }
+
+    minutes = elapsed / 60
+    return {
+        "engine": engine,
+        "clients": clients,
+        "statements": "prepared" if (use_prepared if engine == "SQLite" else duckdb_db.use_prepared) else "ad-hoc",
+        "elapsed": elapsed,
+        "tpm": sum(t["completed"] for t in types.values()) / minutes,
+        "tpmC": types["NewOrder"]["completed"] / minutes if "NewOrder" in types else 0.0,
+        "types": types,
+    }
+
+
+def print_driver_report(summary: Dict[str, Any]) -> None:
+    """Print throughput, per-type latency percentiles and the latency histograms."""
+    print(f"{summary['engine']}: {summary['clients']} clients, {summary['statements']} statements, "
+          f"{summary['elapsed']:.1f}s, "
+          f"{summary['tpm']:.1f} transactions/min, tpmC={summary['tpmC']:.1f}")
+    headers = ["Transaction", "completed", "rollbacks", "aborts", "retries", "failures",
+               "p50 (ms)", "p95 (ms)", "p99 (ms)"]
+    rows = [[name, t["completed"], t["rollbacks"], t["aborts"], t["retries"], t["failures"],
+             t["p50"] * 1000, t["p95"] * 1000, t["p99"] * 1000]
+            for name, t in summary["types"].items()]
+    print(tabulate(rows, headers=headers, floatfmt=".3f"))
+
+    bucket_labels = [f"<={b}ms" for b in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}ms"]
+    rows = [[name] + t["histogram"] for name, t in summary["types"].items()]
+    print(tabulate(rows, headers=["Histogram"] + bucket_labels))
+
+
+def format_driver_report(summary: Dict[str, Any]) -> str:
+    """Lines for the driver output file: one throughput line and one line per transaction type."""
+    content = (f"{summary['engine']}: clients={summary['clients']}, statements={summary['statements']}, elapsed={summary['elapsed']:.3f}s, "
+               f"tpm={summary['tpm']:.1f}, tpmC={summary['tpmC']:.1f}\n")
+    for name, t in summary["types"].items():
+        content += (f"  {name}: completed={t['completed']}, rollbacks={t['rollbacks']}, aborts={t['aborts']}, "
+                    f"retries={t['retries']}, "
+                    f"failures={t['failures']}, p50={t['p50']:.6f}s, p95={t['p95']:.6f}s, p99={t['p99']:.6f}s, "
+                    f"histogram={t['histogram']}\n")
+    return content
@@ -0,0 +1,276 @@
+from typing import Dict, Any, List, Optional, Callable
+from datetime import datetime
+import time
+
+import duckdb
+import numpy as np
+
+from chunk_pipeline import append_chunks
+from duckdb_handler import DuckDB
+from sqlite_handler import peak_rss_mb
+from tpcc_transactions import last_name, DISTRICTS_PER_WAREHOUSE
+
+# Population sizes of TPC-C clause 4.3.3.1
+ITEMS = 100_000
+CUSTOMERS_PER_DISTRICT = 3000
+ORDERS_PER_DISTRICT = 3000
+# Orders from this id on are not delivered yet and have a NEW_ORDER row
+FIRST_NEW_ORDER = 2101
+
+DEFAULT_SEED = 0
+
+# Integer columns generated as 0 where the row has NULL
+NULL_IF_ZERO = {"o_carrier_id"}
+
+# Tables in load order (referenced tables first), as created by sql_benchmarks/tpcc/setup.sql
+TPCC_TABLES = ["WAREHOUSE", "DISTRICT", "CUSTOMER", "HISTORY", "ITEM", "STOCK", "ORDERS", "NEW_ORDER", "ORDER_LINE"]
+
+ALPHANUMERIC = b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789"
+DIGITS = b"0123456789"
+LETTERS = b"ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+# Every customer last name by NURand number, looked up by index instead of built per row
+LAST_NAMES = np.array([last_name(number) for number in range(1000)], dtype=object)
+
+
+def warehouses_for(scale_factor: float) -> int:
+    """TPC-C scales by warehouses: the scale factor is their number."""
+    return max(1, int(scale_factor))
+
+
+def c_last_load_constant(seed: int) -> int:
+    """
+    Constant C of the NURand(255, 0, 999) customer last names of the initial
+    population. The driver draws last names with C = 0, and clause 2.1.6.1
+    requires the two to differ by 65 to 119, but not by 96 or 112.
+    """
+    rng = np.random.default_rng([seed, 1 << 16])
+    return int(rng.choice([c for c in range(65, 120) if c not in (96, 112)]))
+
+
+def nurand_array(rng: np.random.Generator, a: int, x: int, y: int, c: int, size: int) -> np.ndarray:
+    """Vectorized tpcc_transactions.nurand: `size` NURand(A, x, y) numbers."""
+    return (((rng.integers(0, a, size, endpoint=True) | rng.integers(x, y, size, endpoint=True)) + c)
+            % (y - x + 1)) + x
+
+
+def random_strings(rng: np.random.Generator, size: int, min_len: int, max_len: int,
+                   alphabet: bytes = ALPHANUMERIC, original: bool = False) -> np.ndarray:
+    """
+    `size` random strings of `min_len` to `max_len` characters of `alphabet`,
+    drawn as one character matrix. With `original`, 10% of them hold
+    "ORIGINAL" at a random position (I_DATA and S_DATA, clause 4.3.3.1).
+
+    Returns:
+        np.ndarray: An object array of str, which DuckDB scans as VARCHAR.
+    """
+    chars = np.frombuffer(alphabet, dtype=np.uint8)[rng.integers(0, len(alphabet), (size, max_len))]
+    lengths = rng.integers(min_len, max_len, size, endpoint=True)
+    if original:
+        rows = np.flatnonzero(rng.random(size) < 0.1)
+        starts = rng.integers(0, lengths[rows] - len(b"ORIGINAL"), endpoint=True)
+        chars[rows[:, None], starts[:, None] + np.arange(len(b"ORIGINAL"))] = np.frombuffer(b"ORIGINAL", np.uint8)
+    # Trailing NUL bytes end a NumPy bytes string
+    chars[np.arange(max_len) >= lengths[:, None]] = 0
+    return np.ascontiguousarray(chars).view(f"S{max_len}").ravel().astype("U").astype(object)
+
+
+def zip_codes(rng: np.random.Generator, size: int) -> np.ndarray:
+    return random_strings(rng, size, 4, 4, DIGITS) + "11111"
+
+
+def address(rng: np.random.Generator, size: int, prefix: str) -> Dict[str, np.ndarray]:
+    """Street, city, state and zip columns (clause 4.3.2.7 and 4.3.3.1)."""
+    return {
+        f"{prefix}_street_1": random_strings(rng, size, 10, 20),
+        f"{prefix}_street_2": random_strings(rng, size, 10, 20),
+        f"{prefix}_city": random_strings(rng, size, 10, 20),
+        f"{prefix}_state": random_strings(rng, size, 2, 2, LETTERS),
+        f"{prefix}_zip": zip_codes(rng, size),
+    }
+
+
+def generate_items(rng: np.random.Generator) -> Dict[str, Dict[str, np.ndarray]]:
+    """The ITEM table, shared by all warehouses."""
+    return {"ITEM": {
+        "i_id": np.arange(1, ITEMS + 1),
+        "i_im_id": rng.integers(1, 10_000, ITEMS, endpoint=True),
+        "i_name": random_strings(rng, ITEMS, 14, 24),
+        "i_price": rng.integers(100, 10_000, ITEMS, endpoint=True) / 100,
+        "i_data": random_strings(rng, ITEMS, 26, 50, original=True),
+    }}
+
+
+def generate_warehouse(rng: np.random.Generator, w_id: int, c_load: int,
+                       load_time: np.datetime64) -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    The rows of one warehouse in every table but ITEM, column by column in
+    the order of setup.sql. NULL columns are NaT timestamps or 0 ids (see NULL_IF_ZERO).
+    """
+    districts = DISTRICTS_PER_WAREHOUSE
+    tables: Dict[str, Dict[str, np.ndarray]] = {}
+
+    tables["WAREHOUSE"] = {
+        "w_id": np.array([w_id]),
+        "w_name": random_strings(rng, 1, 6, 10),
+        **address(rng, 1, "w"),
+        "w_tax": rng.integers(0, 2000, 1, endpoint=True) / 10_000,
+        "w_ytd": np.full(1, 300_000.0),
+    }
+    tables["DISTRICT"] = {
+        "d_id": np.arange(1, districts + 1),
+        "d_w_id": np.full(districts, w_id),
+        "d_name": random_strings(rng, districts, 6, 10),
+        **address(rng, districts, "d"),
+        "d_tax": rng.integers(0, 2000, districts, endpoint=True) / 10_000,
+        "d_ytd": np.full(districts, 30_000.0),
+        "d_next_o_id": np.full(districts, ORDERS_PER_DISTRICT + 1),
+    }
+
+    # Customers, with their history row, district by district
+    n = districts * CUSTOMERS_PER_DISTRICT
+    c_id = np.tile(np.arange(1, CUSTOMERS_PER_DISTRICT + 1), districts)
+    c_d_id = np.repeat(np.arange(1, districts + 1), CUSTOMERS_PER_DISTRICT)
+    # The first 1000 customers of a district cover every last name once, the others are NURand
+    name_numbers = np.where(c_id <= 1000, c_id - 1, nurand_array(rng, 255, 0, 999, c_load, n))
+    tables["CUSTOMER"] = {
+        "c_id": c_id,
+        "c_d_id": c_d_id,
+        "c_w_id": np.full(n, w_id),
+        "c_first": random_strings(rng, n, 8, 16),
+        "c_middle": np.full(n, "OE", dtype=object),
+        "c_last": LAST_NAMES[name_numbers],
+        **address(rng, n, "c"),
+        "c_phone": random_strings(rng, n, 16, 16, DIGITS),
+        "c_since": np.full(n, load_time),
+        "c_credit": np.where(rng.random(n) < 0.1, "BC", "GC").astype(object),
+        "c_credit_lim": np.full(n, 50_000.0),
+        "c_discount": rng.integers(0, 5000, n, endpoint=True) / 10_000,
+        "c_balance": np.full(n, -10.0),
+        "c_ytd_payment": np.full(n, 10.0),
+        "c_payment_cnt": np.ones(n, dtype=np.int64),
+        "c_delivery_cnt": np.zeros(n, dtype=np.int64),
+        "c_data": random_strings(rng, n, 300, 500),
+    }
+    tables["HISTORY"] = {
+        "h_c_id": c_id,
+        "h_c_d_id": c_d_id,
+        "h_c_w_id": np.full(n, w_id),
+        "h_d_id": c_d_id,
+        "h_w_id": np.full(n, w_id),
+        "h_date": np.full(n, load_time),
+        "h_amount": np.full(n, 10.0),
+        "h_data": random_strings(rng, n, 12, 24),
+    }
+
+    tables["STOCK"] = {
+        "s_i_id": np.arange(1, ITEMS + 1),
+        "s_w_id": np.full(ITEMS, w_id),
+        "s_quantity": rng.integers(10, 100, ITEMS, endpoint=True),
+        **{f"s_dist_{d:02d}": random_strings(rng, ITEMS, 24, 24) for d in range(1, 11)},
+        "s_ytd": np.zeros(ITEMS, dtype=np.int64),
+        "s_order_cnt": np.zeros(ITEMS, dtype=np.int64),
+        "s_remote_cnt": np.zeros(ITEMS, dtype=np.int64),
+        "s_data": random_strings(rng, ITEMS, 26, 50, original=True),
+    }
+
+    # Orders go to a random permutation of the district's customers
+    n = districts * ORDERS_PER_DISTRICT
+    o_id = np.tile(np.arange(1, ORDERS_PER_DISTRICT + 1), districts)
+    o_d_id = np.repeat(np.arange(1, districts + 1), ORDERS_PER_DISTRICT)
+    delivered = o_id < FIRST_NEW_ORDER
+    ol_cnt = rng.integers(5, 15, n, endpoint=True)
+    tables["ORDERS"] = {
+        "o_id": o_id,
+        "o_c_id": rng.permuted(np.tile(np.arange(1, CUSTOMERS_PER_DISTRICT + 1), (districts, 1)), axis=1).ravel(),
+        "o_d_id": o_d_id,
+        "o_w_id": np.full(n, w_id),
+        "o_entry_d": np.full(n, load_time),
+        "o_carrier_id": np.where(delivered, rng.integers(1, 10, n, endpoint=True), 0),
+        "o_ol_cnt": ol_cnt,
+        "o_all_local": np.ones(n, dtype=np.int64),
+    }
+    tables["NEW_ORDER"] = {
+        "no_o_id": o_id[~delivered],
+        "no_d_id": o_d_id[~delivered],
+        "no_w_id": np.full(int(np.count_nonzero(~delivered)), w_id),
+    }
+
+    # One order line per line of every order: numbered from 1 within each order
+    lines = int(ol_cnt.sum())
+    line_delivered = np.repeat(delivered, ol_cnt)
+    tables["ORDER_LINE"] = {
+        "ol_o_id": np.repeat(o_id, ol_cnt),
+        "ol_d_id": np.repeat(o_d_id, ol_cnt),
+        "ol_w_id": np.full(lines, w_id),
+        "ol_number": np.arange(lines) - np.repeat(np.cumsum(ol_cnt) - ol_cnt, ol_cnt) + 1,
+        "ol_i_id": rng.integers(1, ITEMS, lines, endpoint=True),
+        "ol_supply_w_id": np.full(lines, w_id),
+        "ol_delivery_d": np.where(line_delivered, load_time, np.datetime64("NaT")),
+        "ol_quantity": np.full(lines, 5),
+        "ol_amount": np.where(line_delivered, 0.0, rng.integers(1, 999_999, lines, endpoint=True) / 100),
+        "ol_dist_info": random_strings(rng, lines, 24, 24),
+    }
+    return tables
+
+
+def generate_chunk(w_id: int, seed: int, c_load: int, load_time: datetime, out_path: str) -> Dict[str, Any]:
+    """
+    Generates the ITEM table (`w_id` 0) or the rows of warehouse `w_id` into a
+    DuckDB file of its own, in a worker process. Every chunk draws from its own
+    generator seeded with (seed, w_id), so the data does not depend on the
+    number of workers.
+
+    Returns:
+        Dict[str, Any]: the warehouse, the file, rows per table, seconds spent and the worker's peak RSS.
+    """
+    start = time.perf_counter()
+    rng = np.random.default_rng([seed, w_id])
+    if w_id == 0:
+        tables = generate_items(rng)
+    else:
+        tables = generate_warehouse(rng, w_id, c_load, np.datetime64(load_time, "us"))
+
+    rows: Dict[str, int] = {}
+    con = duckdb.connect(out_path)
+    try:
+        for table, columns in tables.items():
+            con.register("chunk", columns)
+            select = ", ".join(f"NULLIF({c}, 0) AS {c}" if c in NULL_IF_ZERO else c for c in columns)
+            con.execute(f"CREATE TABLE {table} AS SELECT {select} FROM chunk;")
+            con.unregister("chunk")
+            rows[table] = len(next(iter(columns.values())))
+    finally:
+        con.close()
+    return {"warehouse": w_id, "path": out_path, "rows": rows, "seconds": time.perf_counter() - start,
+            "peak_rss_mb": peak_rss_mb()}
+
+
+def generate_tpcc(duckdb_db: DuckDB, warehouses: int, seed: int = DEFAULT_SEED, workers: int = 1,
+                  load_time: Optional[datetime] = None,
+                  progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Generates the initial TPC-C population of clause 4.3.3.1 into the (empty)
+    TPC-C tables of `duckdb_db`: the items, then one chunk per warehouse,
+    generated in worker processes with NumPy and appended in warehouse order
+    (see chunk_pipeline.append_chunks).
+
+    Args:
+        duckdb_db (DuckDB): Handler of the benchmark database; the TPC-C schema must be set up.
+        warehouses (int): Number of warehouses.
+        seed (int): Seed the whole population is drawn from, apart from the load time.
+        workers (int): Worker processes generating warehouses at the same time.
+        load_time (Optional[datetime]): Timestamp of C_SINCE, H_DATE, O_ENTRY_D and the delivered
+            OL_DELIVERY_D; now by default.
+        progress (Optional[Callable[[Dict[str, Any]], None]]): Called after every appended chunk
+            (see append_chunks).
+
+    Returns:
+        Dict[str, Any]: Rows per table, chunks, workers, seconds and the largest worker peak RSS.
+    """
+    if warehouses < 1:
+        raise ValueError("warehouses must be at least 1")
+    load_time = load_time or datetime.now().replace(microsecond=0)
+    c_load = c_last_load_constant(seed)
+    chunk_args: List[tuple] = [(w_id, seed, c_load, load_time) for w_id in range(warehouses + 1)]
+    return append_chunks(duckdb_db, generate_chunk, chunk_args, workers=workers, progress=progress)
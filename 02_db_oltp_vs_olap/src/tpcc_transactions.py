@@ -0,0 +1,610 @@
+from typing import Optional, Dict, Any, List, Tuple
+from datetime import datetime
+import random
+
+from sql_params import inline_parameters
+
+# Syllables of TPC-C customer last names (clause 4.3.2.3)
+LAST_NAME_SYLLABLES: List[str] = ["BAR", "OUGHT", "ABLE", "PRI", "PRES", "ESE", "ANTI", "CALLY", "ATION", "EING"]
+
+DISTRICTS_PER_WAREHOUSE = 10
+
+
+class TransactionRollback(Exception):
+    """Raised by a transaction that must be rolled back by design, e.g. a New-Order with an unused item."""
+
+
+def nurand(rng: random.Random, a: int, x: int, y: int, c: int = 0) -> int:
+    """Non-uniform random number NURand(A, x, y) from TPC-C clause 2.1.6."""
+    return (((rng.randint(0, a) | rng.randint(x, y)) + c) % (y - x + 1)) + x
+
+
+def last_name(number: int) -> str:
+    """Customer last name for a number in [0, 999] (TPC-C clause 4.3.2.3)."""
+    return (LAST_NAME_SYLLABLES[number // 100]
+            + LAST_NAME_SYLLABLES[(number // 10) % 10]
+            + LAST_NAME_SYLLABLES[number % 10])
+
+
+# Every statement issued by the transactions, with `?` placeholders. Handlers
+# prepare them once per connection (see SQLite/DuckDB.prepare) and execute them
+# with bound parameters, or inline the parameters when prepared statements are off.
+STATEMENTS: Dict[str, str] = {
+    # Stock-Level
+    "stock_level": """
+    WITH d AS (
+      SELECT d_next_o_id AS next_o_id
+        FROM district
+       WHERE d_w_id = ?
+         AND d_id   = ?
+    )
+    SELECT
+      COUNT(DISTINCT s.s_i_id) AS stock_count
+    FROM order_line AS ol
+      JOIN stock AS s
+        ON s.s_i_id = ol.ol_i_id
+       AND s.s_w_id = ?
+    WHERE
+          ol.ol_w_id = ?
+      AND ol.ol_d_id = ?
+      AND ol.ol_o_id <  (SELECT next_o_id      FROM d)
+      AND ol.ol_o_id >= (SELECT next_o_id - 20 FROM d)
+      AND s.s_quantity <  ?
+    ;
+    """,
+
+    # Delivery
+    "delivery_min_new_order": """
+        SELECT MIN(no_o_id)
+          FROM new_order
+         WHERE no_w_id = ?
+           AND no_d_id = ?
+    """,
+    "delivery_delete_new_order": """
+        DELETE FROM new_order
+         WHERE no_w_id = ?
+           AND no_d_id = ?
+           AND no_o_id = ?
+    """,
+    "delivery_order_customer": """
+        SELECT o_c_id
+          FROM orders
+         WHERE o_w_id = ?
+           AND o_d_id = ?
+           AND o_id   = ?
+    """,
+    "delivery_set_carrier": """
+        UPDATE orders
+           SET o_carrier_id = ?
+         WHERE o_w_id       = ?
+           AND o_d_id       = ?
+           AND o_id         = ?
+    """,
+    "delivery_set_delivery_date": """
+        UPDATE order_line
+           SET ol_delivery_d = ?
+         WHERE ol_w_id       = ?
+           AND ol_d_id       = ?
+           AND ol_o_id       = ?
+    """,
+    "delivery_order_total": """
+        SELECT COALESCE(SUM(ol_amount), 0)
+          FROM order_line
+         WHERE ol_w_id = ?
+           AND ol_d_id = ?
+           AND ol_o_id = ?
+    """,
+    "delivery_credit_customer": """
+        UPDATE customer
+           SET c_balance = c_balance + ?
+         WHERE c_w_id   = ?
+           AND c_d_id   = ?
+           AND c_id     = ?
+    """,
+
+    # Delivery, set-based: each statement handles the oldest new order of every
+    # district at once. The orders to deliver are identified by the same subquery
+    # in every statement, and new_order only changes in the last one.
+    "delivery_set_carrier_all": """
+        UPDATE orders
+           SET o_carrier_id = ?
+         WHERE o_w_id = ?
+           AND (o_d_id, o_id) IN (SELECT no_d_id, MIN(no_o_id)
+                                    FROM new_order
+                                   WHERE no_w_id = ?
+                                   GROUP BY no_d_id)
+    """,
+    "delivery_set_delivery_date_all": """
+        UPDATE order_line
+           SET ol_delivery_d = ?
+         WHERE ol_w_id = ?
+           AND (ol_d_id, ol_o_id) IN (SELECT no_d_id, MIN(no_o_id)
+                                        FROM new_order
+                                       WHERE no_w_id = ?
+                                       GROUP BY no_d_id)
+    """,
+    "delivery_credit_customers_all": """
+        UPDATE customer
+           SET c_balance = c_balance + t.total
+          FROM (SELECT o.o_d_id AS d_id, o.o_c_id AS c_id, COALESCE(SUM(ol.ol_amount), 0) AS total
+                  FROM orders AS o
+                  LEFT JOIN order_line AS ol
+                    ON ol.ol_w_id = o.o_w_id
+                   AND ol.ol_d_id = o.o_d_id
+                   AND ol.ol_o_id = o.o_id
+                 WHERE o.o_w_id = ?
+                   AND (o.o_d_id, o.o_id) IN (SELECT no_d_id, MIN(no_o_id)
+                                                FROM new_order
+                                               WHERE no_w_id = ?
+                                               GROUP BY no_d_id)
+                 GROUP BY o.o_d_id, o.o_c_id) AS t
+         WHERE customer.c_w_id = ?
+           AND customer.c_d_id = t.d_id
+           AND customer.c_id   = t.c_id
+    """,
+    "delivery_delete_new_orders_all": """
+        DELETE FROM new_order
+         WHERE no_w_id = ?
+           AND (no_d_id, no_o_id) IN (SELECT no_d_id, MIN(no_o_id)
+                                        FROM new_order
+                                       WHERE no_w_id = ?
+                                       GROUP BY no_d_id)
+        RETURNING no_d_id, no_o_id
+    """,
+
+    # Order-Status
+    "order_status_any_customer": """
+        SELECT DISTINCT o_c_id
+          FROM orders
+         WHERE o_w_id = ?
+           AND o_d_id = ?
+         LIMIT 1
+    """,
+    "order_status_customer": """
+    SELECT c_balance, c_first, c_middle, c_last, c_id
+      FROM customer
+     WHERE c_w_id = ?
+       AND c_d_id = ?
+       AND c_id   = ?
+    ;
+    """,
+    "order_status_last_order": """
+    SELECT o_id, o_carrier_id, o_entry_d
+      FROM orders
+     WHERE o_w_id = ?
+       AND o_d_id = ?
+       AND o_c_id = ?
+     ORDER BY o_id DESC
+     LIMIT 1
+    ;
+    """,
+    "order_status_lines": """
+    SELECT ol_i_id, ol_supply_w_id, ol_quantity, ol_amount, ol_delivery_d
+      FROM order_line
+     WHERE ol_w_id = ?
+       AND ol_d_id = ?
+       AND ol_o_id = ?
+    ;
+    """,
+
+    # New-Order
+    "new_order_warehouse_tax": """
+        SELECT w_tax
+          FROM warehouse
+         WHERE w_id = ?
+    """,
+    "new_order_district": """
+        SELECT d_tax, d_next_o_id
+          FROM district
+         WHERE d_w_id = ?
+           AND d_id   = ?
+    """,
+    "new_order_next_order_id": """
+        UPDATE district
+           SET d_next_o_id = d_next_o_id + 1
+         WHERE d_w_id = ?
+           AND d_id   = ?
+    """,
+    "new_order_customer": """
+        SELECT c_discount, c_last, c_credit
+          FROM customer
+         WHERE c_w_id = ?
+           AND c_d_id = ?
+           AND c_id   = ?
+    """,
+    "new_order_insert_order": """
+        INSERT INTO orders (o_id, o_d_id, o_w_id, o_c_id, o_entry_d, o_carrier_id, o_ol_cnt, o_all_local)
+        VALUES (?, ?, ?, ?, ?, NULL, ?, ?)
+    """,
+    "new_order_insert_new_order": """
+        INSERT INTO new_order (no_o_id, no_d_id, no_w_id)
+        VALUES (?, ?, ?)
+    """,
+    "new_order_item": """
+            SELECT i_price, i_name, i_data
+              FROM item
+             WHERE i_id = ?
+    """,
+    "new_order_update_stock": """
+            UPDATE stock
+               SET s_quantity   = ?,
+                   s_ytd        = s_ytd + ?,
+                   s_order_cnt  = s_order_cnt + 1,
+                   s_remote_cnt = s_remote_cnt + ?
+             WHERE s_i_id = ?
+               AND s_w_id = ?
+    """,
+    "new_order_insert_order_line": """
+            INSERT INTO order_line (ol_o_id, ol_d_id, ol_w_id, ol_number, ol_i_id, ol_supply_w_id,
+                                    ol_delivery_d, ol_quantity, ol_amount, ol_dist_info)
+            VALUES (?, ?, ?, ?, ?, ?, NULL, ?, ?, ?)
+    """,
+
+    # Payment
+    "payment_warehouse_ytd": """
+        UPDATE warehouse
+           SET w_ytd = w_ytd + ?
+         WHERE w_id = ?
+    """,
+    "payment_warehouse_name": """
+        SELECT w_name
+          FROM warehouse
+         WHERE w_id = ?
+    """,
+    "payment_district_ytd": """
+        UPDATE district
+           SET d_ytd = d_ytd + ?
+         WHERE d_w_id = ?
+           AND d_id   = ?
+    """,
+    "payment_district_name": """
+        SELECT d_name
+          FROM district
+         WHERE d_w_id = ?
+           AND d_id   = ?
+    """,
+    "payment_customers_by_name": """
+            SELECT c_id
+              FROM customer
+             WHERE c_w_id = ?
+               AND c_d_id = ?
+               AND c_last = ?
+             ORDER BY c_first
+    """,
+    "payment_customer": """
+        SELECT c_balance, c_credit, c_data
+          FROM customer
+         WHERE c_w_id = ?
+           AND c_d_id = ?
+           AND c_id   = ?
+    """,
+    "payment_charge_customer": """
+        UPDATE customer
+           SET c_balance     = c_balance - ?,
+               c_ytd_payment = c_ytd_payment + ?,
+               c_payment_cnt = c_payment_cnt + 1
+         WHERE c_w_id = ?
+           AND c_d_id = ?
+           AND c_id   = ?
+    """,
+    "payment_charge_bad_credit_customer": """
+        UPDATE customer
+           SET c_balance     = c_balance - ?,
+               c_ytd_payment = c_ytd_payment + ?,
+               c_payment_cnt = c_payment_cnt + 1,
+               c_data        = ?
+         WHERE c_w_id = ?
+           AND c_d_id = ?
+           AND c_id   = ?
+    """,
+    "payment_insert_history": """
+        INSERT INTO history (h_c_id, h_c_d_id, h_c_w_id, h_d_id, h_w_id, h_date, h_amount, h_data)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """,
+}
+
+# The district's S_DIST_xx column is part of the statement text, so there is one statement per district
+for _d_id in range(1, DISTRICTS_PER_WAREHOUSE + 1):
+    STATEMENTS[f"new_order_stock_{_d_id:02d}"] = f"""
+            SELECT s_quantity, s_dist_{_d_id:02d}
+              FROM stock
+             WHERE s_i_id = ?
+               AND s_w_id = ?
+    """
+
+
+def run_statement(db, name: str, *params: Any) -> List[Tuple[Any, ...]]:
+    """
+    Executes one of the STATEMENTS with the given parameters, registering it
+    with the handler on first use.
+    """
+    if not db.has_statement(name):
+        db.prepare(name, STATEMENTS[name])
+    return db.execute_prepared(name, params)
+
+
+def stock_level_query(w_id: int, d_id: int, threshold: int) -> str:
+    return inline_parameters(STATEMENTS["stock_level"], stock_level_params(w_id, d_id, threshold))
+
+
+def stock_level_params(w_id: int, d_id: int, threshold: int) -> Tuple[int, ...]:
+    return (w_id, d_id, w_id, w_id, d_id, threshold)
+
+
+def stock_level_transaction(db, w_id: int, d_id: int, threshold: int) -> int:
+    rows = run_statement(db, "stock_level", *stock_level_params(w_id, d_id, threshold))
+    return rows[0][0]
+
+
+def delivery_transaction(db, w_id: int, o_carrier_id: int, districts_per_warehouse: int = DISTRICTS_PER_WAREHOUSE,
+                         now: Optional[str] = None) -> List[Tuple[int, int]]:
+    """
+    TPC-C Delivery (clause 2.7), one district at a time: 7 statements per district.
+
+    Returns:
+        List[Tuple[int, int]]: (d_id, o_id) of every delivered order.
+    """
+    now = now or datetime.now().isoformat(sep=' ')
+    delivered = []
+
+    for d_id in range(1, districts_per_warehouse + 1):
+        # 1) Find the smallest new_order ID for this (w_id, d_id)
+        rows = run_statement(db, "delivery_min_new_order", w_id, d_id)
+        if not rows or rows[0][0] is None:
+            # no pending orders
+            continue
+        no_o_id = rows[0][0]
+
+        # 2) Delete it from new_order
+        run_statement(db, "delivery_delete_new_order", w_id, d_id, no_o_id)
+
+        # 3) Lookup the customer id for that order
+        rows = run_statement(db, "delivery_order_customer", w_id, d_id, no_o_id)
+        c_id = rows[0][0]
+
+        # 4) Update the order’s carrier
+        run_statement(db, "delivery_set_carrier", o_carrier_id, w_id, d_id, no_o_id)
+
+        # 5) Stamp order_line rows with delivery timestamp
+        run_statement(db, "delivery_set_delivery_date", now, w_id, d_id, no_o_id)
+
+        # 6) Sum up the line amounts
+        rows = run_statement(db, "delivery_order_total", w_id, d_id, no_o_id)
+        total = rows[0][0]
+
+        # 7) Add that to the customer’s balance
+        run_statement(db, "delivery_credit_customer", total, w_id, d_id, c_id)
+        delivered.append((d_id, no_o_id))
+
+    return delivered
+
+
+def delivery_set_transaction(db, w_id: int, o_carrier_id: int, now: Optional[str] = None) -> List[Tuple[int, int]]:
+    """
+    TPC-C Delivery for all districts of a warehouse in four set-based statements,
+    with the same effect as delivery_transaction.
+
+    Returns:
+        List[Tuple[int, int]]: (d_id, o_id) of every delivered order.
+    """
+    now = now or datetime.now().isoformat(sep=' ')
+    run_statement(db, "delivery_set_carrier_all", o_carrier_id, w_id, w_id)
+    run_statement(db, "delivery_set_delivery_date_all", now, w_id, w_id)
+    run_statement(db, "delivery_credit_customers_all", w_id, w_id, w_id)
+    rows = run_statement(db, "delivery_delete_new_orders_all", w_id, w_id)
+    return sorted((d_id, o_id) for d_id, o_id in rows)
+
+
+# Delivery implementation by name
+DELIVERY_IMPLEMENTATIONS = {
+    "loop": delivery_transaction,
+    "set": delivery_set_transaction,
+}
+
+
+def delivery_fingerprint(db, w_id: int, delivered: List[Tuple[int, int]]) -> List[Tuple[Any, ...]]:
+    """The rows Delivery changes for the given orders: carrier, delivery dates, customer balance, pending flag."""
+    fingerprint = []
+    for d_id, o_id in delivered:
+        rows, _, _ = db.execute_query(f"""
+            SELECT o.o_carrier_id, c.c_balance,
+                   (SELECT COUNT(*) FROM new_order
+                     WHERE no_w_id = o.o_w_id AND no_d_id = o.o_d_id AND no_o_id = o.o_id)
+              FROM orders AS o
+              JOIN customer AS c
+                ON c.c_w_id = o.o_w_id AND c.c_d_id = o.o_d_id AND c.c_id = o.o_c_id
+             WHERE o.o_w_id = {w_id} AND o.o_d_id = {d_id} AND o.o_id = {o_id}
+        """, fetch_metadata=False)
+        carrier, balance, pending = rows[0]
+        lines, _, _ = db.execute_query(f"""
+            SELECT ol_number, ol_delivery_d
+              FROM order_line
+             WHERE ol_w_id = {w_id} AND ol_d_id = {d_id} AND ol_o_id = {o_id}
+             ORDER BY ol_number
+        """, fetch_metadata=False)
+        # Balances are compared to the cent; the engines may sum the amounts in another order
+        fingerprint.append((d_id, o_id, carrier, round(balance, 2), pending, tuple(lines)))
+    return fingerprint
+
+
+def verify_delivery(db, w_id: int, o_carrier_id: int) -> bool:
+    """
+    Runs every Delivery implementation from the same state, rolling each one
+    back, and checks that they deliver the same orders with the same effect.
+    """
+    now = datetime.now().isoformat(sep=' ')
+    outcomes = []
+    for implementation in DELIVERY_IMPLEMENTATIONS.values():
+        db.begin()
+        try:
+            delivered = sorted(implementation(db, w_id=w_id, o_carrier_id=o_carrier_id, now=now))
+            outcomes.append(delivery_fingerprint(db, w_id, delivered))
+        finally:
+            db.rollback()
+    return all(outcome == outcomes[0] for outcome in outcomes)
+
+
+def order_status_transaction(
+    db,
+    w_id: int,
+    d_id: int,
+    by_name: bool = True,
+    c_last: Optional[str] = None,
+    c_id:   Optional[int] = None
+) -> Dict[str, Any]:
+
+    rows = run_statement(db, "order_status_any_customer", w_id, d_id)
+    if not rows:
+        raise RuntimeError(f"No orders found in W={w_id}, D={d_id}")
+    found_c_id = rows[0][0]
+
+    rows = run_statement(db, "order_status_customer", w_id, d_id, found_c_id)
+    if not rows:
+        raise RuntimeError(f"Customer {found_c_id} not found in W={w_id}, D={d_id}")
+    c_balance, c_first, c_middle, c_last, c_id = rows[0]
+
+    rows = run_statement(db, "order_status_last_order", w_id, d_id, c_id)
+    if not rows:
+        raise RuntimeError(f"No orders found for customer {c_id} in W={w_id}, D={d_id}")
+    o_id, o_carrier_id, o_entry_d = rows[0]
+
+    line_rows = run_statement(db, "order_status_lines", w_id, d_id, o_id)
+
+    return {
+        "customer": {
+            "c_id":      c_id,
+            "c_last":    c_last,
+            "c_balance": c_balance,
+            "c_first":   c_first,
+            "c_middle":  c_middle,
+        },
+        "order": {
+            "o_id":         o_id,
+            "o_carrier_id": o_carrier_id,
+            "o_entry_d":    o_entry_d
+        },
+        "lines": [
+            {
+                "ol_i_id":        lr[0],
+                "ol_supply_w_id": lr[1],
+                "ol_quantity":    lr[2],
+                "ol_amount":      lr[3],
+                "ol_delivery_d":  lr[4]
+            }
+            for lr in line_rows
+        ]
+    }
+
+
+def new_order_transaction(
+    db,
+    w_id: int,
+    d_id: int,
+    c_id: int,
+    items: List[Tuple[int, int, int]]
+) -> Dict[str, Any]:
+    """
+    TPC-C New-Order (clause 2.4): allocates the next order id of the district,
+    inserts ORDERS/NEW_ORDER/ORDER_LINE rows and updates STOCK for each item.
+
+    Args:
+        items: (i_id, supply_w_id, quantity) per order line.
+
+    Raises:
+        TransactionRollback: if an item does not exist (the 1% of New-Orders rolled back by design).
+    """
+    now = datetime.now().isoformat(sep=' ')
+
+    rows = run_statement(db, "new_order_warehouse_tax", w_id)
+    w_tax = rows[0][0]
+
+    rows = run_statement(db, "new_order_district", w_id, d_id)
+    d_tax, o_id = rows[0]
+
+    run_statement(db, "new_order_next_order_id", w_id, d_id)
+
+    rows = run_statement(db, "new_order_customer", w_id, d_id, c_id)
+    c_discount, c_last, c_credit = rows[0]
+
+    all_local = int(all(supply_w_id == w_id for _, supply_w_id, _ in items))
+    run_statement(db, "new_order_insert_order", o_id, d_id, w_id, c_id, now, len(items), all_local)
+    run_statement(db, "new_order_insert_new_order", o_id, d_id, w_id)
+
+    total = 0.0
+    for ol_number, (i_id, supply_w_id, quantity) in enumerate(items, start=1):
+        rows = run_statement(db, "new_order_item", i_id)
+        if not rows:
+            raise TransactionRollback(f"Item {i_id} not found")
+        i_price = rows[0][0]
+
+        rows = run_statement(db, f"new_order_stock_{d_id:02d}", i_id, supply_w_id)
+        s_quantity, dist_info = rows[0]
+        # Restock by 91 when the quantity would drop below 10 (clause 2.4.2.2)
+        new_quantity = s_quantity - quantity if s_quantity >= quantity + 10 else s_quantity - quantity + 91
+        run_statement(db, "new_order_update_stock", new_quantity, quantity, int(supply_w_id != w_id),
+                      i_id, supply_w_id)
+
+        ol_amount = quantity * i_price
+        total += ol_amount
+        run_statement(db, "new_order_insert_order_line", o_id, d_id, w_id, ol_number, i_id, supply_w_id,
+                      quantity, ol_amount, dist_info)
+
+    return {
+        "o_id": o_id,
+        "c_last": c_last,
+        "c_credit": c_credit,
+        "total": total * (1 - c_discount) * (1 + w_tax + d_tax),
+    }
+
+
+def payment_transaction(
+    db,
+    w_id: int,
+    d_id: int,
+    c_w_id: int,
+    c_d_id: int,
+    h_amount: float,
+    by_name: bool = False,
+    c_last: Optional[str] = None,
+    c_id:   Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    TPC-C Payment (clause 2.5): adds the payment to the warehouse and district
+    year-to-date totals, charges the customer (looked up by last name through
+    IDX_CUSTOMER or by id) and records a HISTORY row.
+    """
+    now = datetime.now().isoformat(sep=' ')
+
+    run_statement(db, "payment_warehouse_ytd", h_amount, w_id)
+    rows = run_statement(db, "payment_warehouse_name", w_id)
+    w_name = rows[0][0]
+
+    run_statement(db, "payment_district_ytd", h_amount, w_id, d_id)
+    rows = run_statement(db, "payment_district_name", w_id, d_id)
+    d_name = rows[0][0]
+
+    if by_name:
+        rows = run_statement(db, "payment_customers_by_name", c_w_id, c_d_id, c_last)
+        if not rows:
+            raise RuntimeError(f"No customer named {c_last} in W={c_w_id}, D={c_d_id}")
+        # Pick the customer at position ceil(n / 2) (clause 2.5.2.2)
+        c_id = rows[(len(rows) - 1) // 2][0]
+
+    rows = run_statement(db, "payment_customer", c_w_id, c_d_id, c_id)
+    c_balance, c_credit, c_data = rows[0]
+
+    if c_credit == "BC":
+        # Bad credit: prepend the payment to C_DATA, keeping at most 500 characters
+        c_data = f"{c_id} {c_d_id} {c_w_id} {d_id} {w_id} {h_amount:.2f} | {c_data or ''}"[:500]
+        run_statement(db, "payment_charge_bad_credit_customer", h_amount, h_amount, c_data, c_w_id, c_d_id, c_id)
+    else:
+        run_statement(db, "payment_charge_customer", h_amount, h_amount, c_w_id, c_d_id, c_id)
+
+    h_data = f"{w_name}    {d_name}"
+    run_statement(db, "payment_insert_history", c_id, c_d_id, c_w_id, d_id, w_id, now, h_amount, h_data)
+
+    return {
+        "c_id": c_id,
+        "c_balance": c_balance - h_amount,
+        "c_credit": c_credit,
+    }
@@ -0,0 +1,61 @@
+from typing import Dict, Any, Optional, Callable
+import os
+import time
+
+import duckdb
+
+from chunk_pipeline import append_chunks
+from duckdb_handler import DuckDB, TPCH_TABLES
+from sqlite_handler import peak_rss_mb
+
+
+def generate_chunk(scale_factor: float, children: int, step: int, threads: int, out_path: str) -> Dict[str, Any]:
+    """
+    Generates partition `step` of `children` of a TPC-H dataset into a DuckDB
+    file of its own, in a worker process.
+
+    Returns:
+        Dict[str, Any]: the step, the file, rows per table, seconds spent and the worker's peak RSS.
+    """
+    start = time.perf_counter()
+    con = duckdb.connect(out_path)
+    try:
+        con.execute(f"SET threads = {threads};")
+        con.execute("LOAD tpch;")
+        con.execute(f"CALL dbgen(sf={scale_factor}, children={children}, step={step});")
+        rows = {t: con.execute(f"SELECT count(*) FROM {t};").fetchone()[0] for t in TPCH_TABLES}
+    finally:
+        con.close()
+    return {"step": step, "path": out_path, "rows": rows, "seconds": time.perf_counter() - start,
+            "peak_rss_mb": peak_rss_mb()}
+
+
+def generate_tpch_chunked(duckdb_db: DuckDB, scale_factor: float, chunks: int, workers: int = 1,
+                          progress: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+    """
+    Generates TPC-H with dbgen's children/step partitioning instead of one
+    dbgen call: worker processes generate one partition each, and the
+    partitions are appended to the tables of `duckdb_db` in step order (see
+    chunk_pipeline.append_chunks), which gives the same data as a single call.
+
+    Args:
+        duckdb_db (DuckDB): Handler of the benchmark database; its TPC-H tables are replaced.
+        scale_factor (float): The scale factor used.
+        chunks (int): Number of partitions (dbgen's `children`).
+        workers (int): Worker processes generating partitions at the same time.
+        progress (Optional[Callable[[Dict[str, Any]], None]]): Called after every appended partition
+            (see append_chunks).
+
+    Returns:
+        Dict[str, Any]: Rows per table, chunks, workers, seconds and the largest worker peak RSS.
+    """
+    if chunks < 1 or workers < 1:
+        raise ValueError("chunks and workers must be at least 1")
+    workers = min(workers, chunks)
+    threads = max(1, (os.cpu_count() or 1) // workers)
+
+    # dbgen at scale factor 0 creates the empty tables the partitions are appended to
+    duckdb_db.generate_tpch(scale_factor=0)
+    return append_chunks(duckdb_db, generate_chunk,
+                         [(scale_factor, chunks, step, threads) for step in range(chunks)],
+                         workers=workers, progress=progress)
@@ -0,0 +1,111 @@
+from typing import Dict, List, Tuple, Any, Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import multiprocessing
+import os
+
+from sqlite_handler import SQLite, FETCH_MODES as SQLITE_FETCH_MODES
+from duckdb_handler import DuckDB
+from benchmark_utils import benchmark_sqlite, benchmark_duckdb, make_cold
+
+# (engine, database file, label, query text)
+Job = Tuple[str, str, str, str]
+
+# CPUs the current worker process is pinned to (set by pin_worker)
+_worker_cpus: List[int] = []
+
+
+def available_cpus() -> List[int]:
+    """CPUs this process may run on."""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def cpu_slots(max_workers: int, cpus_per_job: int = 1) -> List[List[int]]:
+    """
+    Splits the available CPUs into one disjoint set of `cpus_per_job` CPUs per worker.
+
+    Raises:
+        ValueError: if there are fewer CPUs than max_workers * cpus_per_job.
+    """
+    cpus = available_cpus()
+    if max_workers < 1 or cpus_per_job < 1:
+        raise ValueError("max_workers and cpus_per_job must be at least 1")
+    if max_workers * cpus_per_job > len(cpus):
+        raise ValueError(f"{max_workers} workers x {cpus_per_job} CPUs do not fit on {len(cpus)} available CPUs")
+    return [cpus[i * cpus_per_job:(i + 1) * cpus_per_job] for i in range(max_workers)]
+
+
+def pin_worker(slots: Any) -> None:
+    """Pool initializer: pins the worker process to its own CPUs for its whole lifetime."""
+    global _worker_cpus
+    _worker_cpus = slots.get()
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, _worker_cpus)
+
+
+def limit_duckdb_threads(db: DuckDB) -> None:
+    """DuckDB parallelizes within a query; give it exactly the CPUs the worker is pinned to."""
+    db.execute_query(f"SET threads = {len(_worker_cpus) or os.cpu_count()};", fetch_metadata=False)
+
+
+def run_job(engine: str, db_path: str, label: str, query: str, warmup: int, repetitions: int,
+            cache_mode: str, drop_page_cache: bool, fetch_mode: str = "all"
+            ) -> Tuple[str, str, Dict[str, Any], List[int]]:
+    """
+    Measures one query on one engine in a worker process, on a read-only connection of its own.
+
+    Returns:
+        Tuple[str, str, Dict[str, Any], List[int]]: engine, label, statistics (see summarize) and the CPUs used.
+    """
+    if engine == "SQLite":
+        db = SQLite(db_path, read_only=True)
+        fetch_mode = fetch_mode if fetch_mode in SQLITE_FETCH_MODES else "all"
+        setup = (lambda: make_cold(db, drop_page_cache)) if cache_mode == "cold" else None
+    else:
+        db = DuckDB(db_path, read_only=True)
+        limit_duckdb_threads(db)
+        setup = (lambda: (make_cold(db, drop_page_cache), limit_duckdb_threads(db))) if cache_mode == "cold" else None
+
+    try:
+        benchmark = benchmark_sqlite if engine == "SQLite" else benchmark_duckdb
+        stats = benchmark(db, query, False, warmup, repetitions, setup, fetch_mode=fetch_mode)
+    finally:
+        db.close()
+    return engine, label, stats, list(_worker_cpus)
+
+
+def run_jobs(jobs: List[Job], max_workers: int, cpus_per_job: int = 1, warmup: int = 0, repetitions: int = 1,
+             cache_mode: str = "none", drop_page_cache: bool = False, fetch_mode: str = "all"
+             ) -> Iterator[Tuple[str, str, Dict[str, Any], List[int]]]:
+    """
+    Runs independent (engine, query) jobs in a pool of `max_workers` processes,
+    each pinned to its own `cpus_per_job` CPUs, and yields results as jobs finish.
+
+    Jobs only share memory bandwidth and the OS page cache, so their timings
+    stay comparable to a sequential run as long as the data fits in memory.
+    No process may hold a write lock on the database files while this runs;
+    DuckDB refuses read-only opens while another process has the file open
+    read-write.
+
+    Args:
+        jobs (List[Job]): (engine, database file, label, query) per job; submitted in this order,
+            so put the longest jobs first.
+        max_workers (int): Maximum number of jobs running at the same time.
+        cpus_per_job (int): CPUs each worker is pinned to (and DuckDB threads per query).
+        warmup (int): Untimed executions of each query before measuring.
+        repetitions (int): Measured executions of each query.
+        cache_mode (str): "cold" reopens the worker's connection before every execution.
+        drop_page_cache (bool): In cold mode, also evict the database file from the OS page cache.
+        fetch_mode (str): How results are fetched (see the handlers' FETCH_MODES).
+    """
+    slots = multiprocessing.Queue()
+    for cpus in cpu_slots(max_workers, cpus_per_job):
+        slots.put(cpus)
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=pin_worker, initargs=(slots,)) as executor:
+        futures = [executor.submit(run_job, engine, db_path, label, query, warmup, repetitions,
+                                   cache_mode, drop_page_cache, fetch_mode)
+                   for engine, db_path, label, query in jobs]
+        for future in as_completed(futures):
+            yield future.result()